@@ -0,0 +1,134 @@
+"""Measure the import time and peak RSS of the request path in a fresh interpreter.
+
+Each scenario runs in its own subprocess so nothing is already imported. The
+"with pandas" scenario imports pandas first, which is what every cold start
+paid before setlist selection moved to plain Python and NumPy.
+
+    PYTHONPATH=src python scripts/bench_cold_start.py [--repeat 5]
+
+``--profile MODULE`` instead runs ``python -X importtime -c "import MODULE"``
+and records the self and cumulative import cost of every module it loads,
+e.g. ``--profile ag.lambda_handler --output importtime.json``.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    "baseline (python)": [],
+    "numpy": ["numpy"],
+    "playlist_builder": ["ag.services.playlist_builder"],
+    "pandas + playlist_builder": ["pandas", "ag.services.playlist_builder"],
+    "lambda_handler": ["ag.lambda_handler"],
+    "lambda_handler + ag.run": ["ag.lambda_handler", "ag.run"],
+}
+
+# "import time:  self [us] | cumulative | imported package" lines from -X importtime.
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+_PROBE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+# ru_maxrss is KiB on Linux and bytes on macOS.
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+print(json.dumps({"seconds": elapsed, "rss_kib": rss}))
+"""
+
+
+def _run(modules, env):
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, *modules],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def profile_imports(module, env):
+    """Return per-module import cost for ``import module`` in a fresh interpreter."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        records.append(
+            {
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            }
+        )
+    return records
+
+
+def _print_profile(module, records, top, output):
+    if output:
+        with open(output, "w", encoding="utf-8") as handle:
+            json.dump({"module": module, "imports": records}, handle, indent=2)
+    # Interpreter startup (site, encodings) is listed too; report the target's own cost.
+    total = next(
+        (r["cumulative_ms"] for r in records if r["module"] == module and r["depth"] == 0),
+        0.0,
+    )
+    print(f"import {module}: {total:.1f} ms ({len(records)} modules imported in total)")
+    print(f"{'module':<48} {'self ms':>9} {'cumul. ms':>10}")
+    ranked = sorted(records, key=lambda record: record["cumulative_ms"], reverse=True)
+    for record in ranked[:top]:
+        print(
+            f"{record['module']:<48} {record['self_ms']:>9.1f} "
+            f"{record['cumulative_ms']:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profile", metavar="MODULE", help="profile one import")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="write the --profile records as JSON")
+    args = parser.parse_args()
+
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env = {**os.environ, "PYTHONPATH": src}
+
+    if args.profile:
+        _print_profile(
+            args.profile, profile_imports(args.profile, env), args.top, args.output
+        )
+        return
+
+    print(f"{'scenario':<28} {'import ms':>10} {'peak RSS MiB':>13}")
+    for label, modules in SCENARIOS.items():
+        try:
+            runs = [_run(modules, env) for _ in range(max(1, args.repeat))]
+        except subprocess.CalledProcessError as exc:
+            print(f"{label:<28} failed: {exc.stderr.strip().splitlines()[-1]}")
+            continue
+        seconds = statistics.median(run["seconds"] for run in runs)
+        rss = statistics.median(run["rss_kib"] for run in runs) / 1024
+        print(f"{label:<28} {seconds * 1000:>10.1f} {rss:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Build many playlists in one process from a JSONL or YAML manifest."""
+
+import json
+import logging
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ag.cache import DEFAULT_MEMORY_MAX_ENTRIES, Cache, MemoryCache, TieredCache
+from ag.clients.setlist_fm import SETLIST_CACHE_NAMESPACE_TTLS
+from ag.clients.spotify import SpotifyClient
+from ag.config import AppConfig, load_app_config
+from ag.run import (
+    create_setlist_client,
+    log_component_stats,
+    playlist_result_to_payload,
+    shared_cache,
+    shared_spotify_rate_limiters,
+)
+from ag.services.playlist_builder import PlaylistBuilder
+
+
+def _optional_bool(raw: Dict[str, Any], field: str) -> Optional[bool]:
+    value = raw.get(field)
+    if value is not None and not isinstance(value, bool):
+        raise ValueError(f"{field} must be true or false, got {value!r}")
+    return value
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One playlist to build; unset options fall back to the batch defaults."""
+
+    band_names: Tuple[str, ...]
+    playlist_name: Optional[str] = None
+    copy_last_setlist_threshold: int = 15
+    max_setlist_length: int = 12
+    force_smart_setlist: Optional[bool] = None
+    use_fuzzy_search: Optional[bool] = None
+    create_playlist: Optional[bool] = None
+    id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "BatchJob":
+        if not isinstance(raw, dict):
+            raise ValueError(
+                f"Batch job must be a mapping, got {type(raw).__name__}"
+            )
+        known = {field.name for field in fields(cls)}
+        unknown = sorted(set(raw) - known)
+        if unknown:
+            raise ValueError(f"Unknown batch job keys: {', '.join(unknown)}")
+
+        band_names = raw.get("band_names")
+        if isinstance(band_names, str):
+            band_names = [band_names]
+        if not band_names:
+            raise ValueError("band_names are required")
+        playlist_name = raw.get("playlist_name")
+        return cls(
+            band_names=tuple(band_names),
+            playlist_name=playlist_name.strip() if playlist_name else None,
+            copy_last_setlist_threshold=int(
+                raw.get("copy_last_setlist_threshold", 15)
+            ),
+            max_setlist_length=int(raw.get("max_setlist_length", 12)),
+            force_smart_setlist=_optional_bool(raw, "force_smart_setlist"),
+            use_fuzzy_search=_optional_bool(raw, "use_fuzzy_search"),
+            create_playlist=_optional_bool(raw, "create_playlist"),
+            id=str(raw["id"]) if raw.get("id") is not None else None,
+        )
+
+
+def load_manifest(path: Union[str, Path]) -> List[BatchJob]:
+    """Read jobs from ``.jsonl`` (one job per line) or ``.yaml``/``.yml``.
+
+    A YAML manifest is either a list of jobs or a mapping with ``jobs`` and
+    optional ``defaults`` merged into every job.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in {".yaml", ".yml"}:
+        try:
+            import yaml
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise RuntimeError(
+                "YAML manifests need PyYAML; install autogigification[yaml]"
+            ) from exc
+        with open(path, "r") as file:
+            document = yaml.safe_load(file) or []
+        defaults: Any = {}
+        if isinstance(document, dict):
+            defaults = document.get("defaults") or {}
+            document = document.get("jobs") or []
+        if not isinstance(defaults, dict):
+            raise ValueError(f"{path}: defaults must be a mapping")
+        if not isinstance(document, list):
+            raise ValueError(f"{path}: jobs must be a list")
+        raw_jobs = []
+        for index, job in enumerate(document):
+            if not isinstance(job, dict):
+                raise ValueError(
+                    f"{path}: job {index} must be a mapping, "
+                    f"got {type(job).__name__}"
+                )
+            raw_jobs.append({**defaults, **job})
+    elif suffix in {".jsonl", ".ndjson"}:
+        raw_jobs = []
+        with open(path, "r") as file:
+            for line_no, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    raw_jobs.append(json.loads(line))
+                except json.JSONDecodeError as exc:
+                    raise ValueError(
+                        f"{path}:{line_no}: invalid JSON ({exc})"
+                    ) from exc
+    else:
+        raise ValueError(
+            f"Unsupported manifest type {path.suffix!r}; use .jsonl or .yaml"
+        )
+
+    jobs = []
+    for index, raw in enumerate(raw_jobs):
+        try:
+            jobs.append(BatchJob.from_dict(raw))
+        except ValueError as exc:
+            raise ValueError(f"{path}: job {index}: {exc}") from exc
+    return jobs
+
+
+def _batch_cache(
+    no_cache: bool,
+    target: Optional[str],
+    ttl_seconds: Optional[float],
+    namespace: str,
+    namespace_ttls: Optional[Dict[str, Optional[float]]] = None,
+) -> Cache:
+    """Batch-scoped memory in front of the configured cache.
+
+    Setlists and track matches shared by several jobs are then fetched and
+    matched once per batch, even with ``no_cache`` (memory only).
+    """
+    memory = MemoryCache(
+        max_entries=DEFAULT_MEMORY_MAX_ENTRIES,
+        ttl_seconds=ttl_seconds,
+        namespace_ttls=namespace_ttls,
+    )
+    if no_cache:
+        return memory
+    return TieredCache(
+        [memory, shared_cache(False, target, ttl_seconds, namespace, namespace_ttls)]
+    )
+
+
+def _create_batch_builder(
+    cfg: AppConfig,
+    *,
+    no_cache: bool,
+    rate_limit: float,
+    max_workers: int,
+    setlist_pages: int,
+    setlist_max_age_days: Optional[int],
+) -> PlaylistBuilder:
+    setlist_client = create_setlist_client(
+        cfg,
+        _batch_cache(
+            no_cache,
+            cfg.caches.setlist_cache,
+            cfg.caches.setlist_cache_ttl_seconds,
+            "setlists",
+            SETLIST_CACHE_NAMESPACE_TTLS,
+        ),
+        rate_limit,
+        setlist_pages=setlist_pages,
+        setlist_max_age_days=setlist_max_age_days,
+    )
+    spotify_client = SpotifyClient(
+        cfg.spotify,
+        track_cache=_batch_cache(
+            no_cache,
+            cfg.caches.spotify_track_cache,
+            cfg.caches.spotify_track_cache_ttl_seconds,
+            "spotify",
+        ),
+        rate_limiters=shared_spotify_rate_limiters(),
+    )
+    return PlaylistBuilder(setlist_client, spotify_client, max_workers=max_workers)
+
+
+def run_batch(
+    jobs: Iterable[BatchJob],
+    *,
+    no_cache: bool = False,
+    rate_limit: float = 1.0,
+    max_workers: int = 1,
+    setlist_pages: int = 1,
+    setlist_max_age_days: Optional[int] = None,
+    create_playlists: bool = True,
+    use_fuzzy_search: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Run jobs one after another on shared clients, yielding a record per job.
+
+    Records are yielded as soon as each job finishes; a job that raises
+    anything yields an ``error`` record instead of stopping the batch.
+    """
+    jobs = list(jobs)
+    # A job creates a playlist when it names one, unless it opts out.
+    create_flags = [
+        create_playlists
+        and (
+            job.create_playlist
+            if job.create_playlist is not None
+            else bool(job.playlist_name)
+        )
+        for job in jobs
+    ]
+    cfg = load_app_config(require_spotify_user=any(create_flags))
+    builder = _create_batch_builder(
+        cfg,
+        no_cache=no_cache,
+        rate_limit=rate_limit,
+        max_workers=max_workers,
+        setlist_pages=setlist_pages,
+        setlist_max_age_days=setlist_max_age_days,
+    )
+    unique_bands = {band for job in jobs for band in job.band_names}
+    logging.info(
+        "Running %s jobs covering %s distinct bands", len(jobs), len(unique_bands)
+    )
+
+    for index, (job, create_playlist) in enumerate(zip(jobs, create_flags)):
+        record: Dict[str, Any] = {
+            "job": job.id if job.id is not None else index,
+            "playlist_name": job.playlist_name,
+        }
+        try:
+            result = builder.build_playlist(
+                job.band_names,
+                job.playlist_name,
+                job.copy_last_setlist_threshold,
+                job.max_setlist_length,
+                force_smart_setlist=job.force_smart_setlist,
+                use_fuzzy_search=(
+                    job.use_fuzzy_search
+                    if job.use_fuzzy_search is not None
+                    else use_fuzzy_search
+                ),
+                create_playlist=create_playlist,
+            )
+        except Exception as exc:
+            # One bad job (or an unexpected bug) must not abort the batch.
+            logging.exception("Batch job %s failed", record["job"])
+            record.update(ok=False, error=str(exc))
+        else:
+            record.update(ok=True, result=playlist_result_to_payload(result))
+        yield record
+
+    log_component_stats(builder)
@@ -1,8 +1,26 @@
 import json
 import logging
+import os
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters for how well a cache is doing; backends fill what they track."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size_bytes: int = 0
 
 
 class Cache(ABC):
@@ -26,6 +44,21 @@ class Cache(ABC):
         """Expose raw cache data when needed."""
         return {}
 
+    def stats(self) -> CacheStats:
+        """Hit/miss/eviction counters (all zero for backends that do not count)."""
+        return CacheStats()
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Epoch time ``key`` expires at; None if it never does or is unknown."""
+        return None
+
+    def set_until(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """Store ``value`` to expire no later than ``expires_at`` (None: never).
+
+        Backends without per-entry expiry store it like ``set``.
+        """
+        self.set(key, value)
+
 
 class NullCache(Cache):
     """Cache implementation that discards everything."""
@@ -43,26 +76,122 @@ class NullCache(Cache):
         return False
 
 
+def cache_namespace(key: str) -> str:
+    """Namespace of a key: the part before the first ``:`` (``match:...``)."""
+    return key.split(":", 1)[0] if ":" in key else ""
+
+
 class MemoryCache(Cache):
-    """In-memory cache that never persists to disk."""
+    """In-memory cache that never persists to disk.
 
-    def __init__(self):
-        self._data: Dict[str, Any] = {}
+    Unbounded by default. ``max_entries`` and/or ``max_bytes`` (estimated
+    from the JSON encoding) cap it, evicting least recently used entries.
+    ``ttl_seconds`` expires entries, and ``namespace_ttls`` overrides it per
+    key namespace, e.g. ``{"match": 3600}``.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.namespace_ttls = dict(namespace_ttls or {})
+        # key -> (value, expires_at, size in bytes)
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
 
     def get(self, key: str, default: Optional[Any] = None) -> Any:
-        return self._data.get(key, default)
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
 
     def set(self, key: str, value: Any) -> None:
-        self._data[key] = value
+        self.set_until(key, value, None)
+
+    def set_until(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        ttl = self.namespace_ttls.get(cache_namespace(key), self.ttl_seconds)
+        if ttl is not None:
+            own_expiry = time.time() + ttl
+            expires_at = min(expires_at or own_expiry, own_expiry)
+        size = self._estimate_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            self._discard(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
 
     def persist(self) -> None:
         return None
 
+    def expires_at(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._live_entry(key)
+            return entry[1] if entry is not None else None
+
     def __contains__(self, key: str) -> bool:
-        return key in self._data
+        with self._lock:
+            return self._live_entry(key) is not None
 
     def as_dict(self) -> Dict[str, Any]:
-        return dict(self._data)
+        with self._lock:
+            now = time.time()
+            return {
+                key: value
+                for key, (value, expires_at, _) in self._data.items()
+                if expires_at is None or expires_at >= now
+            }
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._data),
+                size_bytes=self._bytes,
+            )
+
+    def _live_entry(self, key: str) -> Optional[Tuple[Any, Optional[float], int]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] < time.time():
+            self._discard(key)
+            return None
+        return entry
+
+    def _discard(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value))
+        except (TypeError, ValueError):
+            return len(repr(value))
 
 
 class FileCache(Cache):
@@ -71,27 +200,32 @@ class FileCache(Cache):
     def __init__(self, cache_file: Union[str, Path], auto_persist: bool = True):
         self.cache_path = self._resolve_repo_file(cache_file)
         self.auto_persist = auto_persist
+        # Guards _data and the file so worker threads can share one cache.
+        self._lock = threading.RLock()
         self._data: Dict[str, Any] = self._load()
 
     def get(self, key: str, default: Optional[Any] = None) -> Any:
         return self._data.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
-        self._data[key] = value
-        if self.auto_persist:
-            self.persist()
+        with self._lock:
+            self._data[key] = value
+            if self.auto_persist:
+                self.persist()
 
     def persist(self) -> None:
-        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cache_path, "w") as file:
-            json.dump(self._data, file, indent=4)
+        with self._lock:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w") as file:
+                json.dump(self._data, file, indent=4)
         logging.info("Saved cache to %s", self.cache_path)
 
     def __contains__(self, key: str) -> bool:
         return key in self._data
 
     def as_dict(self) -> Dict[str, Any]:
-        return dict(self._data)
+        with self._lock:
+            return dict(self._data)
 
     def _load(self) -> Dict[str, Any]:
         if self.cache_path.exists():
@@ -108,19 +242,589 @@ class FileCache(Cache):
         return cache_path
 
 
-def create_cache(cache_target: Optional[Union[str, Path]]) -> Cache:
+class JsonLinesCache(Cache):
+    """Append-only JSON-lines cache.
+
+    Each ``set`` appends a single ``{"k": ..., "v": ...}`` record instead of
+    rewriting the whole file; later records win when the log is replayed.
+    The file is loaded lazily on first access and compacted (one record per
+    key) on ``persist()`` or once superseded records outnumber live ones.
+    """
+
+    def __init__(
+        self,
+        cache_file: Union[str, Path],
+        auto_persist: bool = True,
+        compact_min_records: int = 1000,
+    ):
+        self.cache_path = FileCache._resolve_repo_file(cache_file)
+        self.auto_persist = auto_persist
+        self.compact_min_records = compact_min_records
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._log_records = 0
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return self._loaded().get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            data = self._loaded()
+            data[key] = value
+            if not self.auto_persist:
+                return
+            self._append(key, value)
+            if self._needs_compaction():
+                self._compact()
+
+    def persist(self) -> None:
+        with self._lock:
+            if self._data is None:
+                return
+            self._compact()
+        logging.info("Saved cache to %s", self.cache_path)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._loaded()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._loaded())
+
+    def _loaded(self) -> Dict[str, Any]:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._load()
+        return self._data
+
+    def _load(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        self._log_records = 0
+        if not self.cache_path.exists():
+            return data
+        with open(self.cache_path, "r") as file:
+            for line_no, line in enumerate(file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append can leave a partial last line behind.
+                    logging.warning(
+                        "Skipping corrupt cache record %s:%s", self.cache_path, line_no
+                    )
+                    continue
+                data[record["k"]] = record["v"]
+                self._log_records += 1
+        return data
+
+    def _append(self, key: str, value: Any) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, "a") as file:
+            file.write(json.dumps({"k": key, "v": value}) + "\n")
+        self._log_records += 1
+
+    def _needs_compaction(self) -> bool:
+        live = len(self._data or {})
+        return (
+            self._log_records > self.compact_min_records
+            and self._log_records > 2 * live
+        )
+
+    def _compact(self) -> None:
+        data = self._data or {}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(tmp_path, "w") as file:
+            for key, value in data.items():
+                file.write(json.dumps({"k": key, "v": value}) + "\n")
+        os.replace(tmp_path, self.cache_path)
+        self._log_records = len(data)
+
+
+class SqliteCache(Cache):
+    """SQLite backed cache with per-entry timestamps and optional TTL.
+
+    Lookups hit the primary-key index, so nothing is loaded up front and
+    startup only costs opening the database. WAL mode lets several
+    processes share the same file. ``namespace_ttls`` overrides the TTL per
+    key namespace, as for ``MemoryCache``.
+    """
+
+    def __init__(
+        self,
+        cache_file: Union[str, Path],
+        ttl_seconds: Optional[float] = None,
+        timeout_seconds: float = 30.0,
+        namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+    ):
+        self.cache_path = FileCache._resolve_repo_file(cache_file)
+        self.ttl_seconds = ttl_seconds
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.timeout_seconds = timeout_seconds
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE key = ? AND updated_at >= ?",
+                (key, self._cutoff(key)),
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_until(key, value, None)
+
+    def set_until(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        # Entries expire ttl_seconds after updated_at, so an earlier expiry is
+        # stored as a backdated timestamp.
+        updated_at = time.time()
+        ttl = self._ttl(key)
+        if ttl is not None and expires_at is not None:
+            updated_at = min(updated_at, expires_at - ttl)
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), updated_at),
+            )
+
+    def expires_at(self, key: str) -> Optional[float]:
+        ttl = self._ttl(key)
+        if ttl is None:
+            return None
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT updated_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] + ttl if row else None
+
+    def persist(self) -> None:
+        # Writes are committed immediately; use persist to drop expired rows.
+        ttls = [self.ttl_seconds, *self.namespace_ttls.values()]
+        if self._conn is None or all(ttl is None for ttl in ttls):
+            return
+        with self._lock:
+            rows = self._conn.execute("SELECT key, updated_at FROM cache").fetchall()
+            expired = [
+                (key,) for key, updated_at in rows if updated_at < self._cutoff(key)
+            ]
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", expired)
+        if expired:
+            logging.info(
+                "Purged %s expired entries from %s", len(expired), self.cache_path
+            )
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM cache WHERE key = ? AND updated_at >= ?",
+                (key, self._cutoff(key)),
+            ).fetchone()
+        return row is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, value, updated_at FROM cache"
+            ).fetchall()
+        return {
+            key: json.loads(value)
+            for key, value, updated_at in rows
+            if updated_at >= self._cutoff(key)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _ttl(self, key: str) -> Optional[float]:
+        return self.namespace_ttls.get(cache_namespace(key), self.ttl_seconds)
+
+    def _cutoff(self, key: str) -> float:
+        ttl = self._ttl(key)
+        if ttl is None:
+            return float("-inf")
+        return time.time() - ttl
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.cache_path,
+                timeout=self.timeout_seconds,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+
+class SharedStore(ABC):
+    """Minimal string key/value store shared between processes.
+
+    Implementations only need get/set with an optional TTL; values arrive
+    already JSON-encoded. ``SharedStoreCache`` adapts a store to ``Cache``.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored string or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store ``value``, expiring it after ``ttl_seconds`` when given."""
+
+
+class DictSharedStore(SharedStore):
+    """In-process stand-in for a shared store, for tests and local runs.
+
+    Stores created through ``dict://<name>`` URLs are registered by name, so
+    every cache pointing at the same name sees the same data, much like
+    separate Lambda instances talking to one Redis.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = None if ttl_seconds is None else time.time() + ttl_seconds
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+
+class RedisSharedStore(SharedStore):
+    """Shared store backed by Redis (needs the ``redis`` extra)."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisSharedStore":
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise RuntimeError(
+                "redis:// caches need the redis package; "
+                "install autogigification[redis]"
+            ) from exc
+        return cls(redis.Redis.from_url(url, socket_timeout=2.0))
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        ttl = max(1, int(ttl_seconds)) if ttl_seconds is not None else None
+        self.client.set(key, value, ex=ttl)
+
+
+class SharedStoreCache(Cache):
+    """``Cache`` on top of a ``SharedStore``.
+
+    Keys are prefixed with ``namespace`` so several caches can share a
+    store. The store is a best-effort tier: errors are logged and treated
+    as misses so an unreachable server never fails a request.
+    ``namespace_ttls`` overrides the TTL per key namespace (the part of the
+    key before its first ``:``), as for ``MemoryCache``.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        namespace: str = "ag",
+        ttl_seconds: Optional[float] = None,
+        namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+    ):
+        self.store = store
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.namespace_ttls = dict(namespace_ttls or {})
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        try:
+            raw = self.store.get(self._key(key))
+        except Exception as exc:
+            logging.warning("Shared cache read failed for %s: %s", key, exc)
+            return default
+        return json.loads(raw) if raw is not None else default
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_until(key, value, None)
+
+    def set_until(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        ttl = self.namespace_ttls.get(cache_namespace(key), self.ttl_seconds)
+        if expires_at is not None:
+            remaining = max(0.0, expires_at - time.time())
+            ttl = remaining if ttl is None else min(ttl, remaining)
+        try:
+            self.store.set(self._key(key), json.dumps(value), ttl)
+        except Exception as exc:
+            logging.warning("Shared cache write failed for %s: %s", key, exc)
+
+    def persist(self) -> None:
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+
+class TieredCache(Cache):
+    """Read-through, write-through stack of caches, fastest first.
+
+    A hit in a slower tier is copied into the faster ones above it, so the
+    next lookup is served from memory; the copy keeps the entry's remaining
+    TTL so it never outlives the original. Writes go to every tier.
+    """
+
+    def __init__(self, tiers: Sequence[Cache]):
+        if not tiers:
+            raise ValueError("TieredCache needs at least one tier")
+        self.tiers: List[Cache] = list(tiers)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        for depth, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                if depth:
+                    expires_at = tier.expires_at(key)
+                    for faster in self.tiers[:depth]:
+                        faster.set_until(key, value, expires_at)
+                with self._lock:
+                    self._hits += 1
+                return value
+        with self._lock:
+            self._misses += 1
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def persist(self) -> None:
+        for tier in self.tiers:
+            tier.persist()
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in tier for tier in self.tiers)
+
+    def as_dict(self) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for tier in reversed(self.tiers):
+            merged.update(tier.as_dict())
+        return merged
+
+    def stats(self) -> CacheStats:
+        """Hits in any tier; evictions and sizes come from the fastest tier."""
+        first = self.tiers[0].stats()
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=first.evictions,
+                entries=first.entries,
+                size_bytes=first.size_bytes,
+            )
+
+
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+# Default cap for in-memory caches built by create_cache, so long-lived
+# processes stay bounded.
+DEFAULT_MEMORY_MAX_ENTRIES = 10_000
+
+
+def wrap_expiring(value: Any, ttl_seconds: Optional[float]) -> Dict[str, Any]:
+    """Wrap ``value`` with an absolute expiry so any backend can honour it."""
+    expires_at = None if ttl_seconds is None else time.time() + ttl_seconds
+    return {"value": value, "expires_at": expires_at}
+
+
+def unwrap_expiring(entry: Any, default: Optional[Any] = None) -> Any:
+    """Return the value stored by ``wrap_expiring`` or ``default`` if expired."""
+    if not isinstance(entry, dict) or "value" not in entry:
+        return default
+    expires_at = entry.get("expires_at")
+    if expires_at is not None and expires_at < time.time():
+        return default
+    return entry["value"]
+
+
+_shared_stores: Dict[str, SharedStore] = {}
+_shared_stores_lock = threading.Lock()
+
+SharedStoreFactory = Callable[[str], SharedStore]
+
+
+def _dict_store(url: str) -> SharedStore:
+    name = urlparse(url).netloc or "default"
+    with _shared_stores_lock:
+        return _shared_stores.setdefault(f"dict://{name}", DictSharedStore())
+
+
+_store_factories: Dict[str, SharedStoreFactory] = {
+    "dict": _dict_store,
+    "redis": RedisSharedStore.from_url,
+    "rediss": RedisSharedStore.from_url,
+}
+
+
+def register_shared_store(scheme: str, factory: SharedStoreFactory) -> None:
+    """Make ``<scheme>://`` cache URLs build their store with ``factory(url)``."""
+    _store_factories[scheme.lower()] = factory
+
+
+def _create_file_cache(
+    cache_target: Union[str, Path],
+    ttl_seconds: Optional[float],
+    namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+) -> Cache:
+    cache_name = str(cache_target).strip().lower()
+    if cache_name.endswith(".jsonl"):
+        return JsonLinesCache(cache_target)
+
+    if cache_name.endswith(SQLITE_SUFFIXES):
+        return SqliteCache(
+            cache_target, ttl_seconds=ttl_seconds, namespace_ttls=namespace_ttls
+        )
+
+    return FileCache(cache_target)
+
+
+def _create_memory_cache(
+    query: Dict[str, List[str]],
+    ttl_seconds: Optional[float],
+    namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+) -> MemoryCache:
+    """Build a bounded MemoryCache from ``memory://`` query options.
+
+    ``max_entries`` (default 10000, ``0`` for unbounded), ``max_bytes``,
+    ``ttl`` and ``ttl.<namespace>`` are accepted; TTLs of ``none`` never
+    expire. Query TTLs take precedence over the ones passed in.
+    """
+
+    def _ttl(raw: str) -> Optional[float]:
+        return None if raw.lower() in {"none", "never"} else float(raw)
+
+    max_entries = int(query.get("max_entries", [DEFAULT_MEMORY_MAX_ENTRIES])[0])
+    max_bytes = query.get("max_bytes", [None])[0]
+    if "ttl" in query:
+        ttl_seconds = _ttl(query["ttl"][0])
+    namespace_ttls = {
+        **(namespace_ttls or {}),
+        **{
+            name[len("ttl.") :]: _ttl(values[0])
+            for name, values in query.items()
+            if name.startswith("ttl.")
+        },
+    }
+    return MemoryCache(
+        max_entries=max_entries or None,
+        max_bytes=int(max_bytes) if max_bytes else None,
+        ttl_seconds=ttl_seconds,
+        namespace_ttls=namespace_ttls,
+    )
+
+
+def _create_cache_from_url(
+    url: str,
+    ttl_seconds: Optional[float],
+    namespace: str,
+    namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+) -> Cache:
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    if scheme == "memory":
+        return _create_memory_cache(
+            parse_qs(parsed.query), ttl_seconds, namespace_ttls
+        )
+    if scheme == "file":
+        # file:///abs/path and file://relative/path both work.
+        return _create_file_cache(
+            parsed.netloc + parsed.path, ttl_seconds, namespace_ttls
+        )
+    if scheme in _store_factories:
+        namespace = parse_qs(parsed.query).get("namespace", [namespace])[0]
+        return SharedStoreCache(
+            _store_factories[scheme](url),
+            namespace=namespace,
+            ttl_seconds=ttl_seconds,
+            namespace_ttls=namespace_ttls,
+        )
+    raise ValueError(f"Unsupported cache URL scheme: {scheme}")
+
+
+def create_cache(
+    cache_target: Optional[Union[str, Path]],
+    ttl_seconds: Optional[float] = None,
+    *,
+    namespace: str = "ag",
+    namespace_ttls: Optional[Mapping[str, Optional[float]]] = None,
+) -> Cache:
     """Factory for cache instances.
 
-    Passing None or an empty string will return an in-memory cache.
+    Passing None or an empty string will return an in-memory LRU cache of
+    at most ``DEFAULT_MEMORY_MAX_ENTRIES`` entries. Paths ending in
+    ``.jsonl`` use the append-only JSON-lines backend and paths ending in
+    ``.sqlite``/``.sqlite3``/``.db`` use SQLite. ``ttl_seconds``
+    and ``namespace_ttls`` (per key namespace, None meaning no expiry) are
+    only honoured by backends that store expiry (SQLite, shared stores and
+    ``memory://`` tiers).
+
+    The target may also be a comma-separated list of URLs, fastest tier
+    first, which builds a ``TieredCache``::
+
+        memory://,file:///tmp/ag/setlists.sqlite,redis://cache:6379/0?namespace=setlists
+
+    ``memory://`` is a bounded in-process LRU (see ``_create_memory_cache``
+    for its options), ``file://`` takes any of the paths above
+    and other schemes (``redis://``, ``dict://`` or ones added with
+    ``register_shared_store``) use a ``SharedStoreCache`` whose keys are
+    prefixed with ``namespace`` unless the URL sets its own.
     """
     if cache_target is None:
-        return MemoryCache()
+        return MemoryCache(max_entries=DEFAULT_MEMORY_MAX_ENTRIES)
 
     cache_name = str(cache_target).strip().lower()
     if cache_name in {"", "none", "null", "memory"}:
-        return MemoryCache()
+        return MemoryCache(max_entries=DEFAULT_MEMORY_MAX_ENTRIES)
 
-    return FileCache(cache_target)
+    if "://" in cache_name:
+        urls = [url.strip() for url in str(cache_target).split(",") if url.strip()]
+        tiers = [
+            _create_cache_from_url(url, ttl_seconds, namespace, namespace_ttls)
+            for url in urls
+        ]
+        return tiers[0] if len(tiers) == 1 else TieredCache(tiers)
+
+    return _create_file_cache(cache_target, ttl_seconds, namespace_ttls)
 
 
 def create_null_cache() -> Cache:
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import weakref
+from typing import Any, Optional
+
+from ag.utils.rate_limit import RateLimiter, parse_retry_after
+
+DEFAULT_ASYNC_POOL_SIZE = 100
+DEFAULT_ASYNC_TIMEOUT_SECONDS = 10.0
+
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def require_httpx():
+    try:
+        import httpx
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError(
+            "The async clients need httpx; install autogigification[async]"
+        ) from exc
+    return httpx
+
+
+def create_async_client(
+    pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+    timeout: float = DEFAULT_ASYNC_TIMEOUT_SECONDS,
+):
+    """Build an ``httpx.AsyncClient`` whose pool fits ``pool_size`` connections."""
+    httpx = require_httpx()
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=timeout,
+    )
+
+
+def get_shared_async_client(
+    pool_size: int = DEFAULT_ASYNC_POOL_SIZE,
+    timeout: float = DEFAULT_ASYNC_TIMEOUT_SECONDS,
+):
+    """Return the connection pool shared by every async client on this loop.
+
+    httpx clients are bound to the event loop that first used them, so there
+    is one pool per running loop; setlist.fm and Spotify requests share it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_async_client(pool_size, timeout)
+        _shared_clients[loop] = client
+    return client
+
+
+async def close_shared_async_client() -> None:
+    """Close this loop's shared pool, e.g. before the loop shuts down."""
+    client = _shared_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def send_with_retries(
+    client,
+    method: str,
+    url: str,
+    *,
+    limiter: RateLimiter,
+    max_retries: int,
+    description: str,
+    **kwargs: Any,
+):
+    """Send a request through ``limiter``, retrying 429s up to ``max_retries``.
+
+    Mirrors the blocking clients: each 429 pauses (and, for adaptive
+    limiters, slows) every caller sharing the limiter. The last response is
+    returned as-is, so callers decide what a final 429 or error means.
+    """
+    response: Optional[Any] = None
+    for attempt in range(max_retries + 1):
+        async with limiter:
+            response = await client.request(method, url, **kwargs)
+        if response.status_code != 429:
+            limiter.on_success()
+            return response
+        pause = limiter.on_throttled(parse_retry_after(response.headers))
+        if attempt < max_retries:
+            logging.warning(
+                "Rate limited fetching %s. Retrying in %.1f seconds.",
+                description,
+                pause,
+            )
+    logging.error(
+        "Still rate limited fetching %s after %s retries", description, max_retries
+    )
+    return response
@@ -1,10 +1,222 @@
+import functools
+import itertools
 import logging
-from typing import Any, Dict, Optional
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ag.cache import Cache
-from ag.utils.rate_limit import NullRateLimiter, RateLimiter, retry_after
+from ag.utils.rate_limit import (
+    DEFAULT_MAX_RETRIES,
+    NullRateLimiter,
+    RateLimiter,
+    parse_retry_after,
+)
+
+SETLIST_DATE_FORMAT = "%d-%m-%Y"
+SETLIST_FM_BASE_URL = "https://api.setlist.fm/rest/1.0"
+DEFAULT_POOL_SIZE = 10
+# (connect, read) timeouts in seconds.
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 10.0)
+# Artist MBIDs never change, so their mappings should not expire with the
+# setlists; build the setlist cache with these namespace TTLs.
+MBID_CACHE_NAMESPACE = "mbid"
+SETLIST_CACHE_NAMESPACE_TTLS: Dict[str, Optional[float]] = {MBID_CACHE_NAMESPACE: None}
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Build a keep-alive session whose pool fits ``pool_size`` concurrent calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_shared_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Return the process-wide session, creating it on first use.
+
+    Living at module level means warm Lambda invocations reuse the open
+    connection to api.setlist.fm instead of paying for a new TLS handshake.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session(pool_size)
+        return _shared_session
+
+
+def pick_artist_mbid(artists: List[Dict[str, Any]], artist_name: str) -> Optional[str]:
+    """Prefer an exact (case-insensitive) name match, else the top result."""
+    wanted = artist_name.strip().casefold()
+    for artist in artists:
+        if artist.get("mbid") and artist.get("name", "").casefold() == wanted:
+            return artist["mbid"]
+    for artist in artists:
+        if artist.get("mbid"):
+            return artist["mbid"]
+    return None
+
+
+def artist_search_request(artist_name: str) -> Tuple[str, Dict[str, Any]]:
+    """URL and params of the artist search used to resolve an MBID."""
+    return (
+        f"{SETLIST_FM_BASE_URL}/search/artists",
+        {"artistName": artist_name, "sort": "relevance", "p": 1},
+    )
+
+
+def setlist_page_request(
+    artist_name: str, page: int, mbid: Optional[str]
+) -> Tuple[str, Dict[str, Any]]:
+    """URL and params of one setlist page, by MBID when it is known."""
+    if mbid:
+        return f"{SETLIST_FM_BASE_URL}/artist/{mbid}/setlists", {"p": page}
+    return (
+        f"{SETLIST_FM_BASE_URL}/search/setlists",
+        {"artistName": artist_name, "p": page},
+    )
+
+
+def mbid_cache_key(artist_name: str) -> str:
+    return f"{MBID_CACHE_NAMESPACE}:{artist_name.strip().casefold()}"
+
+
+def page_cache_key(artist_name: str, page: int, mbid: Optional[str]) -> str:
+    if mbid:
+        return f"setlists:{mbid}:p{page}"
+    # Name-based fallback keeps the legacy keys (bare artist for page 1).
+    return artist_name if page == 1 else f"{artist_name}::p{page}"
+
+
+def cached_artist_mbid(cache: Cache, artist_name: str) -> Tuple[bool, Optional[str]]:
+    """Return ``(hit, mbid)``; a hit with no MBID means no such artist."""
+    cached = cache.get(mbid_cache_key(artist_name))
+    if cached is None:
+        return False, None
+    return True, cached.get("mbid")
+
+
+def remember_artist_mbid(
+    cache: Cache, artist_name: str, payload: Dict[str, Any]
+) -> Optional[str]:
+    """Pick the MBID from an artist search response and cache the mapping."""
+    mbid = pick_artist_mbid(payload.get("artist", []), artist_name)
+    if mbid is None:
+        logging.warning("No setlist.fm artist found for %s", artist_name)
+    cache.set(mbid_cache_key(artist_name), {"mbid": mbid})
+    return mbid
+
+
+def decode_response(response: Any, description: str) -> Optional[Dict[str, Any]]:
+    """Body on 200, {} on 404 (setlist.fm's "no results"), else None.
+
+    Works for ``requests`` and ``httpx`` responses alike. A final 429 was
+    already logged by the retry loop.
+    """
+    if response.status_code == 200:
+        return response.json()
+    if response.status_code == 404:
+        return {}
+    if response.status_code != 429:
+        logging.error("Failed to fetch %s: %s", description, response.text)
+    return None
+
+
+def _oldest_event_date(page: Dict[str, Any]) -> Optional[datetime]:
+    dates = []
+    for event in page.get("setlist", []):
+        try:
+            dates.append(datetime.strptime(event["eventDate"], SETLIST_DATE_FORMAT))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return min(dates) if dates else None
+
+
+def past_cutoff(page: Dict[str, Any], cutoff: Optional[datetime]) -> bool:
+    """Whether ``page`` already reaches setlists older than ``cutoff``."""
+    if cutoff is None:
+        return False
+    oldest = _oldest_event_date(page)
+    return oldest is not None and oldest < cutoff
+
+
+class SetlistPages:
+    """Which pages to fetch after the first one, and how to merge them.
+
+    Clients fetch each window of page numbers (concurrently, however their
+    transport does it) and hand the pages back through :meth:`add` until
+    :meth:`next_window` returns None: when ``max_pages`` or the last page
+    is reached, a page comes back empty, or setlists pass ``max_age_days``.
+    """
+
+    def __init__(
+        self,
+        first_page: Dict[str, Any],
+        *,
+        max_pages: int,
+        max_age_days: Optional[int],
+        page_workers: int,
+    ):
+        total = int(first_page.get("total") or 0)
+        per_page = int(first_page.get("itemsPerPage") or 0) or len(
+            first_page.get("setlist", [])
+        )
+        available_pages = math.ceil(total / per_page) if per_page else 1
+        self.last_page = min(max_pages, available_pages)
+        self.cutoff = (
+            datetime.now() - timedelta(days=max_age_days)
+            if max_age_days is not None
+            else None
+        )
+        self.page_workers = max(1, page_workers)
+        self.pages: List[Dict[str, Any]] = [first_page]
+        self._next_page = 2
+        self._done = False
+
+    def next_window(self) -> Optional[range]:
+        if (
+            self._done
+            or self._next_page > self.last_page
+            or past_cutoff(self.pages[-1], self.cutoff)
+        ):
+            return None
+        window_end = min(self.last_page, self._next_page + self.page_workers - 1)
+        return range(self._next_page, window_end + 1)
+
+    def add(self, fetched: List[Dict[str, Any]]) -> None:
+        """Keep the pages up to the first empty one, which ends the fetch."""
+        complete = list(
+            itertools.takewhile(lambda page: page and page.get("setlist"), fetched)
+        )
+        self.pages.extend(complete)
+        self._done = len(complete) < len(fetched)
+        self._next_page += len(fetched)
+
+    def merged(self, artist_name: str) -> Dict[str, Any]:
+        """All fetched setlists in one payload shaped like the first page."""
+        first_page = self.pages[0]
+        if len(self.pages) == 1:
+            return first_page
+        merged = dict(first_page)
+        merged["setlist"] = [
+            event for page in self.pages for event in page.get("setlist", [])
+        ]
+        logging.info(
+            "Fetched %s pages (%s setlists) for %s",
+            len(self.pages),
+            len(merged["setlist"]),
+            artist_name,
+        )
+        return merged
 
 
 class SetlistFmClient:
@@ -15,40 +227,130 @@ class SetlistFmClient:
         api_key: str,
         cache: Cache,
         rate_limiter: Optional[RateLimiter] = None,
+        *,
+        max_pages: int = 1,
+        max_age_days: Optional[int] = None,
+        page_workers: int = 4,
+        session: Optional[requests.Session] = None,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
     ):
         self.api_key = api_key
         self.cache = cache
         self.rate_limiter = rate_limiter or NullRateLimiter()
+        self.max_pages = max(1, max_pages)
+        self.max_age_days = max_age_days
+        self.page_workers = max(1, page_workers)
+        self.session = session or get_shared_session()
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
 
-    def get_recent_setlists(self, artist_name: str) -> Dict[str, Any]:
-        cached_setlists = self.cache.get(artist_name)
-        if cached_setlists is not None:
-            logging.info("Using cached setlist for %s", artist_name)
-            return cached_setlists
+    def get_recent_setlists(
+        self,
+        artist_name: str,
+        *,
+        max_pages: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Fetch up to ``max_pages`` pages of recent setlists for an artist.
 
+        Pages after the first are requested concurrently (still throttled by
+        the rate limiter) and fetching stops once a page reaches setlists
+        older than ``max_age_days``. Setlists from all fetched pages are
+        merged into a single payload shaped like the first page.
+        """
+        mbid = self.resolve_artist_mbid(artist_name)
+        fetch_page = functools.partial(self._get_page, artist_name, mbid=mbid)
+
+        first_page = fetch_page(1)
+        if not first_page:
+            return {}
+
+        pages = SetlistPages(
+            first_page,
+            max_pages=max(1, max_pages or self.max_pages),
+            max_age_days=(
+                max_age_days if max_age_days is not None else self.max_age_days
+            ),
+            page_workers=self.page_workers,
+        )
+        window = pages.next_window()
+        while window is not None:
+            with ThreadPoolExecutor(max_workers=len(window)) as executor:
+                pages.add(list(executor.map(fetch_page, window)))
+            window = pages.next_window()
+        return pages.merged(artist_name)
+
+    def resolve_artist_mbid(self, artist_name: str) -> Optional[str]:
+        """Resolve an artist name to its MusicBrainz ID, caching the mapping.
+
+        Returns None when setlist.fm knows no such artist (also cached) or
+        the lookup failed (not cached, so it is retried next time).
+        """
+        hit, mbid = cached_artist_mbid(self.cache, artist_name)
+        if hit:
+            return mbid
+
+        url, params = artist_search_request(artist_name)
+        payload = self._request_json(url, params, f"artist {artist_name}")
+        if payload is None:
+            return None
+        return remember_artist_mbid(self.cache, artist_name, payload)
+
+    def _get(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        headers = {"x-api-key": self.api_key, "Accept": "application/json"}
+        return self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+
+    def _request_json(
+        self, url: str, params: Dict[str, Any], description: str
+    ) -> Optional[Dict[str, Any]]:
+        """GET ``url`` through the rate limiter, retrying 429s up to max_retries.
+
+        Returns the decoded body on 200, an empty dict on 404 (setlist.fm's
+        answer for "no results") and None for any other failure.
+        """
         if not self.api_key:
             raise RuntimeError("SETLIST_FM_API_KEY not configured")
 
-        url = f"https://api.setlist.fm/rest/1.0/search/setlists?artistName={artist_name}&p=1"
-        headers = {"x-api-key": self.api_key, "Accept": "application/json"}
+        try:
+            for attempt in range(self.max_retries + 1):
+                with self.rate_limiter:
+                    response = self._get(url, params)
+                if response.status_code != 429:
+                    self.rate_limiter.on_success()
+                    break
+                # The pause makes every thread sharing the limiter back off.
+                pause = self.rate_limiter.on_throttled(
+                    parse_retry_after(response.headers)
+                )
+                if attempt == self.max_retries:
+                    logging.error(
+                        "Still rate limited fetching %s after %s retries",
+                        description,
+                        self.max_retries,
+                    )
+                    return None
+                logging.warning(
+                    "Rate limited fetching %s. Retrying in %.1f seconds.",
+                    description,
+                    pause,
+                )
+        except requests.RequestException as exc:
+            logging.error("Request for %s failed: %s", description, exc)
+            return None
+        return decode_response(response, description)
 
-        with self.rate_limiter:
-            response = requests.get(url, headers=headers)
-
-        if response.status_code == 429:
-            retry_after_seconds = int(response.headers.get("Retry-After", "2"))
-            logging.warning(
-                "Rate limited fetching setlists for %s. Retrying in %s seconds.",
-                artist_name,
-                retry_after_seconds,
-            )
-            with retry_after(retry_after_seconds, self.rate_limiter):
-                response = requests.get(url, headers=headers)
-
-        if response.status_code == 200:
-            setlists = response.json()
-            self.cache.set(artist_name, setlists)
-            return setlists
-
-        logging.error("Failed to fetch setlists for %s: %s", artist_name, response.text)
-        return {}
+    def _get_page(
+        self, artist_name: str, page: int, mbid: Optional[str] = None
+    ) -> Dict[str, Any]:
+        cache_key = page_cache_key(artist_name, page, mbid)
+        cached_setlists = self.cache.get(cache_key)
+        if cached_setlists is not None:
+            logging.info("Using cached setlist for %s (page %s)", artist_name, page)
+            return cached_setlists
+
+        url, params = setlist_page_request(artist_name, page, mbid)
+        setlists = self._request_json(url, params, f"setlists for {artist_name}")
+        if setlists:
+            self.cache.set(cache_key, setlists)
+        return setlists or {}
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from ag.cache import Cache
+from ag.clients.async_http import (
+    get_shared_async_client,
+    require_httpx,
+    send_with_retries,
+)
+from ag.clients.setlist_fm import (
+    SetlistPages,
+    artist_search_request,
+    cached_artist_mbid,
+    decode_response,
+    page_cache_key,
+    remember_artist_mbid,
+    setlist_page_request,
+)
+from ag.utils.rate_limit import DEFAULT_MAX_RETRIES, NullRateLimiter, RateLimiter
+
+
+class AsyncSetlistFmClient:
+    """asyncio counterpart of :class:`SetlistFmClient` built on httpx.
+
+    It reads and writes the same cache keys, so sync and async callers can
+    share a cache. Requests go through the shared async pool unless an
+    ``httpx.AsyncClient`` is passed in.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        cache: Cache,
+        rate_limiter: Optional[RateLimiter] = None,
+        *,
+        max_pages: int = 1,
+        max_age_days: Optional[int] = None,
+        page_workers: int = 4,
+        client=None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        self.api_key = api_key
+        self.cache = cache
+        self.rate_limiter = rate_limiter or NullRateLimiter()
+        self.max_pages = max(1, max_pages)
+        self.max_age_days = max_age_days
+        self.page_workers = max(1, page_workers)
+        self.client = client
+        self.max_retries = max(0, max_retries)
+
+    async def get_recent_setlists(
+        self,
+        artist_name: str,
+        *,
+        max_pages: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Fetch and merge up to ``max_pages`` pages, like the sync client."""
+        mbid = await self.resolve_artist_mbid(artist_name)
+        first_page = await self._get_page(artist_name, 1, mbid)
+        if not first_page:
+            return {}
+
+        pages = SetlistPages(
+            first_page,
+            max_pages=max(1, max_pages or self.max_pages),
+            max_age_days=(
+                max_age_days if max_age_days is not None else self.max_age_days
+            ),
+            page_workers=self.page_workers,
+        )
+        window = pages.next_window()
+        while window is not None:
+            fetched = await asyncio.gather(
+                *(self._get_page(artist_name, page, mbid) for page in window)
+            )
+            pages.add(list(fetched))
+            window = pages.next_window()
+        return pages.merged(artist_name)
+
+    async def resolve_artist_mbid(self, artist_name: str) -> Optional[str]:
+        hit, mbid = cached_artist_mbid(self.cache, artist_name)
+        if hit:
+            return mbid
+
+        url, params = artist_search_request(artist_name)
+        payload = await self._request_json(url, params, f"artist {artist_name}")
+        if payload is None:
+            return None
+        return remember_artist_mbid(self.cache, artist_name, payload)
+
+    async def _request_json(
+        self, url: str, params: Dict[str, Any], description: str
+    ) -> Optional[Dict[str, Any]]:
+        """Same contract as ``SetlistFmClient._request_json``: body, {} or None."""
+        if not self.api_key:
+            raise RuntimeError("SETLIST_FM_API_KEY not configured")
+
+        httpx = require_httpx()
+        client = self.client or get_shared_async_client()
+        headers = {"x-api-key": self.api_key, "Accept": "application/json"}
+        try:
+            response = await send_with_retries(
+                client,
+                "GET",
+                url,
+                limiter=self.rate_limiter,
+                max_retries=self.max_retries,
+                description=description,
+                headers=headers,
+                params=params,
+            )
+        except httpx.HTTPError as exc:
+            logging.error("Request for %s failed: %s", description, exc)
+            return None
+        return decode_response(response, description)
+
+    async def _get_page(
+        self, artist_name: str, page: int, mbid: Optional[str] = None
+    ) -> Dict[str, Any]:
+        cache_key = page_cache_key(artist_name, page, mbid)
+        cached_setlists = self.cache.get(cache_key)
+        if cached_setlists is not None:
+            logging.info("Using cached setlist for %s (page %s)", artist_name, page)
+            return cached_setlists
+
+        url, params = setlist_page_request(artist_name, page, mbid)
+        setlists = await self._request_json(url, params, f"setlists for {artist_name}")
+        if setlists:
+            self.cache.set(cache_key, setlists)
+        return setlists or {}
@@ -1,16 +1,45 @@
 import itertools
 import logging
+import threading
 import unicodedata
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import spotipy
+from spotipy.exceptions import SpotifyException
 from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
 
-from ag.cache import Cache
+from ag.cache import Cache, unwrap_expiring, wrap_expiring
+from ag.clients.spotify_auth import SpotifyTokenManager, get_token_manager
 from ag.config import SpotifyConfig
 from ag.models import Playlist, SongMatch
+from ag.services.playlist_sync import (
+    PLAYLIST_BATCH_SIZE,
+    PlaylistWrite,
+    playlist_track_ids,
+    playlist_writes,
+)
+from ag.utils.rate_limit import (
+    DEFAULT_MAX_RETRIES,
+    SPOTIFY_PLAYLIST_WRITE,
+    SPOTIFY_SEARCH,
+    RateLimiterRegistry,
+    parse_retry_after,
+)
+from ag.utils.single_flight import SingleFlight
 
 DEFAULT_SPOTIFY_SCOPES = "playlist-modify-public"
+TRACK_CACHE_FORMAT_VERSION = 2
+DEFAULT_NOT_FOUND_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_DISCOGRAPHY_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_PLAYLIST_INDEX_TTL_SECONDS = 60 * 60
+# Page size accepted by the current user's playlists endpoint.
+PLAYLISTS_PAGE_SIZE = 50
+# Maximum number of IDs accepted by the "get several albums" endpoint.
+ALBUMS_BATCH_SIZE = 20
+# spotipy retries these itself; 429 is left out so _call can feed it to the
+# adaptive rate limiter instead of spotipy sleeping invisibly.
+SPOTIPY_STATUS_FORCELIST = (500, 502, 503, 504)
 
 
 def normalize(s: str) -> str:
@@ -22,6 +51,321 @@ def normalize(s: str) -> str:
     )
 
 
+def chunks(lst: List[Any], n: int) -> Iterator[List[Any]]:
+    for i in range(0, len(lst), n):
+        yield lst[i : i + n]
+
+
+def track_url(track_id: str) -> str:
+    return f"https://open.spotify.com/track/{track_id}"
+
+
+def track_uri(track_id: str) -> str:
+    return track_id if track_id.startswith("spotify:") else f"spotify:track:{track_id}"
+
+
+def match_cache_key(song: str, band: str, fuzzy: bool) -> str:
+    mode = "fuzzy" if fuzzy else "exact"
+    return f"match:{mode}:{normalize(song)}|{normalize(band)}"
+
+
+def found_match(song: str, track_id: str, strategy: str) -> SongMatch:
+    return SongMatch(
+        name=song,
+        spotify_id=track_id,
+        spotify_url=track_url(track_id),
+        status="found",
+        strategy=strategy,
+    )
+
+
+def not_found_match(song: str, strategy: str) -> SongMatch:
+    return SongMatch(
+        name=song,
+        spotify_id=None,
+        spotify_url=None,
+        status="not_found",
+        strategy=strategy,
+    )
+
+
+def cached_match(cache: Cache, key: str, song: str) -> Optional[SongMatch]:
+    cached = unwrap_expiring(cache.get(key))
+    return SongMatch(name=song, **cached) if cached is not None else None
+
+
+def remember_match(
+    cache: Cache, key: str, match: SongMatch, not_found_ttl_seconds: Optional[float]
+) -> None:
+    """Memoize found matches indefinitely and misses for the not-found TTL."""
+    ttl = None if match.found else not_found_ttl_seconds
+    cache.set(
+        key,
+        wrap_expiring(
+            {
+                "spotify_id": match.spotify_id,
+                "spotify_url": match.spotify_url,
+                "status": match.status,
+                "strategy": match.strategy,
+            },
+            ttl,
+        ),
+    )
+
+
+def cached_search_candidates(
+    cache: Cache, query: str, band: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Candidates cached for ``query``; raw payloads are converted on read."""
+    cached_results = cache.get(query)
+    if cached_results is None:
+        return None
+    if not is_compact_search_results(cached_results):
+        logging.info("Migrating cached search results for %s", query)
+        cached_results = compact_search_results(cached_results, band)
+        cache.set(query, cached_results)
+    else:
+        logging.info("Using cache for %s", query)
+    return cached_results["candidates"]
+
+
+def remember_search_results(
+    cache: Cache, query: str, band: str, results: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    compact = compact_search_results(results, band)
+    cache.set(query, compact)
+    return compact["candidates"]
+
+
+def artist_cache_key(band: str) -> str:
+    return f"artist:{normalize(band)}"
+
+
+def cached_artist_id(cache: Cache, band: str) -> Tuple[bool, Optional[str]]:
+    """Return ``(hit, artist_id)``; a hit with no ID is a remembered miss."""
+    cached = unwrap_expiring(cache.get(artist_cache_key(band)))
+    if cached is None:
+        return False, None
+    return True, cached["id"]
+
+
+def remember_artist_id(
+    cache: Cache,
+    band: str,
+    results: Dict[str, Any],
+    not_found_ttl_seconds: Optional[float],
+) -> Optional[str]:
+    """Take the top artist search result and cache it (misses expire)."""
+    items = results.get("artists", {}).get("items", [])
+    artist_id = items[0]["id"] if items else None
+    ttl = None if artist_id else not_found_ttl_seconds
+    cache.set(artist_cache_key(band), wrap_expiring({"id": artist_id}, ttl))
+    return artist_id
+
+
+def discography_tracks(
+    album_tracks: Iterable[Dict[str, Any]], artist_id: str, release_count: int
+) -> List[Tuple[str, str]]:
+    """Deduplicated ``(track_id, normalized name)`` pairs in release order."""
+    tracks: List[Tuple[str, str]] = []
+    seen_track_ids = set()
+    for track in album_tracks:
+        if track["id"] in seen_track_ids:
+            continue
+        seen_track_ids.add(track["id"])
+        tracks.append((track["id"], normalize(track["name"])))
+    logging.info(
+        "Indexed %s tracks from %s releases for artist %s",
+        len(tracks),
+        release_count,
+        artist_id,
+    )
+    return tracks
+
+
+def cached_discography(cache: Cache, artist_id: str) -> Optional[Dict[str, Any]]:
+    """The cached ``wrap_expiring`` tracklist entry, unless missing or expired."""
+    entry = cache.get(f"discography:{artist_id}")
+    return entry if unwrap_expiring(entry) is not None else None
+
+
+def store_discography(
+    cache: Cache,
+    artist_id: str,
+    tracks: List[Tuple[str, str]],
+    ttl_seconds: Optional[float],
+) -> Dict[str, Any]:
+    entry = wrap_expiring([list(track) for track in tracks], ttl_seconds)
+    cache.set(f"discography:{artist_id}", entry)
+    return entry
+
+
+def playlist_index_key(username: Optional[str]) -> str:
+    return f"playlists:{username}"
+
+
+def index_playlists(playlists: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """Map playlist names to ``{"id", "url"}`` from the user's listing."""
+    index: Dict[str, Dict[str, str]] = {}
+    for playlist in playlists:
+        if not playlist:
+            continue
+        # The API lists the most recently added first; keep that one on
+        # name clashes, as the previous first-page scan did.
+        index.setdefault(
+            playlist["name"],
+            {"id": playlist["id"], "url": playlist["external_urls"]["spotify"]},
+        )
+    logging.info("Indexed %s playlists", len(index))
+    return index
+
+
+def indexed_playlist(
+    index: Dict[str, Dict[str, str]], shared: Any, playlist_name: str
+) -> Optional[Playlist]:
+    """Find ``playlist_name`` in the client's index or the shared cache entry.
+
+    The shared entry covers playlists another job created after this
+    client loaded its copy.
+    """
+    entry = index.get(playlist_name)
+    if entry is None:
+        entry = (unwrap_expiring(shared) or {}).get(playlist_name)
+    if entry is None:
+        return None
+    return Playlist(name=playlist_name, id=entry["id"], url=entry["url"])
+
+
+def matched_track_ids(mapped_tracks: Dict[str, List[SongMatch]]) -> List[str]:
+    return [
+        match.spotify_id
+        for match in itertools.chain(*mapped_tracks.values())
+        if match.spotify_id is not None
+    ]
+
+
+def compact_search_results(
+    results: Dict[str, Any], band: Optional[str] = None
+) -> Dict[str, Any]:
+    """Project a raw track search response onto the fields used for matching.
+
+    Only the track id plus normalized track and artist names are kept. When
+    ``band`` is given, candidates that can never match it are dropped too.
+    """
+    band_norm = normalize(band) if band else None
+    candidates = []
+    for item in results.get("tracks", {}).get("items", []):
+        if not item:
+            continue
+        artists = [normalize(artist["name"]) for artist in item["artists"]]
+        if band_norm is not None and not any(band_norm in a for a in artists):
+            continue
+        candidates.append(
+            {"id": item["id"], "name": normalize(item["name"]), "artists": artists}
+        )
+    return {"v": TRACK_CACHE_FORMAT_VERSION, "candidates": candidates}
+
+
+def is_compact_search_results(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("v") == TRACK_CACHE_FORMAT_VERSION
+
+
+def migrate_track_cache(cache: Cache) -> int:
+    """Rewrite raw search payloads in ``cache`` into the compact format.
+
+    Returns the number of migrated entries. Entries are also migrated lazily
+    when read, so running this is optional.
+    """
+    migrated = 0
+    for key, value in cache.as_dict().items():
+        if isinstance(value, dict) and "tracks" in value:
+            cache.set(key, compact_search_results(value))
+            migrated += 1
+    if migrated:
+        cache.persist()
+    return migrated
+
+
+def pick_candidate(
+    tracks: List[Dict[str, Any]], song: str, band: str, *, fuzzy: bool = False
+) -> Tuple[Optional[str], Optional[str]]:
+    """Pick the first compact candidate matching ``song`` and ``band``."""
+    song_norm = normalize(song)
+    band_norm = normalize(band)
+    for item in tracks:
+        track_name = item["name"]
+        artist_names = item["artists"]
+        name_match = song_norm in track_name if fuzzy else song_norm == track_name
+        if name_match and any(band_norm in a for a in artist_names):
+            strategy = "fuzzy" if fuzzy else "exact"
+            return item["id"], strategy
+    return None, None
+
+
+@dataclass
+class DiscographyIndex:
+    """Normalized track titles for every release of one artist."""
+
+    tracks: List[Tuple[str, str]]  # (track_id, normalized name), release order
+    by_name: Dict[str, str] = field(init=False)
+
+    def __post_init__(self):
+        self.by_name = {}
+        for track_id, name in self.tracks:
+            self.by_name.setdefault(name, track_id)
+
+    def find(self, song: str) -> Optional[str]:
+        song_norm = normalize(song)
+        exact = self.by_name.get(song_norm)
+        if exact:
+            return exact
+        for track_id, name in self.tracks:
+            if song_norm in name:
+                return track_id
+        return None
+
+
+def update_playlist_index(
+    shared: Any,
+    local: Optional[Dict[str, Any]],
+    playlist: Playlist,
+    *,
+    remove: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """Return a new index entry with ``playlist`` added (or removed).
+
+    The shared cache entry is preferred over the client's own copy, so
+    names other jobs indexed meanwhile survive, and its expiry is kept. A
+    removal only drops the name while it still points at ``playlist.id``.
+    """
+    base = shared if unwrap_expiring(shared) is not None else local
+    index = unwrap_expiring(base)
+    if index is None:
+        return None
+    index = dict(index)
+    if not remove:
+        index[playlist.name] = {"id": playlist.id, "url": playlist.url}
+    elif (index.get(playlist.name) or {}).get("id") == playlist.id:
+        del index[playlist.name]
+    return {"value": index, "expires_at": base.get("expires_at")}
+
+
+def remember_discography(
+    discographies: Dict[str, Dict[str, Any]], artist_id: str, entry: Dict[str, Any]
+) -> DiscographyIndex:
+    """Index a cached tracklist entry and keep it in memory until it expires.
+
+    Expired indexes of other artists are dropped at the same time.
+    """
+    for stale in [
+        key for key, value in discographies.items() if unwrap_expiring(value) is None
+    ]:
+        del discographies[stale]
+    index = DiscographyIndex([(track_id, name) for track_id, name in entry["value"]])
+    discographies[artist_id] = {"value": index, "expires_at": entry.get("expires_at")}
+    return index
+
+
 class SpotifyClient:
     """Small wrapper around spotipy with caching and ID resolution helpers."""
 
@@ -30,11 +374,41 @@ class SpotifyClient:
         config: SpotifyConfig,
         track_cache: Cache,
         sp: Optional[spotipy.Spotify] = None,
+        *,
+        match_cache: Optional[Cache] = None,
+        not_found_ttl_seconds: Optional[float] = DEFAULT_NOT_FOUND_TTL_SECONDS,
+        discography_ttl_seconds: Optional[float] = DEFAULT_DISCOGRAPHY_TTL_SECONDS,
+        playlist_index_ttl_seconds: Optional[float] = DEFAULT_PLAYLIST_INDEX_TTL_SECONDS,
+        rate_limiters: Optional[RateLimiterRegistry] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        token_manager: Optional[SpotifyTokenManager] = None,
     ):
         self.config = config
         self.track_cache = track_cache
+        # Resolved SongMatch results; shares the track cache unless overridden.
+        self.match_cache = match_cache if match_cache is not None else track_cache
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self.discography_ttl_seconds = discography_ttl_seconds
+        self.playlist_index_ttl_seconds = playlist_index_ttl_seconds
+        self.rate_limiters = rate_limiters or RateLimiterRegistry()
+        self.max_retries = max(0, max_retries)
+        # wrap_expiring entries holding a DiscographyIndex per artist ID.
+        self._discographies: Dict[str, Dict[str, Any]] = {}
+        self._discography_lock = threading.Lock()
+        self._discography_flights = SingleFlight()
+        # Concurrent misses for the same song share one resolution.
+        self._match_flights = SingleFlight()
+        # wrap_expiring entry holding {name: {"id", "url"}} for the user.
+        self._playlist_index: Optional[Dict[str, Any]] = None
+        self._playlist_index_lock = threading.RLock()
+        self._index_flights = SingleFlight()
+        self._playlist_flights = SingleFlight()
         self._playlist_sp = sp
         self._search_sp = sp
+        # Client-credentials manager behind _search_sp when it is not the user's.
+        self._search_auth_manager: Optional[SpotifyClientCredentials] = None
+        self._token_manager = token_manager
+        self._playlist_lock = threading.Lock()
 
     def create_auth_manager(
         self,
@@ -52,7 +426,22 @@ class SpotifyClient:
             cache_path=self.config.token_cache_path,
         )
 
+    @property
+    def token_manager(self) -> SpotifyTokenManager:
+        """User token manager, shared process-wide unless one was injected."""
+        if self._token_manager is None:
+            auth_manager = self.create_auth_manager(
+                scope=self.config.scopes,
+                show_dialog=False,
+                open_browser=False,
+            )
+            self._token_manager = get_token_manager(
+                self.config, auth_manager.refresh_access_token
+            )
+        return self._token_manager
+
     def _ensure_playlist_client(self) -> spotipy.Spotify:
+        """Return the user client; its token manager keeps the token fresh."""
         if self._playlist_sp is not None:
             return self._playlist_sp
 
@@ -61,61 +450,199 @@ class SpotifyClient:
         if not self.config.username:
             raise RuntimeError("Spotify username is required for playlist creation")
 
-        auth_manager = self.create_auth_manager(
-            scope=self.config.scopes,
-            show_dialog=False,
-            open_browser=False,
-        )
-        token_info = auth_manager.refresh_access_token(self.config.refresh_token)
-        access_token = token_info["access_token"]
-        self._playlist_sp = spotipy.Spotify(auth=access_token)
-        if self._search_sp is None:
-            self._search_sp = self._playlist_sp
-        return self._playlist_sp
+        with self._playlist_lock:
+            if self._playlist_sp is None:
+                self._playlist_sp = spotipy.Spotify(
+                    auth_manager=self.token_manager,
+                    status_forcelist=SPOTIPY_STATUS_FORCELIST,
+                )
+                if self._search_sp is None:
+                    self._search_sp = self._playlist_sp
+            return self._playlist_sp
 
     def _ensure_search_client(self) -> spotipy.Spotify:
         if self._search_sp is not None:
             return self._search_sp
 
-        auth_manager = SpotifyClientCredentials(
+        self._search_auth_manager = SpotifyClientCredentials(
             client_id=self.config.client_id,
             client_secret=self.config.client_secret,
         )
-        self._search_sp = spotipy.Spotify(auth_manager=auth_manager)
+        self._search_sp = spotipy.Spotify(
+            auth_manager=self._search_auth_manager,
+            status_forcelist=SPOTIPY_STATUS_FORCELIST,
+        )
         return self._search_sp
 
     @property
     def sp(self) -> spotipy.Spotify:
         return self._ensure_playlist_client()
 
+    def _call(self, bucket: str, fn, *args, **kwargs):
+        """Invoke a spotipy method once the named rate limit bucket allows.
+
+        429 responses pause and slow down the bucket, then the call is
+        retried up to ``max_retries`` times before the error is raised. A
+        401 refreshes the token of the client ``fn`` belongs to (the user's,
+        or the app's client credentials) and retries once.
+        """
+        limiter = self.rate_limiters.get(bucket)
+        reauthenticated = False
+        throttled = 0
+        while True:
+            try:
+                with limiter:
+                    result = fn(*args, **kwargs)
+            except SpotifyException as exc:
+                if exc.http_status == 401:
+                    # The re-auth retry does not use up the 429 budget.
+                    if reauthenticated or not self._refresh_token_for(fn):
+                        raise
+                    reauthenticated = True
+                    continue
+                if exc.http_status != 429 or throttled >= self.max_retries:
+                    raise
+                throttled += 1
+                pause = limiter.on_throttled(parse_retry_after(exc.headers))
+                logging.warning(
+                    "Spotify rate limited %s call, retrying in %.1f seconds",
+                    bucket,
+                    pause,
+                )
+                continue
+            limiter.on_success()
+            return result
+
+    def _refresh_token_for(self, fn) -> bool:
+        """Replace the token ``fn``'s client used; False if it has no refresh.
+
+        Calls on a separate client-credentials search client fetch a new app
+        token and leave the user's token alone.
+        """
+        client = getattr(fn, "__self__", None)
+        app_client = client is self._search_sp and client is not self._playlist_sp
+        if client is not None and app_client:
+            if self._search_auth_manager is None:
+                return False
+            logging.warning("Spotify rejected the app token, refreshing")
+            self._search_auth_manager.get_access_token(as_dict=False, check_cache=False)
+            return True
+        if self._token_manager is None:
+            return False
+        logging.warning("Spotify rejected the access token, refreshing")
+        self._token_manager.invalidate()
+        return True
+
     def find_or_create_playlist(self, playlist_name: str) -> Playlist:
-        playlists = self.sp.current_user_playlists()
+        """Look the playlist up by name in the user's index, creating it if absent.
+
+        The index costs one request per page of playlists when it is built
+        (at most once per ``playlist_index_ttl_seconds``); lookups after
+        that, including for playlists created here, need no requests.
+        Concurrent calls for one name share a single lookup.
+        """
+        return self._playlist_flights.do(
+            playlist_name, lambda: self._find_or_create_playlist(playlist_name)
+        )
 
-        if playlists:
-            for playlist in playlists["items"]:
-                if playlist and playlist["name"] == playlist_name:
-                    return Playlist.from_spotify(playlist)
+    def _find_or_create_playlist(self, playlist_name: str) -> Playlist:
+        found = indexed_playlist(
+            self._get_playlist_index(),
+            self.track_cache.get(self._playlist_index_key()),
+            playlist_name,
+        )
+        if found is not None:
+            return found
 
         logging.info("Playlist %s not found, will create", playlist_name)
-        playlist = self.sp.user_playlist_create(
-            user=self.config.username, name=playlist_name, public=True
+        playlist = self._call(
+            SPOTIFY_PLAYLIST_WRITE,
+            self.sp.user_playlist_create,
+            user=self.config.username,
+            name=playlist_name,
+            public=True,
         )
         if not playlist:
             raise RuntimeError("Failed to create playlist")
-        return Playlist.from_spotify(playlist)
+        created = Playlist.from_spotify(playlist)
+        self._update_playlist_index(created)
+        return created
+
+    def invalidate_playlist_index(self) -> None:
+        """Forget the playlist index, e.g. after playlists were deleted elsewhere."""
+        with self._playlist_index_lock:
+            self._playlist_index = None
+            self.track_cache.set(self._playlist_index_key(), None)
+
+    def _playlist_index_key(self) -> str:
+        return playlist_index_key(self.config.username)
+
+    def _get_playlist_index(self) -> Dict[str, Dict[str, str]]:
+        index = unwrap_expiring(self._playlist_index)
+        if index is not None:
+            return index
+        return self._index_flights.do(
+            self._playlist_index_key(), self._load_playlist_index
+        )
+
+    def _load_playlist_index(self) -> Dict[str, Dict[str, str]]:
+        key = self._playlist_index_key()
+        entry = self.track_cache.get(key)
+        index = unwrap_expiring(entry)
+        if index is None:
+            index = self._fetch_playlist_index()
+            entry = wrap_expiring(index, self.playlist_index_ttl_seconds)
+            self.track_cache.set(key, entry)
+        with self._playlist_index_lock:
+            self._playlist_index = entry
+        return index
+
+    def _fetch_playlist_index(self) -> Dict[str, Dict[str, str]]:
+        client = self.sp
+        return index_playlists(
+            self._paginate(
+                lambda **page: self._call(
+                    SPOTIFY_SEARCH, client.current_user_playlists, **page
+                ),
+                limit=PLAYLISTS_PAGE_SIZE,
+            )
+        )
+
+    def _update_playlist_index(
+        self, playlist: Playlist, *, remove: bool = False
+    ) -> None:
+        """Add (or drop) ``playlist`` in this client's and the shared index."""
+        key = self._playlist_index_key()
+        with self._playlist_index_lock:
+            entry = update_playlist_index(
+                self.track_cache.get(key),
+                self._playlist_index,
+                playlist,
+                remove=remove,
+            )
+            if entry is not None:
+                self._playlist_index = entry
+                self.track_cache.set(key, entry)
 
     def _search_track_by_query(
         self, song: str, band: str
     ) -> List[Dict[str, Any]]:
+        """Return compact match candidates for ``song`` by ``band``.
+
+        Raw search payloads found in older caches are converted on read.
+        """
         query = f"{song} {band}"
-        cached_results = self.track_cache.get(query)
-        if cached_results is None:
-            results = self._ensure_search_client().search(q=query, limit=50, type="track")
-            self.track_cache.set(query, results)
-        else:
-            logging.info("Using cache for %s", query)
-            results = cached_results
-        return results.get("tracks", {}).get("items", [])
+        candidates = cached_search_candidates(self.track_cache, query, band)
+        if candidates is not None:
+            return candidates
+        results = self._call(
+            SPOTIFY_SEARCH,
+            self._ensure_search_client().search,
+            q=query,
+            limit=50,
+            type="track",
+        )
+        return remember_search_results(self.track_cache, query, band, results)
 
     def _match_track(
         self,
@@ -125,70 +652,160 @@ class SpotifyClient:
         *,
         fuzzy: bool = False,
     ) -> Tuple[Optional[str], Optional[str]]:
-        song_norm = normalize(song)
-        band_norm = normalize(band)
-        for item in tracks:
-            track_name = normalize(item["name"])
-            artist_names = [normalize(artist["name"]) for artist in item["artists"]]
-            name_match = song_norm in track_name if fuzzy else song_norm == track_name
-            if name_match and any(band_norm in a for a in artist_names):
-                strategy = "fuzzy" if fuzzy else "exact"
-                return item["id"], strategy
-        return None, None
+        return pick_candidate(tracks, song, band, fuzzy=fuzzy)
 
     def _get_artist_id(self, band: str) -> Optional[str]:
-        results = self._ensure_search_client().search(q=band, type="artist", limit=1)
-        items = results.get("artists", {}).get("items", [])
-        return items[0]["id"] if items else None
+        hit, artist_id = cached_artist_id(self.track_cache, band)
+        if hit:
+            return artist_id
+
+        results = self._call(
+            SPOTIFY_SEARCH,
+            self._ensure_search_client().search,
+            q=band,
+            type="artist",
+            limit=1,
+        )
+        return remember_artist_id(
+            self.track_cache, band, results, self.not_found_ttl_seconds
+        )
 
-    def _search_track_by_discography(self, artist_id: str, song: str) -> Optional[str]:
-        song_norm = normalize(song)
-        albums = self._ensure_search_client().artist_albums(
-            artist_id, album_type="album,single", limit=50
+    @staticmethod
+    def _paginate(
+        fetch_page, limit: int = 50, offset: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        while True:
+            page = fetch_page(limit=limit, offset=offset) or {}
+            items = page.get("items", [])
+            yield from items
+            if not page.get("next") or not items:
+                return
+            offset += len(items)
+
+    def _fetch_discography(self, artist_id: str) -> List[Tuple[str, str]]:
+        client = self._ensure_search_client()
+        album_ids = list(
+            dict.fromkeys(
+                album["id"]
+                for album in self._paginate(
+                    lambda **page: self._call(
+                        SPOTIFY_SEARCH,
+                        client.artist_albums,
+                        artist_id,
+                        album_type="album,single",
+                        **page,
+                    )
+                )
+            )
         )
-        album_ids = {album["id"] for album in albums["items"]}
-        seen_track_ids = set()
-        for album_id in album_ids:
-            tracks = self._ensure_search_client().album_tracks(album_id).get("items", [])
-            for track in tracks:
-                if track["id"] in seen_track_ids:
+        return discography_tracks(
+            self._iter_album_tracks(album_ids), artist_id, len(album_ids)
+        )
+
+    def _iter_album_tracks(self, album_ids: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield tracks for ``album_ids`` using the batched albums endpoint.
+
+        Each request covers up to ALBUMS_BATCH_SIZE albums with their first
+        page of tracks; only albums with longer tracklists need follow-ups.
+        """
+        client = self._ensure_search_client()
+        for batch in chunks(album_ids, ALBUMS_BATCH_SIZE):
+            response = self._call(SPOTIFY_SEARCH, client.albums, batch) or {}
+            for album in response.get("albums", []):
+                if not album:
                     continue
-                seen_track_ids.add(track["id"])
-                if song_norm in normalize(track["name"]):
-                    return track["id"]
-        return None
+                page = album.get("tracks") or {}
+                items = page.get("items", [])
+                yield from items
+                if page.get("next"):
+                    yield from self._paginate(
+                        lambda **kw: self._call(
+                            SPOTIFY_SEARCH, client.album_tracks, album["id"], **kw
+                        ),
+                        offset=len(items),
+                    )
+
+    def _get_discography_index(self, artist_id: str) -> DiscographyIndex:
+        """Return the artist's track index, fetching it at most once per TTL.
+
+        Concurrent lookups for one artist share a fetch; other artists are
+        not held up by it.
+        """
+        index = unwrap_expiring(self._discographies.get(artist_id))
+        if index is not None:
+            return index
+        return self._discography_flights.do(
+            artist_id, lambda: self._load_discography_index(artist_id)
+        )
 
-    @staticmethod
-    def _track_url(track_id: str) -> str:
-        return f"https://open.spotify.com/track/{track_id}"
+    def _load_discography_index(self, artist_id: str) -> DiscographyIndex:
+        entry = cached_discography(self.track_cache, artist_id)
+        if entry is None:
+            entry = store_discography(
+                self.track_cache,
+                artist_id,
+                self._fetch_discography(artist_id),
+                self.discography_ttl_seconds,
+            )
+        with self._discography_lock:
+            return remember_discography(self._discographies, artist_id, entry)
+
+    def _search_track_by_discography(self, artist_id: str, song: str) -> Optional[str]:
+        return self._get_discography_index(artist_id).find(song)
 
     def get_track_match(
         self, song: str, band: str, *, use_fuzzy_search: bool = False
+    ) -> SongMatch:
+        """Resolve ``song`` by ``band``, consulting the match memo first.
+
+        Found matches are memoized indefinitely; misses expire after
+        ``not_found_ttl_seconds`` so new releases are picked up again.
+        Concurrent callers missing the memo for the same normalized song
+        wait for a single resolution instead of each querying Spotify.
+        """
+        key = match_cache_key(song, band, use_fuzzy_search)
+        cached = cached_match(self.match_cache, key, song)
+        if cached is not None:
+            logging.info("Using cached match for %s - %s", band, song)
+            return cached
+
+        match = self._match_flights.do(
+            key,
+            lambda: self._resolve_and_memoize(
+                key, song, band, use_fuzzy_search=use_fuzzy_search
+            ),
+        )
+        return replace(match, name=song)
+
+    def _resolve_and_memoize(
+        self, key: str, song: str, band: str, *, use_fuzzy_search: bool
+    ) -> SongMatch:
+        # A flight that just finished may have filled the memo after our miss.
+        cached = cached_match(self.match_cache, key, song)
+        if cached is not None:
+            return cached
+
+        match = self._resolve_track_match(
+            song, band, use_fuzzy_search=use_fuzzy_search
+        )
+        remember_match(self.match_cache, key, match, self.not_found_ttl_seconds)
+        return match
+
+    def _resolve_track_match(
+        self, song: str, band: str, *, use_fuzzy_search: bool = False
     ) -> SongMatch:
         tracks = self._search_track_by_query(song, band)
         track_id, strategy = self._match_track(
             tracks, song, band, fuzzy=use_fuzzy_search
         )
         if track_id:
-            return SongMatch(
-                name=song,
-                spotify_id=track_id,
-                spotify_url=self._track_url(track_id),
-                status="found",
-                strategy=strategy or "search",
-            )
+            return found_match(song, track_id, strategy or "search")
 
         if not use_fuzzy_search:
             logging.warning(
                 "No exact match in search results for %s - %s (fuzzy off)", band, song
             )
-            return SongMatch(
-                name=song,
-                spotify_id=None,
-                spotify_url=None,
-                status="not_found",
-                strategy="search_exact",
-            )
+            return not_found_match(song, "search_exact")
 
         logging.warning(
             "No match in search results for %s - %s, trying fallback", band, song
@@ -196,32 +813,14 @@ class SpotifyClient:
         artist_id = self._get_artist_id(band)
         if not artist_id:
             logging.warning("Artist not found: %s", band)
-            return SongMatch(
-                name=song,
-                spotify_id=None,
-                spotify_url=None,
-                status="not_found",
-                strategy="artist_lookup_failed",
-            )
+            return not_found_match(song, "artist_lookup_failed")
 
         track_id = self._search_track_by_discography(artist_id, song)
         if track_id:
-            return SongMatch(
-                name=song,
-                spotify_id=track_id,
-                spotify_url=self._track_url(track_id),
-                status="found",
-                strategy="discography",
-            )
+            return found_match(song, track_id, "discography")
 
         logging.warning("No match found anywhere for %s - %s", band, song)
-        return SongMatch(
-            name=song,
-            spotify_id=None,
-            spotify_url=None,
-            status="not_found",
-            strategy="not_found",
-        )
+        return not_found_match(song, "not_found")
 
     def get_track_id(
         self, song: str, band: str, *, use_fuzzy_search: bool = False
@@ -234,13 +833,27 @@ class SpotifyClient:
         all_songs: Dict[str, List[str]],
         *,
         use_fuzzy_search: bool = False,
+        resolved: Optional[Dict[str, SongMatch]] = None,
     ) -> Dict[str, List[SongMatch]]:
+        """Match every song, resolving each normalized (song, band) only once.
+
+        Repeats (reprises, a band listed twice) reuse the first match. Pass
+        the same ``resolved`` dict to several calls to share matches across
+        them, e.g. per band within one playlist build.
+        """
+        resolved = {} if resolved is None else resolved
         mapped: Dict[str, List[SongMatch]] = {}
         for band, songs in all_songs.items():
             for song in songs:
-                match = self.get_track_match(
-                    song, band, use_fuzzy_search=use_fuzzy_search
-                )
+                key = match_cache_key(song, band, use_fuzzy_search)
+                match = resolved.get(key)
+                if match is None:
+                    match = self.get_track_match(
+                        song, band, use_fuzzy_search=use_fuzzy_search
+                    )
+                    resolved[key] = match
+                else:
+                    match = replace(match, name=song)
                 mapped.setdefault(band, [])
                 mapped[band].append(match)
             logging.info("Finished mapping tracks for %s", band)
@@ -253,24 +866,120 @@ class SpotifyClient:
         *,
         use_fuzzy_search: bool = False,
         mapped_tracks: Optional[Dict[str, List[SongMatch]]] = None,
-    ) -> None:
-        client = self._ensure_playlist_client()
-        client.playlist_replace_items(playlist_id=playlist.id, items=[])
+    ) -> Playlist:
+        """Sync the matched tracks into ``playlist`` and return the one written.
 
+        A 404 means the indexed playlist was deleted in Spotify; its entry
+        is dropped and the name resolved (or created) again.
+        """
         mapped_ids = mapped_tracks or self.map_tracks(
             songs, use_fuzzy_search=use_fuzzy_search
         )
-        track_ids = [
-            match.spotify_id
-            for match in itertools.chain(*mapped_ids.values())
-            if match.spotify_id is not None
-        ]
-
-        def chunks(lst, n):
-            for i in range(0, len(lst), n):
-                yield lst[i : i + n]
-
-        for batch in chunks(track_ids, 100):
-            if not batch:
-                continue
-            client.playlist_add_items(playlist_id=playlist.id, items=batch)
+        track_ids = matched_track_ids(mapped_ids)
+        try:
+            self.sync_playlist(playlist, track_ids)
+        except SpotifyException as exc:
+            if exc.http_status != 404:
+                raise
+            logging.warning(
+                "Playlist %s (%s) no longer exists, resolving it again",
+                playlist.name,
+                playlist.id,
+            )
+            self._update_playlist_index(playlist, remove=True)
+            playlist = self.find_or_create_playlist(playlist.name)
+            self.sync_playlist(playlist, track_ids)
+        return playlist
+
+    def sync_playlist(self, playlist: Playlist, track_ids: List[str]) -> None:
+        """Make the playlist hold exactly ``track_ids``, in order, with few writes.
+
+        The current items are diffed against ``track_ids`` and only the
+        removals, moves and insertions needed are sent, pinned to the
+        playlist's snapshot ID. When the diff would take well over the calls
+        of a rewrite, the playlist is replaced instead (starting with the
+        first 100 tracks, so it is never left empty).
+        """
+        snapshot_id, current = self._fetch_playlist_state(playlist.id)
+        for write in playlist_writes(playlist.name, current, track_ids):
+            snapshot_id = self._send_playlist_write(playlist.id, write, snapshot_id)
+
+    def _send_playlist_write(
+        self, playlist_id: str, write: PlaylistWrite, snapshot_id: Optional[str]
+    ) -> Optional[str]:
+        """Send one write and return the playlist's new snapshot ID."""
+        client = self._ensure_playlist_client()
+        if write.kind == "replace":
+            response = self._call(
+                SPOTIFY_PLAYLIST_WRITE,
+                client.playlist_replace_items,
+                playlist_id=playlist_id,
+                items=write.track_ids,
+            )
+        elif write.kind == "add":
+            response = self._call(
+                SPOTIFY_PLAYLIST_WRITE,
+                client.playlist_add_items,
+                playlist_id=playlist_id,
+                items=write.track_ids,
+                position=write.position,
+            )
+        elif write.kind == "remove":
+            response = self._call(
+                SPOTIFY_PLAYLIST_WRITE,
+                client.playlist_remove_specific_occurrences_of_items,
+                playlist_id,
+                [
+                    {"uri": track_id, "positions": positions}
+                    for track_id, positions in write.positions.items()
+                ],
+                snapshot_id=snapshot_id,
+            )
+        else:
+            response = self._call(
+                SPOTIFY_PLAYLIST_WRITE,
+                client.playlist_reorder_items,
+                playlist_id,
+                range_start=write.range_start,
+                insert_before=write.insert_before,
+                snapshot_id=snapshot_id,
+            )
+        return (response or {}).get("snapshot_id", snapshot_id)
+
+    def _fetch_playlist_state(
+        self, playlist_id: str
+    ) -> Tuple[Optional[str], Optional[List[str]]]:
+        """Return the snapshot ID and track IDs of a playlist, fetching every page.
+
+        The track list is None when an item has no ID (local files,
+        unavailable episodes), which the diff cannot address reliably.
+        """
+        client = self._ensure_playlist_client()
+        first = (
+            self._call(
+                SPOTIFY_SEARCH,
+                client.playlist,
+                playlist_id,
+                fields="snapshot_id,tracks(items(track(id)),next)",
+            )
+            or {}
+        )
+        page = first.get("tracks") or {}
+        items = list(page.get("items", []))
+        if page.get("next") and items:
+            items.extend(
+                self._paginate(
+                    lambda **page_args: self._call(
+                        SPOTIFY_SEARCH,
+                        client.playlist_items,
+                        playlist_id,
+                        fields="items(track(id)),next",
+                        additional_types=("track",),
+                        **page_args,
+                    ),
+                    limit=PLAYLIST_BATCH_SIZE,
+                    offset=len(items),
+                )
+            )
+
+        return first.get("snapshot_id"), playlist_track_ids(items)
@@ -0,0 +1,570 @@
+import asyncio
+import itertools
+import logging
+from dataclasses import replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyClientCredentials, SpotifyOAuth
+
+from ag.cache import Cache, unwrap_expiring, wrap_expiring
+from ag.clients.async_http import get_shared_async_client, send_with_retries
+from ag.clients.spotify import (
+    ALBUMS_BATCH_SIZE,
+    DEFAULT_DISCOGRAPHY_TTL_SECONDS,
+    DEFAULT_NOT_FOUND_TTL_SECONDS,
+    DEFAULT_PLAYLIST_INDEX_TTL_SECONDS,
+    PLAYLISTS_PAGE_SIZE,
+    DiscographyIndex,
+    artist_cache_key,
+    cached_artist_id,
+    cached_discography,
+    cached_match,
+    cached_search_candidates,
+    chunks,
+    discography_tracks,
+    found_match,
+    index_playlists,
+    indexed_playlist,
+    match_cache_key,
+    matched_track_ids,
+    not_found_match,
+    pick_candidate,
+    playlist_index_key,
+    remember_artist_id,
+    remember_discography,
+    remember_match,
+    remember_search_results,
+    store_discography,
+    track_uri,
+    update_playlist_index,
+)
+from ag.clients.spotify_auth import SpotifyTokenManager, get_token_manager
+from ag.config import SpotifyConfig
+from ag.models import Playlist, SongMatch
+from ag.services.playlist_sync import (
+    PLAYLIST_BATCH_SIZE,
+    PlaylistWrite,
+    playlist_track_ids,
+    playlist_writes,
+)
+from ag.utils.rate_limit import (
+    DEFAULT_MAX_RETRIES,
+    SPOTIFY_PLAYLIST_WRITE,
+    SPOTIFY_SEARCH,
+    RateLimiterRegistry,
+)
+from ag.utils.single_flight import AsyncSingleFlight
+
+SPOTIFY_API_BASE_URL = "https://api.spotify.com/v1"
+
+
+class AsyncSpotifyClient:
+    """asyncio counterpart of :class:`SpotifyClient` calling the Web API via httpx.
+
+    It covers the calls the playlist builder needs (search, artist albums,
+    playlist reads and writes) and shares cache keys and formats with the
+    blocking client, so both can use the same caches. Tokens come from the
+    same process-wide token manager; fetching one runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        config: SpotifyConfig,
+        track_cache: Cache,
+        *,
+        match_cache: Optional[Cache] = None,
+        not_found_ttl_seconds: Optional[float] = DEFAULT_NOT_FOUND_TTL_SECONDS,
+        discography_ttl_seconds: Optional[float] = DEFAULT_DISCOGRAPHY_TTL_SECONDS,
+        playlist_index_ttl_seconds: Optional[float] = DEFAULT_PLAYLIST_INDEX_TTL_SECONDS,
+        rate_limiters: Optional[RateLimiterRegistry] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        token_manager: Optional[SpotifyTokenManager] = None,
+        app_token_manager=None,
+        client=None,
+    ):
+        self.config = config
+        self.track_cache = track_cache
+        self.match_cache = match_cache if match_cache is not None else track_cache
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self.discography_ttl_seconds = discography_ttl_seconds
+        self.playlist_index_ttl_seconds = playlist_index_ttl_seconds
+        self.rate_limiters = rate_limiters or RateLimiterRegistry()
+        self.max_retries = max(0, max_retries)
+        self.client = client
+        self._token_manager = token_manager
+        self._app_token_manager = app_token_manager
+        # wrap_expiring entries holding a DiscographyIndex per artist ID.
+        self._discographies: Dict[str, Dict[str, Any]] = {}
+        self._playlist_index: Optional[Dict[str, Any]] = None
+        self._match_flights = AsyncSingleFlight()
+        self._artist_flights = AsyncSingleFlight()
+        self._discography_flights = AsyncSingleFlight()
+        self._index_flights = AsyncSingleFlight()
+        self._playlist_flights = AsyncSingleFlight()
+
+    @property
+    def token_manager(self) -> SpotifyTokenManager:
+        """User token manager, shared process-wide unless one was injected."""
+        if self._token_manager is None:
+            if not self.config.refresh_token or not self.config.redirect_uri:
+                raise RuntimeError(
+                    "Spotify refresh token and redirect URI are required for playlist creation"
+                )
+            auth_manager = SpotifyOAuth(
+                client_id=self.config.client_id,
+                client_secret=self.config.client_secret,
+                redirect_uri=self.config.redirect_uri,
+                scope=self.config.scopes,
+                open_browser=False,
+                cache_path=self.config.token_cache_path,
+            )
+            self._token_manager = get_token_manager(
+                self.config, auth_manager.refresh_access_token
+            )
+        return self._token_manager
+
+    @property
+    def app_token_manager(self):
+        """Client-credentials token source for catalogue (search/album) calls."""
+        if self._app_token_manager is None:
+            self._app_token_manager = SpotifyClientCredentials(
+                client_id=self.config.client_id,
+                client_secret=self.config.client_secret,
+            )
+        return self._app_token_manager
+
+    async def _request(
+        self,
+        bucket: str,
+        method: str,
+        path: str,
+        *,
+        user: bool = False,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Call the Web API through the named rate limit bucket.
+
+        429s are retried like the blocking client's ``_call``; a 401 on a
+        user call drops the cached token and retries once. Other errors
+        raise ``SpotifyException``.
+        """
+        manager = self.token_manager if user else self.app_token_manager
+        url = f"{SPOTIFY_API_BASE_URL}{path}"
+        client = self.client or get_shared_async_client()
+        reauthenticated = False
+        while True:
+            token = await asyncio.to_thread(manager.get_access_token, False)
+            response = await send_with_retries(
+                client,
+                method,
+                url,
+                limiter=self.rate_limiters.get(bucket),
+                max_retries=self.max_retries,
+                description=f"Spotify {method} {path}",
+                headers={"Authorization": f"Bearer {token}"},
+                params=params,
+                json=json,
+            )
+            if response.status_code == 401 and user and not reauthenticated:
+                logging.warning("Spotify rejected the access token, refreshing")
+                self.token_manager.invalidate()
+                reauthenticated = True
+                continue
+            if response.status_code >= 400:
+                raise SpotifyException(
+                    response.status_code,
+                    -1,
+                    f"{url}:\n {response.text}",
+                    headers=dict(response.headers),
+                )
+            return response.json() if response.content else {}
+
+    async def _paginate(
+        self,
+        bucket: str,
+        path: str,
+        *,
+        user: bool = False,
+        params: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        while True:
+            page = await self._request(
+                bucket,
+                "GET",
+                path,
+                user=user,
+                params={**(params or {}), "limit": limit, "offset": offset},
+            )
+            page_items = page.get("items", [])
+            items.extend(page_items)
+            if not page.get("next") or not page_items:
+                return items
+            offset += len(page_items)
+
+    # Track matching
+
+    async def get_track_match(
+        self, song: str, band: str, *, use_fuzzy_search: bool = False
+    ) -> SongMatch:
+        """Resolve ``song`` by ``band``; concurrent misses share one lookup."""
+        key = match_cache_key(song, band, use_fuzzy_search)
+        cached = cached_match(self.match_cache, key, song)
+        if cached is not None:
+            logging.info("Using cached match for %s - %s", band, song)
+            return cached
+
+        match = await self._match_flights.do(
+            key,
+            lambda: self._resolve_and_memoize(
+                key, song, band, use_fuzzy_search=use_fuzzy_search
+            ),
+        )
+        return replace(match, name=song)
+
+    async def _resolve_and_memoize(
+        self, key: str, song: str, band: str, *, use_fuzzy_search: bool
+    ) -> SongMatch:
+        cached = cached_match(self.match_cache, key, song)
+        if cached is not None:
+            return cached
+
+        match = await self._resolve_track_match(
+            song, band, use_fuzzy_search=use_fuzzy_search
+        )
+        remember_match(self.match_cache, key, match, self.not_found_ttl_seconds)
+        return match
+
+    async def _resolve_track_match(
+        self, song: str, band: str, *, use_fuzzy_search: bool = False
+    ) -> SongMatch:
+        tracks = await self._search_track_by_query(song, band)
+        track_id, strategy = pick_candidate(tracks, song, band, fuzzy=use_fuzzy_search)
+        if track_id:
+            return found_match(song, track_id, strategy or "search")
+
+        if not use_fuzzy_search:
+            logging.warning(
+                "No exact match in search results for %s - %s (fuzzy off)", band, song
+            )
+            return not_found_match(song, "search_exact")
+
+        artist_id = await self._get_artist_id(band)
+        if not artist_id:
+            logging.warning("Artist not found: %s", band)
+            return not_found_match(song, "artist_lookup_failed")
+
+        track_id = (await self._get_discography_index(artist_id)).find(song)
+        if track_id:
+            return found_match(song, track_id, "discography")
+
+        logging.warning("No match found anywhere for %s - %s", band, song)
+        return not_found_match(song, "not_found")
+
+    async def _search_track_by_query(
+        self, song: str, band: str
+    ) -> List[Dict[str, Any]]:
+        query = f"{song} {band}"
+        candidates = cached_search_candidates(self.track_cache, query, band)
+        if candidates is not None:
+            return candidates
+        results = await self._request(
+            SPOTIFY_SEARCH,
+            "GET",
+            "/search",
+            params={"q": query, "limit": 50, "type": "track"},
+        )
+        return remember_search_results(self.track_cache, query, band, results)
+
+    async def _get_artist_id(self, band: str) -> Optional[str]:
+        hit, artist_id = cached_artist_id(self.track_cache, band)
+        if hit:
+            return artist_id
+        return await self._artist_flights.do(
+            artist_cache_key(band), lambda: self._fetch_artist_id(band)
+        )
+
+    async def _fetch_artist_id(self, band: str) -> Optional[str]:
+        results = await self._request(
+            SPOTIFY_SEARCH,
+            "GET",
+            "/search",
+            params={"q": band, "type": "artist", "limit": 1},
+        )
+        return remember_artist_id(
+            self.track_cache, band, results, self.not_found_ttl_seconds
+        )
+
+    async def _get_discography_index(self, artist_id: str) -> DiscographyIndex:
+        index = unwrap_expiring(self._discographies.get(artist_id))
+        if index is not None:
+            return index
+        return await self._discography_flights.do(
+            artist_id, lambda: self._load_discography_index(artist_id)
+        )
+
+    async def _load_discography_index(self, artist_id: str) -> DiscographyIndex:
+        entry = cached_discography(self.track_cache, artist_id)
+        if entry is None:
+            entry = store_discography(
+                self.track_cache,
+                artist_id,
+                await self._fetch_discography(artist_id),
+                self.discography_ttl_seconds,
+            )
+        return remember_discography(self._discographies, artist_id, entry)
+
+    async def _fetch_discography(self, artist_id: str) -> List[Tuple[str, str]]:
+        albums = await self._paginate(
+            SPOTIFY_SEARCH,
+            f"/artists/{artist_id}/albums",
+            params={"include_groups": "album,single"},
+        )
+        album_ids = list(dict.fromkeys(album["id"] for album in albums))
+        # Album batches are independent, so they are fetched concurrently.
+        batches = await asyncio.gather(
+            *(
+                self._album_batch_tracks(batch)
+                for batch in chunks(album_ids, ALBUMS_BATCH_SIZE)
+            )
+        )
+        return discography_tracks(
+            itertools.chain.from_iterable(batches), artist_id, len(album_ids)
+        )
+
+    async def _album_batch_tracks(self, album_ids: List[str]) -> List[Dict[str, Any]]:
+        response = await self._request(
+            SPOTIFY_SEARCH, "GET", "/albums", params={"ids": ",".join(album_ids)}
+        )
+        tracks: List[Dict[str, Any]] = []
+        for album in response.get("albums", []):
+            if not album:
+                continue
+            page = album.get("tracks") or {}
+            items = page.get("items", [])
+            tracks.extend(items)
+            if page.get("next"):
+                tracks.extend(
+                    await self._paginate(
+                        SPOTIFY_SEARCH,
+                        f"/albums/{album['id']}/tracks",
+                        offset=len(items),
+                    )
+                )
+        return tracks
+
+    async def map_tracks(
+        self,
+        all_songs: Dict[str, List[str]],
+        *,
+        use_fuzzy_search: bool = False,
+        resolved: Optional[Dict[str, SongMatch]] = None,
+    ) -> Dict[str, List[SongMatch]]:
+        """Match every song concurrently, resolving each normalized pair once."""
+        resolved = {} if resolved is None else resolved
+        pending: Dict[str, Tuple[str, str]] = {}
+        for band, songs in all_songs.items():
+            for song in songs:
+                key = match_cache_key(song, band, use_fuzzy_search)
+                if key not in resolved:
+                    pending.setdefault(key, (song, band))
+
+        matches = await asyncio.gather(
+            *(
+                self.get_track_match(song, band, use_fuzzy_search=use_fuzzy_search)
+                for song, band in pending.values()
+            )
+        )
+        resolved.update(zip(pending, matches))
+
+        mapped: Dict[str, List[SongMatch]] = {}
+        for band, songs in all_songs.items():
+            mapped[band] = [
+                replace(
+                    resolved[match_cache_key(song, band, use_fuzzy_search)], name=song
+                )
+                for song in songs
+            ]
+            logging.info("Finished mapping tracks for %s", band)
+        return mapped
+
+    # Playlists
+
+    def _require_user(self) -> str:
+        if not self.config.username:
+            raise RuntimeError("Spotify username is required for playlist creation")
+        return self.config.username
+
+    async def find_or_create_playlist(self, playlist_name: str) -> Playlist:
+        """Look the playlist up in the user's cached index, creating it if absent.
+
+        Concurrent calls for one name share a single lookup, so the playlist
+        is never created twice.
+        """
+        return await self._playlist_flights.do(
+            playlist_name, lambda: self._find_or_create_playlist(playlist_name)
+        )
+
+    async def _find_or_create_playlist(self, playlist_name: str) -> Playlist:
+        username = self._require_user()
+        found = indexed_playlist(
+            await self._get_playlist_index(),
+            self.track_cache.get(self._playlist_index_key()),
+            playlist_name,
+        )
+        if found is not None:
+            return found
+
+        logging.info("Playlist %s not found, will create", playlist_name)
+        playlist = await self._request(
+            SPOTIFY_PLAYLIST_WRITE,
+            "POST",
+            f"/users/{username}/playlists",
+            user=True,
+            json={"name": playlist_name, "public": True},
+        )
+        if not playlist:
+            raise RuntimeError("Failed to create playlist")
+        created = Playlist.from_spotify(playlist)
+        self._update_playlist_index(created)
+        return created
+
+    def _update_playlist_index(
+        self, playlist: Playlist, *, remove: bool = False
+    ) -> None:
+        key = self._playlist_index_key()
+        entry = update_playlist_index(
+            self.track_cache.get(key), self._playlist_index, playlist, remove=remove
+        )
+        if entry is not None:
+            self._playlist_index = entry
+            self.track_cache.set(key, entry)
+
+    def _playlist_index_key(self) -> str:
+        return playlist_index_key(self.config.username)
+
+    async def _get_playlist_index(self) -> Dict[str, Dict[str, str]]:
+        index = unwrap_expiring(self._playlist_index)
+        if index is not None:
+            return index
+
+        key = self._playlist_index_key()
+        entry = self.track_cache.get(key)
+        index = unwrap_expiring(entry)
+        if index is None:
+            index = await self._index_flights.do(key, self._fetch_playlist_index)
+            entry = wrap_expiring(index, self.playlist_index_ttl_seconds)
+            self.track_cache.set(key, entry)
+        self._playlist_index = entry
+        return index
+
+    async def _fetch_playlist_index(self) -> Dict[str, Dict[str, str]]:
+        playlists = await self._paginate(
+            SPOTIFY_SEARCH, "/me/playlists", user=True, limit=PLAYLISTS_PAGE_SIZE
+        )
+        return index_playlists(playlists)
+
+    async def populate_playlist(
+        self,
+        playlist: Playlist,
+        songs: Dict[str, List[str]],
+        *,
+        use_fuzzy_search: bool = False,
+        mapped_tracks: Optional[Dict[str, List[SongMatch]]] = None,
+    ) -> Playlist:
+        """Same contract as ``SpotifyClient.populate_playlist``, 404 included."""
+        mapped_ids = mapped_tracks or await self.map_tracks(
+            songs, use_fuzzy_search=use_fuzzy_search
+        )
+        track_ids = matched_track_ids(mapped_ids)
+        try:
+            await self.sync_playlist(playlist, track_ids)
+        except SpotifyException as exc:
+            if exc.http_status != 404:
+                raise
+            logging.warning(
+                "Playlist %s (%s) no longer exists, resolving it again",
+                playlist.name,
+                playlist.id,
+            )
+            self._update_playlist_index(playlist, remove=True)
+            playlist = await self.find_or_create_playlist(playlist.name)
+            await self.sync_playlist(playlist, track_ids)
+        return playlist
+
+    async def sync_playlist(self, playlist: Playlist, track_ids: List[str]) -> None:
+        """Apply the same diff-or-rewrite plan as ``SpotifyClient.sync_playlist``."""
+        self._require_user()
+        snapshot_id, current = await self._fetch_playlist_state(playlist.id)
+        # Writes stay sequential: each one depends on the previous snapshot.
+        for write in playlist_writes(playlist.name, current, track_ids):
+            snapshot_id = await self._send_playlist_write(
+                playlist.id, write, snapshot_id
+            )
+
+    async def _send_playlist_write(
+        self, playlist_id: str, write: PlaylistWrite, snapshot_id: Optional[str]
+    ) -> Optional[str]:
+        """Send one write and return the playlist's new snapshot ID."""
+        if write.kind == "remove":
+            method = "DELETE"
+            body: Dict[str, Any] = {
+                "tracks": [
+                    {"uri": track_uri(track_id), "positions": positions}
+                    for track_id, positions in write.positions.items()
+                ],
+                "snapshot_id": snapshot_id,
+            }
+        elif write.kind == "move":
+            method = "PUT"
+            body = {
+                "range_start": write.range_start,
+                "insert_before": write.insert_before,
+                "snapshot_id": snapshot_id,
+            }
+        else:
+            method = "PUT" if write.kind == "replace" else "POST"
+            body = {"uris": [track_uri(track_id) for track_id in write.track_ids]}
+            if write.position is not None:
+                body["position"] = write.position
+        response = await self._request(
+            SPOTIFY_PLAYLIST_WRITE,
+            method,
+            f"/playlists/{playlist_id}/tracks",
+            user=True,
+            json=body,
+        )
+        return response.get("snapshot_id", snapshot_id)
+
+    async def _fetch_playlist_state(
+        self, playlist_id: str
+    ) -> Tuple[Optional[str], Optional[List[str]]]:
+        first = await self._request(
+            SPOTIFY_SEARCH,
+            "GET",
+            f"/playlists/{playlist_id}",
+            user=True,
+            params={"fields": "snapshot_id,tracks(items(track(id)),next)"},
+        )
+        page = first.get("tracks") or {}
+        items = list(page.get("items", []))
+        if page.get("next") and items:
+            items.extend(
+                await self._paginate(
+                    SPOTIFY_SEARCH,
+                    f"/playlists/{playlist_id}/tracks",
+                    user=True,
+                    params={
+                        "fields": "items(track(id)),next",
+                        "additional_types": "track",
+                    },
+                    limit=PLAYLIST_BATCH_SIZE,
+                    offset=len(items),
+                )
+            )
+
+        return first.get("snapshot_id"), playlist_track_ids(items)
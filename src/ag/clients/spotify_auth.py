@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from ag.config import SpotifyConfig
+
+# Treat the token as expired this long before Spotify says it is.
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+# Start a background refresh once the token is this close to expiring.
+TOKEN_REFRESH_AHEAD_SECONDS = 5 * 60
+
+TokenRefresher = Callable[[str], Dict[str, Any]]
+
+_token_managers: Dict[Hashable, "SpotifyTokenManager"] = {}
+_token_managers_lock = threading.Lock()
+
+
+class SpotifyTokenManager:
+    """Caches a Spotify user access token and refreshes it before it expires.
+
+    It implements spotipy's auth manager protocol (``get_access_token``), so
+    a single ``spotipy.Spotify(auth_manager=...)`` keeps working across the
+    hour-long token lifetime. Callers get the cached token until it is within
+    ``refresh_ahead_seconds`` of expiry, at which point one background thread
+    fetches the next token; only a token that is already (nearly) expired
+    makes a caller wait for the refresh.
+    """
+
+    def __init__(
+        self,
+        refresher: TokenRefresher,
+        refresh_token: str,
+        *,
+        expiry_margin_seconds: float = TOKEN_EXPIRY_MARGIN_SECONDS,
+        refresh_ahead_seconds: float = TOKEN_REFRESH_AHEAD_SECONDS,
+    ):
+        self.refresher = refresher
+        self.refresh_token = refresh_token
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.refresh_ahead_seconds = max(refresh_ahead_seconds, expiry_margin_seconds)
+        self._access_token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        # Separate from _lock so scheduling never waits on a running refresh.
+        self._background_lock = threading.Lock()
+        self._background: Optional[threading.Thread] = None
+        self.refresh_count = 0
+
+    def get_access_token(self, as_dict: bool = False) -> Any:
+        token = self._current_token()
+        if as_dict:
+            return {"access_token": token, "expires_at": self._expires_at}
+        return token
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after Spotify rejected it with a 401."""
+        with self._lock:
+            self._access_token = None
+            self._expires_at = 0.0
+
+    def _current_token(self) -> str:
+        remaining = self._expires_at - time.time()
+        token = self._access_token
+        if token is not None and remaining > self.expiry_margin_seconds:
+            if remaining <= self.refresh_ahead_seconds:
+                self._refresh_in_background()
+            return token
+
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock.
+            if (
+                self._access_token is not None
+                and self._expires_at - time.time() > self.expiry_margin_seconds
+            ):
+                return self._access_token
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> str:
+        token_info = self.refresher(self.refresh_token)
+        self._access_token = token_info["access_token"]
+        expires_at = token_info.get("expires_at")
+        if expires_at is None:
+            expires_at = time.time() + float(token_info.get("expires_in", 3600))
+        self._expires_at = float(expires_at)
+        # Spotify may rotate the refresh token; keep using the newest one.
+        self.refresh_token = token_info.get("refresh_token") or self.refresh_token
+        self.refresh_count += 1
+        logging.info("Refreshed Spotify access token")
+        return self._access_token
+
+    def _refresh_in_background(self) -> None:
+        with self._background_lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(
+                target=self._background_refresh,
+                name="spotify-token-refresh",
+                daemon=True,
+            )
+            self._background.start()
+
+    def _background_refresh(self) -> None:
+        with self._lock:
+            if self._expires_at - time.time() > self.refresh_ahead_seconds:
+                return
+            try:
+                self._refresh_locked()
+            except Exception:
+                # The token is still valid; the next caller will retry.
+                logging.exception("Background Spotify token refresh failed")
+
+
+def get_token_manager(
+    config: SpotifyConfig, refresher: TokenRefresher
+) -> SpotifyTokenManager:
+    """Return the process-wide token manager for this app and user.
+
+    Sharing it means jobs in a warm process reuse the cached access token
+    instead of spending an OAuth round trip per job.
+    """
+    key = (config.client_id, config.client_secret, config.refresh_token, config.scopes)
+    with _token_managers_lock:
+        manager = _token_managers.get(key)
+        if manager is None:
+            manager = SpotifyTokenManager(refresher, config.refresh_token or "")
+            _token_managers[key] = manager
+        return manager
+
+
+def reset_token_managers() -> None:
+    """Forget every shared token manager (mainly for tests)."""
+    with _token_managers_lock:
+        _token_managers.clear()
@@ -2,13 +2,35 @@ import os
 from dataclasses import dataclass
 from typing import Optional
 
+DEFAULT_SETLIST_CACHE_TTL_SECONDS = 3 * 24 * 60 * 60
+# Only /tmp is writable inside Lambda.
+LAMBDA_CACHE_DIR = "/tmp/ag"
+
+
+def _default_cache_target(name: str) -> str:
+    """Local JSON file, or an in-memory tier over SQLite in /tmp on Lambda."""
+    if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        return f"memory://,file://{LAMBDA_CACHE_DIR}/{name}.sqlite"
+    return f"{name}.json"
+
+
+def _optional_float(name: str, default: Optional[float]) -> Optional[float]:
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    if raw.strip().lower() in {"none", "never"}:
+        return None
+    return float(raw)
+
 
 @dataclass(frozen=True)
 class CacheConfig:
-    """File locations for caches."""
+    """File locations and expiry for caches."""
 
     setlist_cache: Optional[str]
     spotify_track_cache: Optional[str]
+    setlist_cache_ttl_seconds: Optional[float] = None
+    spotify_track_cache_ttl_seconds: Optional[float] = None
 
 
 @dataclass(frozen=True)
@@ -16,6 +38,8 @@ class SetlistFmConfig:
     """Credentials/configuration for setlist.fm."""
 
     api_key: str
+    timeout_seconds: float = 10.0
+    pool_size: int = 10
 
 
 @dataclass(frozen=True)
@@ -78,11 +102,25 @@ def load_app_config(*, require_spotify_user: bool = True) -> AppConfig:
             raise RuntimeError(f"Missing Spotify user config: {', '.join(missing_user)}")
 
     caches = CacheConfig(
-        setlist_cache=os.environ.get("SETLIST_CACHE", "setlist_cache.json"),
-        spotify_track_cache=os.environ.get("SPOTIFY_TRACK_CACHE", "spotify_cache.json"),
+        setlist_cache=os.environ.get(
+            "SETLIST_CACHE", _default_cache_target("setlist_cache")
+        ),
+        spotify_track_cache=os.environ.get(
+            "SPOTIFY_TRACK_CACHE", _default_cache_target("spotify_cache")
+        ),
+        setlist_cache_ttl_seconds=_optional_float(
+            "SETLIST_CACHE_TTL_SECONDS", DEFAULT_SETLIST_CACHE_TTL_SECONDS
+        ),
+        spotify_track_cache_ttl_seconds=_optional_float(
+            "SPOTIFY_TRACK_CACHE_TTL_SECONDS", None
+        ),
     )
 
-    setlist_cfg = SetlistFmConfig(api_key=setlist_api_key)
+    setlist_cfg = SetlistFmConfig(
+        api_key=setlist_api_key,
+        timeout_seconds=float(os.environ.get("SETLIST_FM_TIMEOUT_SECONDS", "10")),
+        pool_size=int(os.environ.get("SETLIST_FM_POOL_SIZE", "10")),
+    )
     spotify_cfg = SpotifyConfig(
         client_id=spotify_client_id,
         client_secret=spotify_client_secret,
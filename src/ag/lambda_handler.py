@@ -1,15 +1,18 @@
-"""AWS Lambda entry point for creating Spotify playlists."""
+"""AWS Lambda entry point for creating Spotify playlists.
+
+The playlist stack (``ag.run`` and with it spotipy, requests and NumPy) is
+imported on first real use, so preflights and rejected requests return
+without paying for it on a cold start.
+"""
 
 import base64
 import json
 import logging
 import os
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from dotenv import load_dotenv
 
-from ag.run import playlist_result_to_payload, run_playlist_job
-
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -51,6 +54,24 @@ APP_TOKENS = os.environ.get("APP_TOKENS", "")
 
 VALID_TOKENS = {t.strip() for t in APP_TOKENS.split(",") if t.strip()}
 
+# Caps on request-controlled fan-out; larger values are clamped to these.
+MAX_WORKERS_LIMIT = 8
+MAX_SETLIST_PAGES = 10
+
+
+def run_playlist_job(*args, **kwargs):
+    """Lazily import and call ``ag.run.run_playlist_job``."""
+    from ag.run import run_playlist_job as _run_playlist_job
+
+    return _run_playlist_job(*args, **kwargs)
+
+
+def playlist_result_to_payload(result):
+    """Lazily import and call ``ag.run.playlist_result_to_payload``."""
+    from ag.run import playlist_result_to_payload as _playlist_result_to_payload
+
+    return _playlist_result_to_payload(result)
+
 
 def _response(status: int, body: Dict[str, Any]) -> Dict[str, Any]:
     headers = {"Content-Type": "application/json"}
@@ -78,6 +99,34 @@ def _bad_request(message="bad_request"):
     return _response(400, {"error": message})
 
 
+def _int_option(payload: Dict[str, Any], field: str, default: Optional[int]) -> int:
+    """Read an integer option given as a JSON number or numeric string."""
+    raw = payload.get(field, default)
+    if isinstance(raw, bool) or not isinstance(raw, (int, str)):
+        raise ValueError(f"{field} must be an integer")
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{field} must be an integer") from None
+
+
+def _bounded_int(
+    payload: Dict[str, Any], field: str, default: int, maximum: int
+) -> int:
+    """Read a positive integer option, clamped to ``maximum``."""
+    return min(max(_int_option(payload, field, default), 1), maximum)
+
+
+def _max_age_days(payload: Dict[str, Any]) -> Optional[int]:
+    """Read ``setlist_max_age_days``; None (the default) means no age limit."""
+    if payload.get("setlist_max_age_days") is None:
+        return None
+    value = _int_option(payload, "setlist_max_age_days", None)
+    if value < 0:
+        raise ValueError("setlist_max_age_days must be an integer of at least 0")
+    return value
+
+
 def _http_method(event: Dict[str, Any]) -> str:
     context = event.get("requestContext") or {}
     http_info = context.get("http") or {}
@@ -110,12 +159,15 @@ def main_logic(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     copy_last_setlist_threshold = int(payload.get("copy_last_setlist_threshold", 15))
     max_setlist_length = int(payload.get("max_setlist_length", 12))
-    no_cache = bool(payload.get("no_cache", True))
+    no_cache = bool(payload.get("no_cache", False))
     rate_limit = float(payload.get("rate_limit", 1.0))
     create_playlist = bool(payload.get("create_playlist", bool(playlist_name)))
     force_smart_setlist = payload.get("force_smart_setlist")
     force_smart = bool(force_smart_setlist) if force_smart_setlist is not None else None
     use_fuzzy_search = bool(payload.get("use_fuzzy_search", False))
+    max_workers = _bounded_int(payload, "max_workers", 1, MAX_WORKERS_LIMIT)
+    setlist_pages = _bounded_int(payload, "setlist_pages", 1, MAX_SETLIST_PAGES)
+    setlist_max_age_days = _max_age_days(payload)
 
     spotify_user_creds_present = all(
         (
@@ -145,6 +197,9 @@ def main_logic(payload: Dict[str, Any]) -> Dict[str, Any]:
         use_fuzzy_search=use_fuzzy_search,
         create_playlist=create_playlist,
         force_smart_setlist=force_smart,
+        max_workers=max_workers,
+        setlist_pages=setlist_pages,
+        setlist_max_age_days=setlist_max_age_days,
     )
 
     return playlist_result_to_payload(result)
@@ -1,39 +1,250 @@
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import asdict
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Hashable, Optional, Tuple, TypeVar, Union
 
-from ag.cache import create_cache, create_null_cache
-from ag.clients.setlist_fm import SetlistFmClient
+from ag.cache import Cache, create_cache, create_null_cache
+from ag.clients.setlist_fm import (
+    SETLIST_CACHE_NAMESPACE_TTLS,
+    SetlistFmClient,
+    get_shared_session,
+)
+from ag.clients.setlist_fm_async import AsyncSetlistFmClient
 from ag.clients.spotify import SpotifyClient
-from ag.config import load_app_config
+from ag.clients.spotify_async import AsyncSpotifyClient
+from ag.clients.spotify_auth import reset_token_managers
+from ag.config import AppConfig, load_app_config
 from ag.models import PlaylistBuildResult
-from ag.services.playlist_builder import PlaylistBuilder
-from ag.utils.rate_limit import NullRateLimiter, RateLimiter
+from ag.services.playlist_builder import AsyncPlaylistBuilder, PlaylistBuilder
+from ag.utils.rate_limit import (
+    SETLIST_FM,
+    SPOTIFY_PLAYLIST_WRITE,
+    SPOTIFY_SEARCH,
+    AdaptiveRateLimiter,
+    NullRateLimiter,
+    RateLimiter,
+    RateLimiterRegistry,
+)
 
+T = TypeVar("T")
 
-def _build_builder(
-    no_cache: bool, rate_limit: float, *, require_spotify_user: bool = True
-) -> PlaylistBuilder:
-    cfg = load_app_config(require_spotify_user=require_spotify_user)
-    setlist_cache = (
-        create_null_cache() if no_cache else create_cache(cfg.caches.setlist_cache)
+# Spotify does not publish exact quotas; these stay well inside the rolling
+# 30 second window while still allowing short bursts.
+SPOTIFY_SEARCH_INTERVAL_SECONDS = 0.1
+SPOTIFY_SEARCH_BURST = 10
+SPOTIFY_WRITE_INTERVAL_SECONDS = 0.5
+SPOTIFY_WRITE_BURST = 2
+
+
+def _build_spotify_rate_limiters() -> RateLimiterRegistry:
+    """Create one adaptive bucket per Spotify quota."""
+    limiters = RateLimiterRegistry()
+    limiters.set(
+        SPOTIFY_SEARCH,
+        AdaptiveRateLimiter(
+            SPOTIFY_SEARCH_INTERVAL_SECONDS, burst=SPOTIFY_SEARCH_BURST
+        ),
     )
-    spotify_cache = (
-        create_null_cache()
-        if no_cache
-        else create_cache(cfg.caches.spotify_track_cache)
+    limiters.set(
+        SPOTIFY_PLAYLIST_WRITE,
+        AdaptiveRateLimiter(SPOTIFY_WRITE_INTERVAL_SECONDS, burst=SPOTIFY_WRITE_BURST),
     )
+    return limiters
+
+
+# Process-level components reused across warm Lambda invocations (and CLI
+# batch runs). Everything is keyed by the configuration that built it, so a
+# changed environment or option gets fresh objects instead of stale ones.
+# Keys partly come from request payloads, so each registry only keeps the
+# MAX_SHARED_COMPONENTS most recently used entries.
+MAX_SHARED_COMPONENTS = 8
+
+_registry_lock = threading.RLock()
+_caches: "OrderedDict[Hashable, Cache]" = OrderedDict()
+_setlist_rate_limiters: "OrderedDict[float, RateLimiter]" = OrderedDict()
+_spotify_rate_limiters: Optional[RateLimiterRegistry] = None
+_spotify_clients: "OrderedDict[Hashable, SpotifyClient]" = OrderedDict()
+_builders: "OrderedDict[Hashable, PlaylistBuilder]" = OrderedDict()
+
 
-    rate_limiter: Optional[RateLimiter] = (
-        NullRateLimiter() if rate_limit <= 0 else RateLimiter(rate_limit)
+def reset_shared_components() -> None:
+    """Forget every reused cache, client and builder (mainly for tests)."""
+    global _spotify_rate_limiters
+    with _registry_lock:
+        _caches.clear()
+        _setlist_rate_limiters.clear()
+        _spotify_rate_limiters = None
+        _spotify_clients.clear()
+        _builders.clear()
+    reset_token_managers()
+
+
+def _lookup(registry: "OrderedDict[Hashable, T]", key: Hashable) -> Optional[T]:
+    """Return the component stored under ``key`` and mark it recently used."""
+    component = registry.get(key)
+    if component is not None:
+        registry.move_to_end(key)
+    return component
+
+
+def _remember(registry: "OrderedDict[Hashable, T]", key: Hashable, component: T) -> T:
+    """Store ``component``, evicting the least recently used beyond the cap."""
+    registry[key] = component
+    while len(registry) > MAX_SHARED_COMPONENTS:
+        registry.popitem(last=False)
+    return component
+
+
+def shared_cache(
+    no_cache: bool,
+    target: Optional[str],
+    ttl_seconds: Optional[float],
+    namespace: str,
+    namespace_ttls: Optional[Dict[str, Optional[float]]] = None,
+) -> Cache:
+    """Reuse caches so warm invocations and batch jobs keep their contents."""
+    key = (
+        None
+        if no_cache
+        else (
+            target,
+            ttl_seconds,
+            namespace,
+            tuple(sorted((namespace_ttls or {}).items())),
+        )
     )
+    with _registry_lock:
+        cache = _lookup(_caches, key)
+        if cache is None:
+            cache = _remember(
+                _caches,
+                key,
+                create_null_cache()
+                if no_cache
+                else create_cache(
+                    target,
+                    ttl_seconds=ttl_seconds,
+                    namespace=namespace,
+                    namespace_ttls=namespace_ttls,
+                ),
+            )
+        return cache
+
+
+def shared_setlist_rate_limiter(rate_limit: float) -> RateLimiter:
+    """Reuse the setlist.fm bucket so rates learned from 429s survive runs.
 
-    setlist_client = SetlistFmClient(
-        cfg.setlist_fm.api_key, cache=setlist_cache, rate_limiter=rate_limiter
+    ``rate_limit`` <= 0 disables it; a 429 still pauses every caller.
+    """
+    key = max(0.0, rate_limit)
+    with _registry_lock:
+        limiter = _lookup(_setlist_rate_limiters, key)
+        if limiter is None:
+            limiter = _remember(
+                _setlist_rate_limiters,
+                key,
+                AdaptiveRateLimiter(key, name=SETLIST_FM)
+                if key > 0
+                else NullRateLimiter(name=SETLIST_FM),
+            )
+        return limiter
+
+
+def shared_spotify_rate_limiters() -> RateLimiterRegistry:
+    """The Spotify buckets; one set per process, whatever setlist.fm's rate is."""
+    global _spotify_rate_limiters
+    with _registry_lock:
+        if _spotify_rate_limiters is None:
+            _spotify_rate_limiters = _build_spotify_rate_limiters()
+        return _spotify_rate_limiters
+
+
+def _shared_spotify_client(cfg: AppConfig, no_cache: bool) -> SpotifyClient:
+    """Reuse Spotify clients so their access tokens and memo caches stay warm."""
+    key = (cfg.spotify, cfg.caches, no_cache)
+    with _registry_lock:
+        client = _lookup(_spotify_clients, key)
+        if client is None:
+            client = _remember(
+                _spotify_clients,
+                key,
+                SpotifyClient(
+                    cfg.spotify,
+                    track_cache=shared_cache(
+                        no_cache,
+                        cfg.caches.spotify_track_cache,
+                        cfg.caches.spotify_track_cache_ttl_seconds,
+                        "spotify",
+                    ),
+                    rate_limiters=shared_spotify_rate_limiters(),
+                ),
+            )
+        return client
+
+
+def create_setlist_client(
+    cfg: AppConfig,
+    cache: Cache,
+    rate_limit: float,
+    *,
+    setlist_pages: int = 1,
+    setlist_max_age_days: Optional[int] = None,
+) -> SetlistFmClient:
+    """Build a setlist.fm client on the shared HTTP session and limiter."""
+    return SetlistFmClient(
+        cfg.setlist_fm.api_key,
+        cache=cache,
+        rate_limiter=shared_setlist_rate_limiter(rate_limit),
+        max_pages=setlist_pages,
+        max_age_days=setlist_max_age_days,
+        session=get_shared_session(cfg.setlist_fm.pool_size),
+        timeout=cfg.setlist_fm.timeout_seconds,
     )
-    spotify_client = SpotifyClient(cfg.spotify, track_cache=spotify_cache)
 
-    return PlaylistBuilder(setlist_client, spotify_client)
+
+def _build_builder(
+    no_cache: bool,
+    rate_limit: float,
+    *,
+    require_spotify_user: bool = True,
+    max_workers: int = 1,
+    setlist_pages: int = 1,
+    setlist_max_age_days: Optional[int] = None,
+) -> PlaylistBuilder:
+    """Return a builder for these options, reusing one from an earlier call.
+
+    Only the environment is re-read per call; caches, HTTP sessions, Spotify
+    clients (and their access tokens) and rate limiters are built once per
+    distinct configuration and kept for the life of the process.
+    """
+    cfg = load_app_config(require_spotify_user=require_spotify_user)
+    key = (cfg, no_cache, rate_limit, max_workers, setlist_pages, setlist_max_age_days)
+    with _registry_lock:
+        builder = _lookup(_builders, key)
+        if builder is not None:
+            logging.info("Reusing warm playlist builder")
+            return builder
+
+        setlist_client = create_setlist_client(
+            cfg,
+            shared_cache(
+                no_cache,
+                cfg.caches.setlist_cache,
+                cfg.caches.setlist_cache_ttl_seconds,
+                "setlists",
+                SETLIST_CACHE_NAMESPACE_TTLS,
+            ),
+            rate_limit,
+            setlist_pages=setlist_pages,
+            setlist_max_age_days=setlist_max_age_days,
+        )
+        builder = PlaylistBuilder(
+            setlist_client,
+            _shared_spotify_client(cfg, no_cache),
+            max_workers=max_workers,
+        )
+        return _remember(_builders, key, builder)
 
 
 def run_playlist_job(
@@ -47,6 +258,9 @@ def run_playlist_job(
     use_fuzzy_search: bool = False,
     create_playlist: bool = True,
     force_smart_setlist: Optional[bool] = None,
+    max_workers: int = 1,
+    setlist_pages: int = 1,
+    setlist_max_age_days: Optional[int] = None,
 ) -> PlaylistBuildResult:
     """Shared orchestration for CLI/Lambda to create or preview a playlist."""
     if not band_names:
@@ -56,6 +270,9 @@ def run_playlist_job(
         no_cache,
         rate_limit,
         require_spotify_user=create_playlist,
+        max_workers=max_workers,
+        setlist_pages=setlist_pages,
+        setlist_max_age_days=setlist_max_age_days,
     )
 
     result = builder.build_playlist(
@@ -69,9 +286,125 @@ def run_playlist_job(
     )
 
     logging.info("Playlist build complete (created=%s)", result.created_playlist)
+    log_component_stats(builder)
     return result
 
 
+def _build_async_builder(
+    no_cache: bool,
+    rate_limit: float,
+    *,
+    require_spotify_user: bool,
+    setlist_pages: int = 1,
+    setlist_max_age_days: Optional[int] = None,
+) -> AsyncPlaylistBuilder:
+    """Async clients over the same shared caches, limiters and token managers.
+
+    The clients themselves are cheap and hold per-loop state, so they are
+    built per job; the connection pool is shared per event loop.
+    """
+    cfg = load_app_config(require_spotify_user=require_spotify_user)
+    setlist_client = AsyncSetlistFmClient(
+        cfg.setlist_fm.api_key,
+        cache=shared_cache(
+            no_cache,
+            cfg.caches.setlist_cache,
+            cfg.caches.setlist_cache_ttl_seconds,
+            "setlists",
+            SETLIST_CACHE_NAMESPACE_TTLS,
+        ),
+        rate_limiter=shared_setlist_rate_limiter(rate_limit),
+        max_pages=setlist_pages,
+        max_age_days=setlist_max_age_days,
+    )
+    spotify_client = AsyncSpotifyClient(
+        cfg.spotify,
+        track_cache=shared_cache(
+            no_cache,
+            cfg.caches.spotify_track_cache,
+            cfg.caches.spotify_track_cache_ttl_seconds,
+            "spotify",
+        ),
+        rate_limiters=shared_spotify_rate_limiters(),
+    )
+    return AsyncPlaylistBuilder(setlist_client, spotify_client)
+
+
+async def run_playlist_job_async(
+    band_names: Tuple[str, ...],
+    playlist_name: Optional[str],
+    copy_last_setlist_threshold: int,
+    max_setlist_length: int,
+    *,
+    no_cache: bool = False,
+    rate_limit: float = 1.0,
+    use_fuzzy_search: bool = False,
+    create_playlist: bool = True,
+    force_smart_setlist: Optional[bool] = None,
+    setlist_pages: int = 1,
+    setlist_max_age_days: Optional[int] = None,
+) -> PlaylistBuildResult:
+    """``run_playlist_job`` for callers already running an event loop."""
+    if not band_names:
+        raise ValueError("band_names cannot be empty")
+
+    builder = _build_async_builder(
+        no_cache,
+        rate_limit,
+        require_spotify_user=create_playlist,
+        setlist_pages=setlist_pages,
+        setlist_max_age_days=setlist_max_age_days,
+    )
+    result = await builder.build_playlist(
+        band_names,
+        playlist_name,
+        copy_last_setlist_threshold,
+        max_setlist_length,
+        force_smart_setlist=force_smart_setlist,
+        use_fuzzy_search=use_fuzzy_search,
+        create_playlist=create_playlist,
+    )
+
+    logging.info("Playlist build complete (created=%s)", result.created_playlist)
+    log_component_stats(builder)
+    return result
+
+
+def log_component_stats(
+    builder: Union[PlaylistBuilder, AsyncPlaylistBuilder],
+) -> None:
+    """Log cache hit rates and the process-wide rate limiter totals."""
+    for name, cache in (
+        ("setlists", builder.setlist_client.cache),
+        ("spotify", builder.spotify_client.track_cache),
+    ):
+        cache_stats = cache.stats()
+        logging.info(
+            "Cache %s: %s hits, %s misses, %s evictions, %s entries in memory",
+            name,
+            cache_stats.hits,
+            cache_stats.misses,
+            cache_stats.evictions,
+            cache_stats.entries,
+        )
+    # Limiters are shared across runs, so these totals are process-wide.
+    limiter_stats = builder.spotify_client.rate_limiters.stats()
+    setlist_limiter = builder.setlist_client.rate_limiter
+    if not isinstance(setlist_limiter, NullRateLimiter):
+        limiter_stats = {SETLIST_FM: setlist_limiter.stats(), **limiter_stats}
+    for name, stats in limiter_stats.items():
+        logging.info(
+            "Rate limiter %s: %s calls, %s delayed (%.2fs), %s upstream 429s, "
+            "now %.2f req/s",
+            name,
+            stats.acquired,
+            stats.waited,
+            stats.wait_seconds,
+            stats.throttled,
+            stats.rate,
+        )
+
+
 def playlist_result_to_payload(result: PlaylistBuildResult) -> Dict[str, Any]:
     """Convert PlaylistBuildResult into a JSON-serializable structure."""
     return {
@@ -1,12 +1,15 @@
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
-
-import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ag.clients.setlist_fm import SetlistFmClient
+from ag.clients.setlist_fm_async import AsyncSetlistFmClient
 from ag.clients.spotify import SpotifyClient
-from ag.models import Playlist, PlaylistBuildResult, SetlistResult
+from ag.clients.spotify_async import AsyncSpotifyClient
+from ag.models import Playlist, PlaylistBuildResult, SetlistResult, SongMatch
 from ag.services.setlist_selection import (
     extract_common_songs,
     extract_last_setlist,
@@ -20,10 +23,93 @@ class BandSetlistPlan:
     band: str
     songs: List[str]
     setlist_type: str  # "fresh" | "estimated"
-    setlist_date: Optional[pd.Timestamp]
+    setlist_date: Optional[datetime]
     last_setlist_age_days: Optional[int]
 
 
+def plan_band_songs(
+    band: str,
+    setlists: Dict[str, Any],
+    *,
+    copy_last_setlist_threshold: int,
+    max_setlist_length: int,
+    force_smart_setlist: Optional[bool] = None,
+) -> Optional[BandSetlistPlan]:
+    """Choose a band's songs from its fetched setlists (no I/O)."""
+    if not setlists:
+        logging.warning("No setlists found for %s", band)
+        return None
+
+    songs_by_date = extract_common_songs(setlists)
+    if not songs_by_date:
+        logging.warning("No songs found in setlists for %s", band)
+        return None
+
+    songs, last_date = extract_last_setlist(songs_by_date)
+    raw_age_days = (datetime.now() - last_date).days
+    if raw_age_days < 0:
+        logging.warning(
+            "%s: Last setlist date %s is in the future, treating as stale/estimated",
+            band,
+            last_date,
+        )
+        last_setlist_age = raw_age_days
+    else:
+        last_setlist_age = raw_age_days
+
+    if force_smart_setlist is True:
+        use_smart = True
+    elif raw_age_days < 0:
+        use_smart = True
+    else:
+        use_smart = should_use_smart_setlist(
+            last_setlist_age, copy_last_setlist_threshold
+        )
+
+    if use_smart:
+        logging.info(
+            "%s: Last setlist %s is %s days old. Smart setlist will be used.",
+            band,
+            last_date,
+            last_setlist_age,
+        )
+        songs = extract_smart_setlist(songs_by_date, max_setlist_length)
+        setlist_type = "estimated"
+    else:
+        logging.info(
+            "%s: Last setlist %s is fresh. Using last setlist.",
+            band,
+            last_date,
+        )
+        setlist_type = "fresh"
+
+    logging.info("%s: %s songs", band, len(songs))
+    return BandSetlistPlan(
+        band=band,
+        songs=songs,
+        setlist_type=setlist_type,
+        setlist_date=last_date,
+        last_setlist_age_days=max(last_setlist_age, 0),
+    )
+
+
+def build_setlist_results(
+    setlist_plans: List[BandSetlistPlan], mapped_tracks: Dict[str, List[SongMatch]]
+) -> List[SetlistResult]:
+    return [
+        SetlistResult(
+            band=plan.band,
+            setlist_type=plan.setlist_type,
+            setlist_date=plan.setlist_date.date().isoformat()
+            if plan.setlist_date is not None
+            else None,
+            last_setlist_age_days=plan.last_setlist_age_days,
+            songs=mapped_tracks.get(plan.band, []),
+        )
+        for plan in setlist_plans
+    ]
+
+
 class PlaylistBuilder:
     """Orchestrates fetching setlists, selecting songs, and populating Spotify playlists."""
 
@@ -31,9 +117,12 @@ class PlaylistBuilder:
         self,
         setlist_client: SetlistFmClient,
         spotify_client: SpotifyClient,
+        *,
+        max_workers: int = 1,
     ):
         self.setlist_client = setlist_client
         self.spotify_client = spotify_client
+        self.max_workers = max(1, int(max_workers))
 
     def _collect_band_songs(
         self,
@@ -44,63 +133,169 @@ class PlaylistBuilder:
         force_smart_setlist: Optional[bool] = None,
     ) -> Optional[BandSetlistPlan]:
         setlists = self.setlist_client.get_recent_setlists(band)
-        if not setlists:
-            logging.warning("No setlists found for %s", band)
-            return None
-
-        songs_by_date = extract_common_songs(setlists)
-        if not songs_by_date:
-            logging.warning("No songs found in setlists for %s", band)
-            return None
-
-        songs, last_date = extract_last_setlist(songs_by_date)
-        raw_age_days = (pd.Timestamp.now() - last_date).days
-        if raw_age_days < 0:
-            logging.warning(
-                "%s: Last setlist date %s is in the future, treating as stale/estimated",
-                band,
-                last_date,
+        return plan_band_songs(
+            band,
+            setlists,
+            copy_last_setlist_threshold=copy_last_setlist_threshold,
+            max_setlist_length=max_setlist_length,
+            force_smart_setlist=force_smart_setlist,
+        )
+
+    def _process_band(
+        self,
+        band: str,
+        *,
+        use_fuzzy_search: bool,
+        resolved: Dict[str, SongMatch],
+        **collect_kwargs,
+    ) -> Tuple[Optional[BandSetlistPlan], List[SongMatch]]:
+        plan = self._collect_band_songs(band, **collect_kwargs)
+        if not plan:
+            return None, []
+        mapped = self.spotify_client.map_tracks(
+            {band: plan.songs}, use_fuzzy_search=use_fuzzy_search, resolved=resolved
+        )
+        return plan, mapped.get(band, [])
+
+    def _run_concurrent(
+        self,
+        lineup: List[str],
+        *,
+        use_fuzzy_search: bool,
+        **collect_kwargs,
+    ) -> Tuple[List[BandSetlistPlan], Dict[str, List[SongMatch]]]:
+        """Run setlist collection and track mapping per band on a thread pool.
+
+        Results are gathered in lineup order so the output matches the
+        sequential path; rate limiting is left to the shared client limiters.
+        Workers share one match memo so each song is resolved once per build.
+        """
+        resolved: Dict[str, SongMatch] = {}
+        unique_bands = list(dict.fromkeys(lineup))
+        workers = min(self.max_workers, len(unique_bands)) or 1
+        logging.info("Processing %s bands with %s workers", len(unique_bands), workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                band: executor.submit(
+                    self._process_band,
+                    band,
+                    use_fuzzy_search=use_fuzzy_search,
+                    resolved=resolved,
+                    **collect_kwargs,
+                )
+                for band in unique_bands
+            }
+            outcomes = {band: future.result() for band, future in futures.items()}
+
+        setlist_plans = [
+            outcomes[band][0] for band in lineup if outcomes[band][0] is not None
+        ]
+        if not setlist_plans:
+            raise RuntimeError("No songs gathered for any bands in lineup")
+
+        mapped_tracks = {
+            band: songs for band, (plan, songs) in outcomes.items() if plan is not None
+        }
+        return setlist_plans, mapped_tracks
+
+    def build_playlist(
+        self,
+        band_names: Iterable[str],
+        playlist_name: Optional[str],
+        copy_last_setlist_threshold: int,
+        max_setlist_length: int,
+        *,
+        force_smart_setlist: Optional[bool] = None,
+        use_fuzzy_search: bool = False,
+        create_playlist: bool = True,
+    ) -> PlaylistBuildResult:
+        if create_playlist and not playlist_name:
+            raise ValueError("playlist_name is required when creating a playlist")
+
+        lineup = list(band_names)
+        logging.info("Bands in lineup: %s", ", ".join(lineup))
+
+        collect_kwargs = dict(
+            copy_last_setlist_threshold=copy_last_setlist_threshold,
+            max_setlist_length=max_setlist_length,
+            force_smart_setlist=force_smart_setlist,
+        )
+        if self.max_workers > 1:
+            setlist_plans, mapped_tracks = self._run_concurrent(
+                lineup, use_fuzzy_search=use_fuzzy_search, **collect_kwargs
             )
-            last_setlist_age = raw_age_days
+            songs_by_band: Dict[str, List[str]] = {
+                plan.band: plan.songs for plan in setlist_plans
+            }
         else:
-            last_setlist_age = raw_age_days
+            setlist_plans = []
+            for band in lineup:
+                plan = self._collect_band_songs(band, **collect_kwargs)
+                if plan:
+                    setlist_plans.append(plan)
 
-        if force_smart_setlist is True:
-            use_smart = True
-        elif raw_age_days < 0:
-            use_smart = True
-        else:
-            use_smart = should_use_smart_setlist(
-                last_setlist_age, copy_last_setlist_threshold
-            )
+            if not setlist_plans:
+                raise RuntimeError("No songs gathered for any bands in lineup")
 
-        if use_smart:
-            logging.info(
-                "%s: Last setlist %s is %s days old. Smart setlist will be used.",
-                band,
-                last_date,
-                last_setlist_age,
+            songs_by_band = {plan.band: plan.songs for plan in setlist_plans}
+            mapped_tracks = self.spotify_client.map_tracks(
+                songs_by_band, use_fuzzy_search=use_fuzzy_search
             )
-            songs = extract_smart_setlist(songs_by_date, max_setlist_length)
-            setlist_type = "estimated"
-        else:
-            logging.info(
-                "%s: Last setlist %s is fresh. Using last setlist.",
-                band,
-                last_date,
+
+        setlist_results = build_setlist_results(setlist_plans, mapped_tracks)
+
+        playlist: Optional[Playlist] = None
+        if create_playlist:
+            playlist = self.spotify_client.find_or_create_playlist(playlist_name)
+            playlist = self.spotify_client.populate_playlist(
+                playlist,
+                songs_by_band,
+                use_fuzzy_search=use_fuzzy_search,
+                mapped_tracks=mapped_tracks,
             )
-            setlist_type = "fresh"
-
-        logging.info("%s: %s songs", band, len(songs))
-        return BandSetlistPlan(
-            band=band,
-            songs=songs,
-            setlist_type=setlist_type,
-            setlist_date=last_date,
-            last_setlist_age_days=max(last_setlist_age, 0),
+
+        return PlaylistBuildResult(
+            setlists=setlist_results,
+            playlist=playlist,
+            created_playlist=playlist is not None,
         )
 
-    def build_playlist(
+
+class AsyncPlaylistBuilder:
+    """asyncio entry point mirroring :class:`PlaylistBuilder` on the async clients.
+
+    Every band's setlists and every distinct song lookup run concurrently on
+    one event loop; the clients' rate limiters and the shared connection
+    pool bound how many requests are actually in flight.
+    """
+
+    def __init__(
+        self,
+        setlist_client: AsyncSetlistFmClient,
+        spotify_client: AsyncSpotifyClient,
+    ):
+        self.setlist_client = setlist_client
+        self.spotify_client = spotify_client
+
+    async def _process_band(
+        self,
+        band: str,
+        *,
+        use_fuzzy_search: bool,
+        resolved: Dict[str, SongMatch],
+        **collect_kwargs,
+    ) -> Tuple[Optional[BandSetlistPlan], List[SongMatch]]:
+        setlists = await self.setlist_client.get_recent_setlists(band)
+        plan = plan_band_songs(band, setlists, **collect_kwargs)
+        if not plan:
+            return None, []
+        mapped = await self.spotify_client.map_tracks(
+            {band: plan.songs}, use_fuzzy_search=use_fuzzy_search, resolved=resolved
+        )
+        return plan, mapped.get(band, [])
+
+    async def build_playlist(
         self,
         band_names: Iterable[str],
         playlist_name: Optional[str],
@@ -116,53 +311,48 @@ class PlaylistBuilder:
 
         lineup = list(band_names)
         logging.info("Bands in lineup: %s", ", ".join(lineup))
-
-        setlist_plans: List[BandSetlistPlan] = []
-        for band in lineup:
-            plan = self._collect_band_songs(
-                band,
-                copy_last_setlist_threshold=copy_last_setlist_threshold,
-                max_setlist_length=max_setlist_length,
-                force_smart_setlist=force_smart_setlist,
+        unique_bands = list(dict.fromkeys(lineup))
+        resolved: Dict[str, SongMatch] = {}
+        outcomes = dict(
+            zip(
+                unique_bands,
+                await asyncio.gather(
+                    *(
+                        self._process_band(
+                            band,
+                            use_fuzzy_search=use_fuzzy_search,
+                            resolved=resolved,
+                            copy_last_setlist_threshold=copy_last_setlist_threshold,
+                            max_setlist_length=max_setlist_length,
+                            force_smart_setlist=force_smart_setlist,
+                        )
+                        for band in unique_bands
+                    )
+                ),
             )
-            if plan:
-                setlist_plans.append(plan)
+        )
 
+        setlist_plans = [
+            outcomes[band][0] for band in lineup if outcomes[band][0] is not None
+        ]
         if not setlist_plans:
             raise RuntimeError("No songs gathered for any bands in lineup")
-
-        songs_by_band: Dict[str, List[str]] = {
-            plan.band: plan.songs for plan in setlist_plans
+        mapped_tracks = {
+            band: songs for band, (plan, songs) in outcomes.items() if plan is not None
         }
-        mapped_tracks = self.spotify_client.map_tracks(
-            songs_by_band, use_fuzzy_search=use_fuzzy_search
-        )
-
-        setlist_results = [
-            SetlistResult(
-                band=plan.band,
-                setlist_type=plan.setlist_type,
-                setlist_date=plan.setlist_date.date().isoformat()
-                if plan.setlist_date is not None
-                else None,
-                last_setlist_age_days=plan.last_setlist_age_days,
-                songs=mapped_tracks.get(plan.band, []),
-            )
-            for plan in setlist_plans
-        ]
 
         playlist: Optional[Playlist] = None
         if create_playlist:
-            playlist = self.spotify_client.find_or_create_playlist(playlist_name)
-            self.spotify_client.populate_playlist(
+            playlist = await self.spotify_client.find_or_create_playlist(playlist_name)
+            playlist = await self.spotify_client.populate_playlist(
                 playlist,
-                songs_by_band,
+                {plan.band: plan.songs for plan in setlist_plans},
                 use_fuzzy_search=use_fuzzy_search,
                 mapped_tracks=mapped_tracks,
             )
 
         return PlaylistBuildResult(
-            setlists=setlist_results,
+            setlists=build_setlist_results(setlist_plans, mapped_tracks),
             playlist=playlist,
             created_playlist=playlist is not None,
         )
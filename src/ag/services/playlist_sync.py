@@ -0,0 +1,221 @@
+import bisect
+import logging
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Spotify accepts at most this many items per add/remove call.
+PLAYLIST_BATCH_SIZE = 100
+# Diffing keeps "added at" dates and never empties the playlist, so it is
+# preferred until it needs this many times the calls of a full rewrite.
+SYNC_CALL_BUDGET_FACTOR = 2
+
+
+@dataclass(frozen=True)
+class PlaylistSyncPlan:
+    """Edits that turn the current playlist order into the desired one.
+
+    Operations are meant to be applied in order: removals (highest position
+    first, so earlier positions never shift), then single-item moves in
+    Spotify's ``range_start``/``insert_before`` terms, then insertions.
+    """
+
+    removals: List[Tuple[str, int]] = field(default_factory=list)
+    moves: List[Tuple[int, int]] = field(default_factory=list)
+    insertions: List[Tuple[int, List[str]]] = field(default_factory=list)
+
+    @property
+    def is_noop(self) -> bool:
+        return not (self.removals or self.moves or self.insertions)
+
+    @property
+    def write_calls(self) -> int:
+        return (
+            math.ceil(len(self.removals) / PLAYLIST_BATCH_SIZE)
+            + len(self.moves)
+            + len(self.insertions)
+        )
+
+
+def full_rewrite_calls(track_count: int) -> int:
+    """Calls needed to replace the playlist outright (replace, then adds)."""
+    return max(1, math.ceil(track_count / PLAYLIST_BATCH_SIZE))
+
+
+def _longest_increasing_subsequence(values: Sequence[int]) -> List[int]:
+    """Indices of one longest strictly increasing subsequence (patience sort)."""
+    # tails[k] is the smallest tail value of an increasing run of length k + 1.
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        k = bisect.bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[k] = value
+            tail_index[k] = i
+        previous[i] = tail_index[k - 1] if k else -1
+
+    result: List[int] = []
+    i = tail_index[-1] if tail_index else -1
+    while i != -1:
+        result.append(i)
+        i = previous[i]
+    return result[::-1]
+
+
+def plan_playlist_sync(
+    current: Sequence[str], desired: Sequence[str]
+) -> PlaylistSyncPlan:
+    """Compute the edits that turn ``current`` into ``desired``.
+
+    Surplus occurrences are removed, tracks that stay keep their relative
+    order where possible (a longest increasing subsequence of their target
+    positions stays put, so the number of moves is minimal) and missing
+    tracks are inserted in contiguous runs.
+    """
+    wanted = Counter(desired)
+    kept_counts: Counter = Counter()
+    kept: List[str] = []
+    removals: List[Tuple[str, int]] = []
+    for position, track in enumerate(current):
+        if kept_counts[track] < wanted[track]:
+            kept_counts[track] += 1
+            kept.append(track)
+        else:
+            removals.append((track, position))
+    removals.reverse()
+
+    # The n-th kept copy of a track maps to its n-th occurrence in desired.
+    occurrences: Dict[str, List[int]] = defaultdict(list)
+    for index, track in enumerate(desired):
+        occurrences[track].append(index)
+    used: Counter = Counter()
+    targets: List[int] = []
+    for track in kept:
+        targets.append(occurrences[track][used[track]])
+        used[track] += 1
+
+    stay = _longest_increasing_subsequence(targets)
+    placed = sorted(targets[i] for i in stay)
+    working = list(targets)
+    moves: List[Tuple[int, int]] = []
+    for target in sorted(set(targets) - set(placed)):
+        start = working.index(target)
+        k = bisect.bisect_left(placed, target)
+        insert_before = working.index(placed[k - 1]) + 1 if k else 0
+        if insert_before not in (start, start + 1):
+            moves.append((start, insert_before))
+            working.pop(start)
+            # insert_before counts positions before the item was taken out.
+            landing = insert_before - 1 if start < insert_before else insert_before
+            working.insert(landing, target)
+        placed.insert(k, target)
+
+    present = set(targets)
+    insertions: List[Tuple[int, List[str]]] = []
+    run_start = None
+    for index in range(len(desired) + 1):
+        missing = index < len(desired) and index not in present
+        if missing and run_start is None:
+            run_start = index
+        elif not missing and run_start is not None:
+            for offset in range(run_start, index, PLAYLIST_BATCH_SIZE):
+                chunk_end = min(index, offset + PLAYLIST_BATCH_SIZE)
+                insertions.append((offset, list(desired[offset:chunk_end])))
+            run_start = None
+
+    return PlaylistSyncPlan(removals=removals, moves=moves, insertions=insertions)
+
+
+@dataclass(frozen=True)
+class PlaylistWrite:
+    """One playlist write call; a sync sends them in order.
+
+    ``kind`` is "replace" or "add" (``track_ids``, added at ``position`` or
+    appended when it is None), "remove" (``positions`` per track ID) or
+    "move" (``range_start`` to ``insert_before``). Removals and moves are
+    pinned to the latest snapshot ID.
+    """
+
+    kind: str
+    track_ids: List[str] = field(default_factory=list)
+    position: Optional[int] = None
+    positions: Dict[str, List[int]] = field(default_factory=dict)
+    range_start: int = 0
+    insert_before: int = 0
+
+
+def rewrite_writes(track_ids: Sequence[str]) -> List[PlaylistWrite]:
+    """Replace with the first batch (never leaving it empty), then append."""
+    batches = [
+        list(track_ids[start : start + PLAYLIST_BATCH_SIZE])
+        for start in range(0, len(track_ids), PLAYLIST_BATCH_SIZE)
+    ] or [[]]
+    return [PlaylistWrite("replace", track_ids=batches[0])] + [
+        PlaylistWrite("add", track_ids=batch) for batch in batches[1:]
+    ]
+
+
+def playlist_writes(
+    playlist_name: str, current: Optional[Sequence[str]], desired: Sequence[str]
+) -> List[PlaylistWrite]:
+    """Writes that make a playlist holding ``current`` hold ``desired``.
+
+    The diff from :func:`plan_playlist_sync` is used unless ``current`` is
+    None (items without IDs cannot be addressed) or the diff would take
+    well over the calls of a rewrite.
+    """
+    if current is None:
+        logging.info("Playlist %s has items without IDs, rewriting", playlist_name)
+        return rewrite_writes(desired)
+
+    plan = plan_playlist_sync(current, desired)
+    if plan.is_noop:
+        logging.info("Playlist %s is already up to date", playlist_name)
+        return []
+    if plan.write_calls > SYNC_CALL_BUDGET_FACTOR * full_rewrite_calls(len(desired)):
+        logging.info("Playlist %s changed too much to diff, rewriting", playlist_name)
+        return rewrite_writes(desired)
+
+    writes: List[PlaylistWrite] = []
+    for start in range(0, len(plan.removals), PLAYLIST_BATCH_SIZE):
+        positions: Dict[str, List[int]] = {}
+        for track_id, position in plan.removals[start : start + PLAYLIST_BATCH_SIZE]:
+            positions.setdefault(track_id, []).append(position)
+        writes.append(
+            PlaylistWrite(
+                "remove",
+                positions={
+                    track_id: sorted(found) for track_id, found in positions.items()
+                },
+            )
+        )
+    writes.extend(
+        PlaylistWrite("move", range_start=range_start, insert_before=insert_before)
+        for range_start, insert_before in plan.moves
+    )
+    writes.extend(
+        PlaylistWrite("add", track_ids=items, position=position)
+        for position, items in plan.insertions
+    )
+    logging.info(
+        "Syncing playlist %s: %s removed, %s moved, %s added in %s calls",
+        playlist_name,
+        len(plan.removals),
+        len(plan.moves),
+        sum(len(items) for _, items in plan.insertions),
+        plan.write_calls,
+    )
+    return writes
+
+
+def playlist_track_ids(items: List[Dict[str, Any]]) -> Optional[List[str]]:
+    """Track IDs of playlist items, or None if any item has no ID."""
+    track_ids = [(item.get("track") or {}).get("id") for item in items]
+    if any(track_id is None for track_id in track_ids):
+        return None
+    return track_ids
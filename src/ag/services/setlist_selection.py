@@ -1,146 +1,266 @@
 import logging
-import pandas as pd
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
 
-def derive_song_features(
-    songs_by_date: List[Tuple[str, pd.Timestamp]], decay_rate: float
-) -> pd.DataFrame:
-    if not songs_by_date:
-        return pd.DataFrame()
+SETLIST_DATE_FORMAT = "%d-%m-%Y"
 
-    names, dates = zip(*songs_by_date)
-    df = pd.DataFrame({"name": names, "date": dates})
 
-    days_since_played = (pd.Timestamp.now() - df["date"]).dt.days  # type: ignore
-    df["weight"] = decay_rate ** (days_since_played / 30)
+@dataclass
+class SongFrame:
+    """Column-oriented ``name``/``date`` rows in play order.
+
+    ``frame["name"]`` style column access mirrors the pandas frame this
+    replaced, so callers and notebooks read the same.
+    """
+
+    name: List[str] = field(default_factory=list)
+    date: List[datetime] = field(default_factory=list)
 
-    df["position"] = df.groupby("date").cumcount() + 1
-    df["setlist_size"] = df.groupby("date")["name"].transform("count")
+    def __len__(self) -> int:
+        return len(self.name)
 
-    df["is_first"] = df["position"] == 1
-    df["is_last"] = df["position"] == df["setlist_size"]
+    def __getitem__(self, column: str) -> List:
+        return getattr(self, column)
 
-    return df
+    def rows(self) -> List[Tuple[str, datetime]]:
+        return list(zip(self.name, self.date))
 
 
-def extract_common_songs(setlists) -> List[Tuple[str, pd.Timestamp]]:
-    songs_played_by_date = []
-    events = setlists["setlist"]
-    for event in events:
+SongsByDate = Union[List[Tuple[str, datetime]], SongFrame]
+SongFeatures = Dict[str, np.ndarray]
+
+
+def _as_columns(songs_by_date: SongsByDate) -> Tuple[List[str], List[datetime]]:
+    if isinstance(songs_by_date, SongFrame):
+        return list(songs_by_date.name), list(songs_by_date.date)
+    if not songs_by_date:
+        return [], []
+    names, dates = zip(*songs_by_date)
+    return list(names), list(dates)
+
+
+def derive_song_features(songs_by_date: SongsByDate, decay_rate: float) -> SongFeatures:
+    """Add recency weights and setlist positions to (name, date) rows.
+
+    Accepts either a list of (name, date) tuples or the ``SongFrame``
+    produced by ``extract_song_frame`` and returns a dict of NumPy columns
+    (empty when there are no rows).
+    """
+    names, dates = _as_columns(songs_by_date)
+    if not names:
+        return {}
+
+    now = datetime.now()
+    days_by_date = {date: (now - date).days for date in set(dates)}
+    days_since_played = np.array([days_by_date[date] for date in dates], dtype=float)
+
+    # Position within each date's setlist, counting rows in play order.
+    setlist_sizes: Dict[datetime, int] = {}
+    positions = []
+    for date in dates:
+        setlist_sizes[date] = setlist_sizes.get(date, 0) + 1
+        positions.append(setlist_sizes[date])
+    position = np.array(positions, dtype=np.int64)
+    setlist_size = np.array([setlist_sizes[date] for date in dates], dtype=np.int64)
+
+    return {
+        "name": np.array(names, dtype=object),
+        "date": np.array(dates, dtype=object),
+        "weight": decay_rate ** (days_since_played / 30),
+        "position": position,
+        "setlist_size": setlist_size,
+        "is_first": position == 1,
+        "is_last": position == setlist_size,
+    }
+
+
+def features_to_frame(features: SongFeatures):
+    """Return ``derive_song_features`` output as a pandas DataFrame.
+
+    For notebooks and ad-hoc analysis only; needs the ``analysis`` extra.
+    """
+    try:
+        import pandas as pd
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError(
+            "pandas is required for features_to_frame; "
+            "install autogigification[analysis]"
+        ) from exc
+    return pd.DataFrame(features)
+
+
+def extract_song_frame(setlists) -> SongFrame:
+    """Flatten setlist.fm JSON into a ``name``/``date`` frame in play order.
+
+    Songs without a name and tapes are skipped. Each event date is parsed
+    once with an explicit format and shared by all songs of that event.
+    """
+    frame = SongFrame()
+    skipped_tapes = 0
+    for event in setlists["setlist"]:
         event_date = event["eventDate"]
-        url = event["url"]
+        parsed_date: Optional[datetime] = None
         for set_i, set_ in enumerate(event["sets"]["set"]):
             songs = set_["song"]
+            if not songs:
+                logging.warning(
+                    "No songs in set %s on %s %s", set_i, event_date, event["url"]
+                )
+                continue
             for song in songs:
                 song_name = song.get("name")
-                song_is_tape = song.get("tape", False)
-
                 if not song_name:
                     logging.warning(
-                        f"No song name in set {set_i} on {event_date=} {url=}"
+                        "No song name in set %s on %s %s",
+                        set_i,
+                        event_date,
+                        event["url"],
                     )
                     continue
-
-                if song_is_tape:
-                    logging.info(f"{song_name} is a tape, ignoring")
+                if song.get("tape", False):
+                    skipped_tapes += 1
                     continue
+                if parsed_date is None:
+                    parsed_date = datetime.strptime(event_date, SETLIST_DATE_FORMAT)
+                frame.name.append(song_name)
+                frame.date.append(parsed_date)
 
-                songs_played_by_date.append(
-                    (song_name, pd.to_datetime(event_date, dayfirst=True))
-                )
+    if skipped_tapes:
+        logging.debug("Ignored %s tapes", skipped_tapes)
+
+    return frame
 
-            if not songs:
-                logging.warning(f"No songs in set {set_i} on {event_date=} {url=}")
-                continue
 
-    return songs_played_by_date
+def extract_common_songs(setlists) -> List[Tuple[str, datetime]]:
+    return extract_song_frame(setlists).rows()
 
 
 def extract_last_setlist(
-    songs_by_date: List[Tuple[str, pd.Timestamp]],
-) -> Tuple[List[str], pd.Timestamp]:
-    songs, dates = zip(*songs_by_date)
-    song_series = pd.Series(songs, index=dates)
-    song_series = song_series.sort_index(ascending=False)
-    last_date: pd.Timestamp = song_series.index[0]  # type: ignore
-    last_setlist = song_series.loc[last_date]
+    songs_by_date: SongsByDate,
+) -> Tuple[List[str], Optional[datetime]]:
+    names, dates = _as_columns(songs_by_date)
+    if not dates:
+        return [], None
+    last_date = max(dates)
+    last_setlist = [name for name, date in zip(names, dates) if date == last_date]
 
     if len(last_setlist) < 5:
         logging.info(f"Less than 5 songs played on {last_date}")
 
-    return list(last_setlist), last_date
-
-
-def extract_smart_setlist(
-    songs_by_date: List[Tuple[str, pd.Timestamp]], setlist_length: int
-) -> List[str]:
-    df = derive_song_features(songs_by_date, decay_rate=0.9)
-    if df.empty:
+    return last_setlist, last_date
+
+
+POSITION_BINS = (0.0, 0.2, 0.8, 1.0)
+POSITION_LABELS = ("Start", "Middle", "End")
+
+
+def _bin_weight_matrix(
+    codes: np.ndarray,
+    weights: np.ndarray,
+    normalised_position: np.ndarray,
+    n_songs: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum weights per (position bin, song); bins are right-closed like pd.cut.
+
+    Returns the matrix and a flag per bin telling whether any row fell in it.
+    """
+    edges = np.asarray(POSITION_BINS)
+    bin_idx = np.searchsorted(edges, normalised_position, side="left") - 1
+    in_range = (bin_idx >= 0) & (bin_idx < len(POSITION_LABELS))
+    matrix = np.zeros((len(POSITION_LABELS), n_songs))
+    np.add.at(matrix, (bin_idx[in_range], codes[in_range]), weights[in_range])
+    observed = np.bincount(bin_idx[in_range], minlength=len(POSITION_LABELS)) > 0
+    return matrix, observed
+
+
+def _best_song(codes: np.ndarray, weights: np.ndarray, rows: np.ndarray, n_songs: int):
+    """Song id with the highest summed weight over ``rows`` (first id wins ties)."""
+    if not rows.any():
+        return None
+    sums = np.full(n_songs, -np.inf)
+    present = np.unique(codes[rows])
+    sums[present] = np.bincount(codes[rows], weights=weights[rows], minlength=n_songs)[
+        present
+    ]
+    return int(np.argmax(sums))
+
+
+def extract_smart_setlist(songs_by_date: SongsByDate, setlist_length: int) -> List[str]:
+    """Estimate a setlist from weighted play history.
+
+    Songs are encoded as integer ids (in sorted name order) and the
+    position-bin weights are summed into a NumPy matrix once, so each pick
+    is a masked argmax over songs ranked by overall weight.
+    """
+    features = derive_song_features(songs_by_date, decay_rate=0.9)
+    if not features:
         logging.warning("No song data available to build smart setlist")
         return []
 
-    df["normalised_position"] = df["position"] / df["setlist_size"]
-
-    position_bins = [0, 0.2, 0.8, 1]
-    position_labels = ["Start", "Middle", "End"]
-    df["position_bin"] = pd.cut(
-        df["normalised_position"], bins=position_bins, labels=position_labels
-    )
-
-    weighted_position_freq = (
-        df.groupby(["position_bin", "name"], observed=True)["weight"]
-        .sum()
-        .unstack(fill_value=0)
+    song_names, codes = np.unique(features["name"], return_inverse=True)
+    n_songs = len(song_names)
+    weights = features["weight"]
+    normalised_position = features["position"] / features["setlist_size"]
+
+    overall_weight = np.bincount(codes, weights=weights, minlength=n_songs)
+    # Descending and stable, so equal weights keep sorted-name order.
+    by_weight = np.argsort(-overall_weight, kind="stable")
+    rank = np.empty(n_songs, dtype=np.intp)
+    rank[by_weight] = np.arange(n_songs)
+    bin_weights, bin_observed = _bin_weight_matrix(
+        codes, weights, normalised_position, n_songs
     )
 
-    overall_weight = df.groupby("name")["weight"].sum().sort_values(ascending=False)
-
-    def _first_available(weights: pd.Series, exclude: set) -> str:
-        for name in weights.index:
-            if name not in exclude:
-                return name
-        return weights.index[0]
-
-    first_candidates = df.loc[df["is_first"]].groupby("name")["weight"].sum()
-    most_likely_first = (
-        first_candidates.idxmax()
-        if not first_candidates.empty
-        else _first_available(overall_weight, set())
-    )
-
-    last_candidates = df.loc[df["is_last"]].groupby("name")["weight"].sum()
-    most_likely_last = (
-        last_candidates.idxmax()
-        if not last_candidates.empty
-        else _first_available(overall_weight, {most_likely_first})
-    )
-
-    all_songs = {most_likely_first, most_likely_last}
+    def _first_available(exclude: set) -> int:
+        for song in by_weight:
+            if song not in exclude:
+                return int(song)
+        return int(by_weight[0])
+
+    most_likely_first = _best_song(codes, weights, features["is_first"], n_songs)
+    if most_likely_first is None:
+        most_likely_first = _first_available(set())
+
+    most_likely_last = _best_song(codes, weights, features["is_last"], n_songs)
+    if most_likely_last is None:
+        most_likely_last = _first_available({most_likely_first})
+
+    # Availability indexed by overall-weight rank.
+    available = np.ones(n_songs, dtype=bool)
+    available[rank[most_likely_first]] = False
+    available[rank[most_likely_last]] = False
+    chosen = {most_likely_first, most_likely_last}
     setlist = [most_likely_first]
 
     for i in range(2, setlist_length):
-        remaining = [song for song in overall_weight.index if song not in all_songs]
-        if not remaining:
+        if not available.any():
             break
 
-        current_bin = position_labels[i // setlist_length]
-        if current_bin in weighted_position_freq.index:
-            remaining_weights = (
-                weighted_position_freq.loc[current_bin].reindex(remaining, fill_value=0)
+        current_bin = i // setlist_length
+        if bin_observed[current_bin]:
+            ranked_weights = np.where(
+                available, bin_weights[current_bin][by_weight], -np.inf
             )
-            most_likely_song = remaining_weights.idxmax()
+            pick = int(np.argmax(ranked_weights))
         else:
-            logging.info("Position bin %s missing, falling back to overall weights", current_bin)
-            most_likely_song = remaining[0]
+            logging.info(
+                "Position bin %s missing, falling back to overall weights",
+                POSITION_LABELS[current_bin],
+            )
+            pick = int(np.argmax(available))
 
-        setlist.append(most_likely_song)
-        all_songs.add(most_likely_song)
+        available[pick] = False
+        song = int(by_weight[pick])
+        setlist.append(song)
+        chosen.add(song)
 
-    if most_likely_last not in all_songs:
+    if most_likely_last not in chosen:
         setlist.append(most_likely_last)
 
-    return setlist  # type: ignore
+    return [song_names[song] for song in setlist]
 
 
 def should_use_smart_setlist(last_setlist_age_days: int, threshold_days: int) -> bool:
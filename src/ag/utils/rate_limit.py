@@ -1,52 +1,254 @@
+import asyncio
+import logging
+import random
+import threading
 import time
-from contextlib import contextmanager
-from typing import Optional
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+# Named buckets, one per upstream quota.
+SETLIST_FM = "setlist_fm"
+SPOTIFY_SEARCH = "spotify_search"
+SPOTIFY_PLAYLIST_WRITE = "spotify_playlist_write"
+
+DEFAULT_RETRY_AFTER_SECONDS = 2.0
+DEFAULT_MAX_RETRIES = 3
+
+
+def parse_retry_after(
+    headers: Optional[Mapping[str, str]], default: float = DEFAULT_RETRY_AFTER_SECONDS
+) -> float:
+    """Read a Retry-After header given in seconds, falling back to ``default``."""
+    raw = (headers or {}).get("Retry-After")
+    try:
+        return max(0.0, float(raw)) if raw is not None else default
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class RateLimiterStats:
+    """Snapshot of how much a limiter has throttled its callers."""
+
+    acquired: int
+    waited: int
+    wait_seconds: float
+    throttled: int = 0
+    rate: float = float("inf")
 
 
 class RateLimiter:
-    """Simple sleep-based rate limiter for API calls."""
+    """Thread-safe token bucket rate limiter for API calls.
+
+    Tokens refill at one per ``min_interval_seconds`` up to ``burst``. Each
+    caller reserves a token under a lock and then sleeps outside of it, so
+    the limiter can be shared between threads and coroutines alike. With
+    the default ``burst=1`` it behaves like a plain min-interval gate.
+    """
 
-    def __init__(self, min_interval_seconds: float = 1.0):
+    def __init__(
+        self,
+        min_interval_seconds: float = 1.0,
+        *,
+        burst: int = 1,
+        name: Optional[str] = None,
+        jitter_seconds: float = 0.5,
+    ):
         self.min_interval = min_interval_seconds
-        self._next_allowed: float = 0.0
+        self.burst = max(1, burst)
+        self.name = name
+        self.jitter_seconds = jitter_seconds
+        self._tokens: float = float(self.burst)
+        self._updated_at: float = time.monotonic()
+        self._blocked_until: float = 0.0
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._waited = 0
+        self._wait_seconds = 0.0
+        self._throttled = 0
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second (infinite when unthrottled)."""
+        return 1.0 / self.min_interval if self.min_interval > 0 else float("inf")
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._acquired += 1
+            # While paused after a 429 the bucket behaves as if time starts
+            # at _blocked_until, so queued callers line up behind the pause.
+            start = max(now, self._blocked_until)
+            delay = start - now
+            if self.min_interval > 0:
+                elapsed = max(0.0, start - self._updated_at)
+                self._tokens = min(
+                    float(self.burst), self._tokens + elapsed * self.rate
+                )
+                self._updated_at = start
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay += -self._tokens * self.min_interval
+            if delay > 0:
+                self._waited += 1
+                self._wait_seconds += delay
+            return delay
 
     def wait(self) -> None:
-        now = time.monotonic()
-        delay = self._next_allowed - now
+        delay = self._reserve()
         if delay > 0:
             time.sleep(delay)
-        self._next_allowed = time.monotonic() + self.min_interval
+
+    async def wait_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for ``seconds`` from now."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> float:
+        """Record an upstream 429 and pause for Retry-After plus jitter.
+
+        Returns the pause applied so callers can log it.
+        """
+        base = DEFAULT_RETRY_AFTER_SECONDS if retry_after is None else retry_after
+        delay = base + random.uniform(0, self.jitter_seconds)
+        with self._lock:
+            self._throttled += 1
+        self.pause(delay)
+        return delay
+
+    def on_success(self) -> None:
+        """Record a successful (non-throttled) upstream call."""
+        return None
+
+    def stats(self) -> RateLimiterStats:
+        with self._lock:
+            return RateLimiterStats(
+                acquired=self._acquired,
+                waited=self._waited,
+                wait_seconds=self._wait_seconds,
+                throttled=self._throttled,
+                rate=self.rate,
+            )
 
     def __enter__(self) -> "RateLimiter":
         self.wait()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> bool:
-        # Ensure next allowed is at least min_interval from exit.
-        self._next_allowed = max(self._next_allowed, time.monotonic() + self.min_interval)
         return False
 
+    async def __aenter__(self) -> "RateLimiter":
+        await self.wait_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
 
-@contextmanager
-def retry_after(delay_seconds: float, rate_limiter: Optional["RateLimiter"] = None):
-    """Sleep for Retry-After and honor rate limiter before retrying."""
-    time.sleep(max(0.0, delay_seconds))
-    if rate_limiter:
-        rate_limiter.wait()
-    yield
+
+class AdaptiveRateLimiter(RateLimiter):
+    """Token bucket that adapts its rate to upstream 429 feedback (AIMD).
+
+    Each 429 multiplies the interval by ``1 / backoff_factor`` (halving the
+    rate by default) up to ``max_interval_seconds``; each success adds
+    ``recovery_fraction`` of the configured rate back until the configured
+    rate is reached again.
+    """
+
+    def __init__(
+        self,
+        min_interval_seconds: float = 1.0,
+        *,
+        burst: int = 1,
+        name: Optional[str] = None,
+        jitter_seconds: float = 0.5,
+        backoff_factor: float = 0.5,
+        recovery_fraction: float = 0.05,
+        max_interval_seconds: float = 30.0,
+    ):
+        if min_interval_seconds <= 0:
+            raise ValueError("AdaptiveRateLimiter needs a positive interval")
+        super().__init__(
+            min_interval_seconds,
+            burst=burst,
+            name=name,
+            jitter_seconds=jitter_seconds,
+        )
+        self.target_interval = min_interval_seconds
+        self.backoff_factor = backoff_factor
+        self.recovery_fraction = recovery_fraction
+        self.max_interval = max(max_interval_seconds, min_interval_seconds)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> float:
+        with self._lock:
+            # 429s arriving during a pause answer requests sent before it, so
+            # only the first one of a burst slows the rate down.
+            slowed = time.monotonic() >= self._blocked_until
+            if slowed:
+                self.min_interval = min(
+                    self.max_interval, self.min_interval / self.backoff_factor
+                )
+            new_rate = self.rate
+        if slowed:
+            logging.warning(
+                "Rate limiter %s throttled upstream, slowing to %.2f req/s",
+                self.name,
+                new_rate,
+            )
+        return super().on_throttled(retry_after)
+
+    def on_success(self) -> None:
+        if self.min_interval <= self.target_interval:
+            return None
+        with self._lock:
+            target_rate = 1.0 / self.target_interval
+            new_rate = min(target_rate, self.rate + target_rate * self.recovery_fraction)
+            self.min_interval = 1.0 / new_rate
+        return None
 
 
 class NullRateLimiter(RateLimiter):
-    """No-op limiter for cases where throttling is optional."""
+    """No-op limiter for cases where throttling is optional.
+
+    It still honours pauses requested after a 429.
+    """
 
-    def __init__(self):
-        super().__init__(min_interval_seconds=0.0)
+    def __init__(self, name: Optional[str] = None):
+        super().__init__(min_interval_seconds=0.0, name=name)
 
     def wait(self) -> None:
-        return None
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
 
-    def __enter__(self) -> "NullRateLimiter":
-        return self
+    async def wait_async(self) -> None:
+        delay = self._blocked_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
 
-    def __exit__(self, exc_type, exc_value, traceback) -> bool:
-        return False
+
+class RateLimiterRegistry:
+    """Named rate limiters, one bucket per upstream quota.
+
+    Unknown names resolve to a shared no-op limiter so callers never need to
+    check whether a bucket was configured.
+    """
+
+    def __init__(self, limiters: Optional[Dict[str, RateLimiter]] = None):
+        self._limiters: Dict[str, RateLimiter] = dict(limiters or {})
+        self._null = NullRateLimiter()
+
+    def get(self, name: str) -> RateLimiter:
+        return self._limiters.get(name, self._null)
+
+    def set(self, name: str, limiter: RateLimiter) -> None:
+        limiter.name = limiter.name or name
+        self._limiters[name] = limiter
+
+    def stats(self) -> Dict[str, RateLimiterStats]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Optional, Tuple
 import logging
 import json
 import os
@@ -15,7 +15,7 @@ logging.basicConfig(
 # Load environment when running via CLI so config is available for services.
 load_dotenv()
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--band-names", "-b", multiple=True)
 @click.option(
     "--playlist-name",
@@ -37,6 +37,26 @@ load_dotenv()
     default=1.0,
     help="Rate limit (in seconds), zero for no limit",
 )
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of bands to process concurrently.",
+)
+@click.option(
+    "--setlist-pages",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Max pages of setlists (about 20 each) to fetch per band.",
+)
+@click.option(
+    "--setlist-max-age-days",
+    type=int,
+    default=None,
+    help="Stop fetching further setlist pages once setlists are older than this.",
+)
 @click.option(
     "--fuzzy",
     is_flag=True,
@@ -55,28 +75,30 @@ load_dotenv()
     default=False,
     help="Always estimate the setlist even if a fresh one exists.",
 )
+@click.pass_context
 def main(
+    ctx: click.Context,
     band_names: Tuple[str, ...],
     playlist_name: str,
     copy_last_setlist_threshold: int,
     max_setlist_length: int,
     no_cache: bool,
     rate_limit: float,
+    workers: int,
+    setlist_pages: int,
+    setlist_max_age_days: Optional[int],
     fuzzy: bool,
     no_playlist: bool,
     force_smart_setlist: bool,
 ):
     """Create or preview a Spotify playlist from recent setlists."""
 
+    if ctx.invoked_subcommand is not None:
+        return
+
     playlist_name = playlist_name.strip() if playlist_name else None
     force_smart = True if force_smart_setlist else None
-    spotify_user_creds_present = all(
-        (
-            os.environ.get("SPOTIFY_REFRESH_TOKEN"),
-            os.environ.get("SPOTIFY_USERNAME"),
-            os.environ.get("SPOTIFY_REDIRECT_URI"),
-        )
-    )
+    spotify_user_creds_present = _spotify_user_creds_present()
     create_playlist = not no_playlist and spotify_user_creds_present
 
     if not no_playlist and not spotify_user_creds_present:
@@ -100,6 +122,9 @@ def main(
             use_fuzzy_search=fuzzy,
             create_playlist=create_playlist,
             force_smart_setlist=force_smart,
+            max_workers=workers,
+            setlist_pages=setlist_pages,
+            setlist_max_age_days=setlist_max_age_days,
         )
         payload = playlist_result_to_payload(result)
         click.echo(json.dumps(payload, indent=2))
@@ -107,5 +132,103 @@ def main(
         raise click.UsageError(str(exc)) from exc
 
 
+def _spotify_user_creds_present() -> bool:
+    return all(
+        (
+            os.environ.get("SPOTIFY_REFRESH_TOKEN"),
+            os.environ.get("SPOTIFY_USERNAME"),
+            os.environ.get("SPOTIFY_REDIRECT_URI"),
+        )
+    )
+
+
+@main.command()
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--no-cache", is_flag=True, default=False, help="Disable cache")
+@click.option(
+    "--rate-limit",
+    type=float,
+    default=1.0,
+    help="Rate limit (in seconds), zero for no limit",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of bands to process concurrently within a job.",
+)
+@click.option(
+    "--setlist-pages",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Max pages of setlists (about 20 each) to fetch per band.",
+)
+@click.option(
+    "--setlist-max-age-days",
+    type=int,
+    default=None,
+    help="Stop fetching further setlist pages once setlists are older than this.",
+)
+@click.option(
+    "--fuzzy",
+    is_flag=True,
+    default=False,
+    help="Enable fuzzy track name matching for jobs that do not set it.",
+)
+@click.option(
+    "--no-playlist",
+    is_flag=True,
+    default=False,
+    help="Preview every job instead of creating playlists.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w"),
+    default="-",
+    help="Write JSONL results here instead of stdout.",
+)
+def batch(
+    manifest: str,
+    no_cache: bool,
+    rate_limit: float,
+    workers: int,
+    setlist_pages: int,
+    setlist_max_age_days: Optional[int],
+    fuzzy: bool,
+    no_playlist: bool,
+    output,
+):
+    """Run every job in a JSONL or YAML MANIFEST, streaming JSONL results."""
+
+    from ag.batch import load_manifest, run_batch
+
+    try:
+        jobs = load_manifest(manifest)
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+
+    create_playlists = not no_playlist and _spotify_user_creds_present()
+    if not no_playlist and not create_playlists:
+        logging.info(
+            "Spotify user token missing, running jobs in preview-only mode."
+        )
+
+    for record in run_batch(
+        jobs,
+        no_cache=no_cache,
+        rate_limit=rate_limit,
+        max_workers=workers,
+        setlist_pages=setlist_pages,
+        setlist_max_age_days=setlist_max_age_days,
+        create_playlists=create_playlists,
+        use_fuzzy_search=fuzzy,
+    ):
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+
 if __name__ == "__main__":
     main()
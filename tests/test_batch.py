@@ -0,0 +1,210 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from ag import batch, run
+from ag.batch import BatchJob, load_manifest, run_batch
+from ag.clients.setlist_fm import SetlistFmClient
+from ag.clients.spotify import SpotifyClient
+from ag.models import SongMatch
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch, tmp_path):
+    monkeypatch.setenv("SETLIST_FM_API_KEY", "setlist-key")
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "client-id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "client-secret")
+    monkeypatch.setenv("SETLIST_CACHE", str(tmp_path / "setlists.json"))
+    monkeypatch.setenv("SPOTIFY_TRACK_CACHE", str(tmp_path / "spotify.json"))
+    run.reset_shared_components()
+    yield
+    run.reset_shared_components()
+
+
+@pytest.fixture
+def fake_network(monkeypatch):
+    """Count setlist.fm requests and Spotify match resolutions."""
+    calls = {"setlist_fm": [], "matches": []}
+    event_date = (datetime.now() - timedelta(days=3)).strftime("%d-%m-%Y")
+
+    def fake_request_json(self, url, params, description):
+        calls["setlist_fm"].append(description)
+        if url.endswith("/search/artists"):
+            name = params["artistName"]
+            return {"artist": [{"mbid": f"mbid-{name}", "name": name}]}
+        band = url.split("/artist/mbid-")[1].split("/")[0]
+        songs = [{"name": f"{band} song {i}"} for i in range(3)]
+        return {
+            "itemsPerPage": 20,
+            "total": 1,
+            "setlist": [
+                {
+                    "eventDate": event_date,
+                    "url": "u",
+                    "sets": {"set": [{"song": songs}]},
+                }
+            ],
+        }
+
+    def fake_resolve(self, song, band, *, use_fuzzy_search=False):
+        calls["matches"].append((band, song))
+        track_id = f"{band}-{song}".replace(" ", "-")
+        return SongMatch(
+            name=song,
+            spotify_id=track_id,
+            spotify_url=f"https://open.spotify.com/track/{track_id}",
+            status="found",
+            strategy="search",
+        )
+
+    monkeypatch.setattr(SetlistFmClient, "_request_json", fake_request_json)
+    monkeypatch.setattr(SpotifyClient, "_resolve_track_match", fake_resolve)
+    return calls
+
+
+def test_batch_job_from_dict_validates():
+    job = BatchJob.from_dict(
+        {"band_names": "Solo", "playlist_name": " Gig ", "max_setlist_length": "5"}
+    )
+
+    assert job.band_names == ("Solo",)
+    assert job.playlist_name == "Gig"
+    assert job.max_setlist_length == 5
+
+    with pytest.raises(ValueError, match="band_names"):
+        BatchJob.from_dict({"playlist_name": "Empty"})
+    with pytest.raises(ValueError, match="Unknown batch job keys: bands"):
+        BatchJob.from_dict({"bands": ["A"]})
+    with pytest.raises(ValueError, match="create_playlist must be true or false"):
+        BatchJob.from_dict({"band_names": ["A"], "create_playlist": "false"})
+    assert BatchJob.from_dict(
+        {"band_names": ["A"], "use_fuzzy_search": False}
+    ).use_fuzzy_search is False
+
+
+def test_load_manifest_reads_jsonl(tmp_path):
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text(
+        '{"id": "a", "band_names": ["A", "B"], "playlist_name": "One"}\n'
+        "\n"
+        '{"band_names": ["B"], "copy_last_setlist_threshold": 30}\n'
+    )
+
+    jobs = load_manifest(manifest)
+
+    assert [job.id for job in jobs] == ["a", None]
+    assert jobs[1].band_names == ("B",)
+    assert jobs[1].copy_last_setlist_threshold == 30
+
+
+def test_load_manifest_reports_bad_jsonl_line(tmp_path):
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text('{"band_names": ["A"]}\n{oops\n')
+
+    with pytest.raises(ValueError, match="jobs.jsonl:2"):
+        load_manifest(manifest)
+
+
+def test_load_manifest_reads_yaml_with_defaults(tmp_path):
+    pytest.importorskip("yaml")
+    manifest = tmp_path / "jobs.yaml"
+    manifest.write_text(
+        "defaults:\n"
+        "  max_setlist_length: 8\n"
+        "jobs:\n"
+        "  - band_names: [A, B]\n"
+        "    playlist_name: One\n"
+        "  - band_names: [C]\n"
+        "    max_setlist_length: 4\n"
+    )
+
+    jobs = load_manifest(manifest)
+
+    assert [job.band_names for job in jobs] == [("A", "B"), ("C",)]
+    assert [job.max_setlist_length for job in jobs] == [8, 4]
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ("jobs:\n  - band_names: [A]\n  - just a band\n", "job 1 must be a mapping"),
+        ("- band_names: [A]\n- [B]\n", "job 1 must be a mapping"),
+        ("jobs: {band_names: [A]}\n", "jobs must be a list"),
+        ("defaults: [8]\njobs: []\n", "defaults must be a mapping"),
+        ("- band_names: [A]\n  force_smart_setlist: 'no'\n", "job 0: force_smart"),
+    ],
+)
+def test_load_manifest_rejects_malformed_yaml(tmp_path, content, message):
+    pytest.importorskip("yaml")
+    manifest = tmp_path / "jobs.yaml"
+    manifest.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        load_manifest(manifest)
+
+
+def test_load_manifest_rejects_unknown_format(tmp_path):
+    manifest = tmp_path / "jobs.csv"
+    manifest.write_text("A,B\n")
+
+    with pytest.raises(ValueError, match="Unsupported manifest type"):
+        load_manifest(manifest)
+
+
+@pytest.mark.parametrize("no_cache", [False, True])
+def test_run_batch_fetches_and_matches_shared_bands_once(fake_network, no_cache):
+    jobs = [
+        BatchJob(band_names=("Alpha", "Beta"), id="first"),
+        BatchJob(band_names=("Beta", "Gamma"), id="second"),
+        BatchJob(band_names=("Alpha",), id="third"),
+    ]
+
+    records = list(run_batch(jobs, no_cache=no_cache, rate_limit=0))
+
+    assert [record["job"] for record in records] == ["first", "second", "third"]
+    assert all(record["ok"] for record in records)
+    # One artist lookup and one setlist page per distinct band.
+    assert len(fake_network["setlist_fm"]) == 6
+    assert len(fake_network["matches"]) == 9
+    assert len(set(fake_network["matches"])) == 9
+    second = records[1]["result"]
+    assert [setlist["band"] for setlist in second["setlists"]] == ["Beta", "Gamma"]
+    assert second["created_playlist"] is False
+
+
+def test_run_batch_streams_records_and_reports_failures(fake_network, monkeypatch):
+    original = batch.PlaylistBuilder.build_playlist
+
+    def flaky_build(self, band_names, *args, **kwargs):
+        if "Broken" in band_names:
+            raise RuntimeError("setlist.fm unavailable")
+        if "Buggy" in band_names:
+            raise KeyError("setlist")
+        return original(self, band_names, *args, **kwargs)
+
+    monkeypatch.setattr(batch.PlaylistBuilder, "build_playlist", flaky_build)
+    jobs = [
+        BatchJob(band_names=("Broken",)),
+        BatchJob(band_names=("Buggy",)),
+        BatchJob(band_names=("Alpha",)),
+    ]
+
+    records = run_batch(jobs, rate_limit=0)
+    first = next(records)
+
+    assert first == {
+        "job": 0,
+        "playlist_name": None,
+        "ok": False,
+        "error": "setlist.fm unavailable",
+    }
+    # The second job has not run until the caller asks for its record.
+    assert fake_network["setlist_fm"] == []
+    # Unexpected exceptions are recorded too instead of ending the batch.
+    second = next(records)
+    assert second["ok"] is False
+    assert second["error"] == "'setlist'"
+    third = next(records)
+    assert third["ok"] is True
+    json.dumps(third)
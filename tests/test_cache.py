@@ -1,4 +1,21 @@
-from ag.cache import FileCache, MemoryCache, create_cache
+import time
+
+import pytest
+
+from ag.cache import (
+    DEFAULT_MEMORY_MAX_ENTRIES,
+    CacheStats,
+    DictSharedStore,
+    FileCache,
+    JsonLinesCache,
+    MemoryCache,
+    SharedStore,
+    SharedStoreCache,
+    SqliteCache,
+    TieredCache,
+    create_cache,
+    register_shared_store,
+)
 
 
 def test_memory_cache_roundtrip():
@@ -14,6 +31,8 @@ def test_create_cache_uses_memory_for_none_and_memory_label(tmp_path, monkeypatc
     assert isinstance(create_cache(""), MemoryCache)
     assert isinstance(create_cache("memory"), MemoryCache)
     assert isinstance(create_cache("none"), MemoryCache)
+    for target in (None, "", "none", "null", "memory"):
+        assert create_cache(target).max_entries == DEFAULT_MEMORY_MAX_ENTRIES
 
     # Non-empty path should yield FileCache
     path = tmp_path / "cache.json"
@@ -29,3 +48,253 @@ def test_file_cache_persists(tmp_path):
 
     cache2 = FileCache(cache_path)
     assert cache2.get("foo") == "bar"
+
+
+def test_create_cache_uses_jsonl_backend_for_jsonl_suffix(tmp_path):
+    cache = create_cache(str(tmp_path / "cache.jsonl"))
+    assert isinstance(cache, JsonLinesCache)
+
+
+def test_jsonl_cache_appends_and_compacts(tmp_path):
+    cache_path = tmp_path / "cache.jsonl"
+    cache = JsonLinesCache(cache_path)
+    cache.set("foo", {"n": 1})
+    cache.set("bar", [1, 2])
+    cache.set("foo", {"n": 2})
+
+    assert len(cache_path.read_text().splitlines()) == 3
+
+    reloaded = JsonLinesCache(cache_path)
+    assert reloaded.get("foo") == {"n": 2}
+    assert "bar" in reloaded
+
+    reloaded.persist()
+    assert len(cache_path.read_text().splitlines()) == 2
+    assert JsonLinesCache(cache_path).as_dict() == {"foo": {"n": 2}, "bar": [1, 2]}
+
+
+def test_jsonl_cache_skips_truncated_record(tmp_path):
+    cache_path = tmp_path / "cache.jsonl"
+    cache = JsonLinesCache(cache_path)
+    cache.set("foo", "bar")
+    with open(cache_path, "a") as file:
+        file.write('{"k": "partial", "v"')
+
+    reloaded = JsonLinesCache(cache_path)
+    assert reloaded.get("foo") == "bar"
+    assert "partial" not in reloaded
+
+
+def test_create_cache_uses_sqlite_backend_for_db_suffix(tmp_path):
+    cache = create_cache(str(tmp_path / "cache.sqlite"), ttl_seconds=60)
+    assert isinstance(cache, SqliteCache)
+    assert cache.ttl_seconds == 60
+
+
+def test_sqlite_cache_roundtrip_and_wal(tmp_path):
+    cache_path = tmp_path / "cache.db"
+    cache = SqliteCache(cache_path)
+    assert cache.get("missing") is None
+    cache.set("foo", {"tracks": [1, 2]})
+    assert "foo" in cache
+
+    other = SqliteCache(cache_path)
+    assert other.get("foo") == {"tracks": [1, 2]}
+    journal_mode = other._connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal"
+
+
+def test_sqlite_cache_expires_entries(tmp_path, monkeypatch):
+    cache = SqliteCache(tmp_path / "cache.db", ttl_seconds=10)
+    now = 1_000_000.0
+    monkeypatch.setattr("ag.cache.time.time", lambda: now)
+    cache.set("foo", "bar")
+    assert cache.get("foo") == "bar"
+
+    now += 11
+    assert cache.get("foo") is None
+    assert "foo" not in cache
+
+    cache.persist()
+    count = cache._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert count == 0
+
+
+def test_create_cache_builds_tiers_from_urls(tmp_path):
+    target = f"memory://,file://{tmp_path}/tracks.sqlite,dict://tiers?namespace=t"
+
+    cache = create_cache(target, ttl_seconds=60)
+
+    assert isinstance(cache, TieredCache)
+    memory, sqlite, shared = cache.tiers
+    assert isinstance(memory, MemoryCache)
+    assert isinstance(sqlite, SqliteCache) and sqlite.ttl_seconds == 60
+    assert isinstance(shared, SharedStoreCache) and shared.namespace == "t"
+    assert isinstance(create_cache(f"file://{tmp_path}/a.json"), FileCache)
+
+
+def test_tiered_cache_writes_through_and_backfills(tmp_path):
+    shared_url = "dict://backfill"
+    warm = create_cache(f"memory://,{shared_url}", namespace="setlists")
+    warm.set("setlists:abc:p1", {"setlist": [1]})
+
+    # A second "instance" with its own memory tier and /tmp file.
+    cold = create_cache(
+        f"memory://,file://{tmp_path}/cold.sqlite,{shared_url}", namespace="setlists"
+    )
+    memory, sqlite, _ = cold.tiers
+    assert memory.get("setlists:abc:p1") is None
+
+    assert cold.get("setlists:abc:p1") == {"setlist": [1]}
+    assert memory.get("setlists:abc:p1") == {"setlist": [1]}
+    assert sqlite.get("setlists:abc:p1") == {"setlist": [1]}
+    assert "setlists:abc:p1" in cold
+    assert cold.get("missing", "default") == "default"
+
+
+def test_tiered_backfill_keeps_the_remaining_ttl(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr("ag.cache.time.time", lambda: now)
+    memory = MemoryCache(ttl_seconds=100)
+    sqlite = SqliteCache(tmp_path / "tiers.sqlite", ttl_seconds=100)
+    cache = TieredCache([memory, sqlite])
+    sqlite.set("key", "value")
+
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 90)
+    assert cache.get("key") == "value"
+    assert memory.expires_at("key") == pytest.approx(now + 100)
+    assert sqlite.expires_at("key") == pytest.approx(now + 100)
+
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 101)
+    assert memory.get("key") is None
+    assert cache.get("key") is None
+
+
+def test_namespace_ttls_override_backend_ttl(tmp_path, monkeypatch):
+    store = DictSharedStore()
+    keep = {"keep": None}
+    caches = [
+        SqliteCache(tmp_path / "ns.sqlite", ttl_seconds=10, namespace_ttls=keep),
+        SharedStoreCache(store, ttl_seconds=10, namespace_ttls=keep),
+    ]
+    for cache in caches:
+        cache.set("keep:a", 1)
+        cache.set("drop:a", 2)
+
+    now = time.time()
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 11)
+    caches[0].persist()
+    for cache in caches:
+        assert cache.get("keep:a") == 1
+        assert cache.get("drop:a") is None
+    assert caches[0].as_dict() == {"keep:a": 1}
+
+
+def test_shared_store_namespaces_and_ttl(monkeypatch):
+    store = DictSharedStore()
+    setlists = SharedStoreCache(store, namespace="setlists", ttl_seconds=10)
+    tracks = SharedStoreCache(store, namespace="spotify")
+    setlists.set("key", [1, 2])
+
+    assert tracks.get("key") is None
+    assert setlists.get("key") == [1, 2]
+
+    now = time.time()
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 11)
+    assert setlists.get("key") is None
+
+
+def test_shared_store_errors_are_treated_as_misses():
+    class BrokenStore(SharedStore):
+        def get(self, key):
+            raise ConnectionError("down")
+
+        def set(self, key, value, ttl_seconds=None):
+            raise ConnectionError("down")
+
+    cache = TieredCache([MemoryCache(), SharedStoreCache(BrokenStore())])
+    cache.set("key", "value")
+
+    assert cache.get("key") == "value"
+    assert cache.tiers[1].get("other", "fallback") == "fallback"
+
+
+def test_register_shared_store_adds_scheme():
+    stores = []
+
+    def factory(url):
+        stores.append(url)
+        return DictSharedStore()
+
+    register_shared_store("custom", factory)
+
+    cache = create_cache("custom://host/db", namespace="ns")
+
+    assert isinstance(cache, SharedStoreCache)
+    assert cache.namespace == "ns"
+    assert stores == ["custom://host/db"]
+    with pytest.raises(ValueError):
+        create_cache("ftp://nowhere")
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == CacheStats(
+        hits=3, misses=0, evictions=1, entries=2, size_bytes=0
+    )
+
+
+def test_memory_cache_byte_budget():
+    cache = MemoryCache(max_bytes=30)
+    cache.set("small", "x" * 5)
+    cache.set("large", "y" * 20)
+    cache.set("other", "z" * 5)
+
+    assert "small" not in cache
+    assert cache.get("large") == "y" * 20
+    assert cache.stats().size_bytes <= 30
+
+
+def test_memory_cache_namespace_ttls(monkeypatch):
+    now = time.time()
+    cache = MemoryCache(ttl_seconds=100, namespace_ttls={"match": 10, "artist": None})
+    cache.set("match:song|band", "id")
+    cache.set("setlists:mbid:p1", {"setlist": []})
+    cache.set("artist:band", "artist-id")
+
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 50)
+    assert cache.get("match:song|band") is None
+    assert cache.get("setlists:mbid:p1") == {"setlist": []}
+
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 500)
+    assert "setlists:mbid:p1" not in cache
+    assert cache.get("artist:band") == "artist-id"
+    assert cache.stats().misses == 1
+    assert cache.stats().entries == 1
+
+
+def test_memory_url_options_and_tiered_stats(tmp_path):
+    cache = create_cache(
+        "memory://?max_entries=1&ttl.match=5,dict://stats", ttl_seconds=60
+    )
+    memory = cache.tiers[0]
+    assert memory.max_entries == 1
+    assert memory.ttl_seconds == 60
+    assert memory.namespace_ttls == {"match": 5.0}
+    assert create_cache("memory://").max_entries == 10_000
+    assert create_cache("memory://?max_entries=0").max_entries is None
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # evicted from memory, served by the shared tier
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 1, 2)
@@ -1,5 +1,9 @@
 import importlib
 import json
+import os
+import subprocess
+import sys
+from pathlib import Path
 
 import pytest
 from ag.models import PlaylistBuildResult
@@ -177,3 +181,132 @@ def test_main_logic_disables_playlist_without_token(monkeypatch):
 
     assert calls["create_playlist"] is False
     assert resp["created_playlist"] is False
+
+
+LIGHT_PATH_PROBE = """
+import json, sys
+from ag.lambda_handler import lambda_handler
+
+responses = [
+    lambda_handler({"requestContext": {"http": {"method": "OPTIONS"}}}, None),
+    lambda_handler({"headers": {}, "body": "{bad json"}, None),
+    lambda_handler({"headers": {}, "body": json.dumps({"playlist_name": "P"})}, None),
+]
+heavy = [name for name in ("ag.run", "spotipy", "requests", "numpy") if name in sys.modules]
+print(json.dumps({"status": [r["statusCode"] for r in responses], "heavy": heavy}))
+"""
+
+
+def test_preflight_and_rejected_requests_skip_playlist_stack():
+    src = Path(__file__).resolve().parents[1] / "src"
+    env = {**os.environ, "PYTHONPATH": str(src), "ENABLE_CORS": "1", "APP_TOKENS": ""}
+
+    output = subprocess.run(
+        [sys.executable, "-c", LIGHT_PATH_PROBE],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    result = json.loads(output)
+    assert result["status"] == [200, 400, 400]
+    assert result["heavy"] == []
+
+
+def test_main_logic_caches_by_default(monkeypatch):
+    lh = load_lambda_handler(monkeypatch)
+    calls = {}
+
+    def fake_run_playlist_job(*args, **kwargs):
+        calls.update(kwargs)
+        return PlaylistBuildResult(setlists=[], playlist=None, created_playlist=False)
+
+    monkeypatch.setattr(lh, "run_playlist_job", fake_run_playlist_job)
+    monkeypatch.setattr(lh, "playlist_result_to_payload", lambda res: {})
+
+    lh.main_logic({"band_names": ["Band"], "create_playlist": False})
+
+    assert calls["no_cache"] is False
+
+
+def test_main_logic_clamps_max_workers(monkeypatch):
+    lh = load_lambda_handler(monkeypatch)
+    calls = {}
+
+    def fake_run_playlist_job(*args, **kwargs):
+        calls.update(kwargs)
+        return PlaylistBuildResult(setlists=[], playlist=None, created_playlist=False)
+
+    monkeypatch.setattr(lh, "run_playlist_job", fake_run_playlist_job)
+    monkeypatch.setattr(lh, "playlist_result_to_payload", lambda res: {})
+
+    lh.main_logic({"band_names": ["Band"], "max_workers": 10_000})
+    assert calls["max_workers"] == lh.MAX_WORKERS_LIMIT
+    lh.main_logic({"band_names": ["Band"], "max_workers": "0"})
+    assert calls["max_workers"] == 1
+
+
+@pytest.mark.parametrize("max_workers", ["many", None, [2], 1.5])
+def test_lambda_handler_rejects_invalid_max_workers(monkeypatch, max_workers):
+    lh = load_lambda_handler(monkeypatch)
+    event = {
+        "headers": {"Authorization": "Bearer valid-token"},
+        "body": json.dumps({"band_names": ["Band"], "max_workers": max_workers}),
+    }
+
+    resp = lh.lambda_handler(event, None)
+
+    assert resp["statusCode"] == 400
+    assert json.loads(resp["body"]) == {"error": "max_workers must be an integer"}
+
+
+def test_main_logic_clamps_setlist_pages(monkeypatch):
+    lh = load_lambda_handler(monkeypatch)
+    calls = {}
+
+    def fake_run_playlist_job(*args, **kwargs):
+        calls.update(kwargs)
+        return PlaylistBuildResult(setlists=[], playlist=None, created_playlist=False)
+
+    monkeypatch.setattr(lh, "run_playlist_job", fake_run_playlist_job)
+    monkeypatch.setattr(lh, "playlist_result_to_payload", lambda res: {})
+
+    lh.main_logic({"band_names": ["Band"], "setlist_pages": "500"})
+    assert calls["setlist_pages"] == lh.MAX_SETLIST_PAGES
+
+    with pytest.raises(ValueError, match="setlist_pages must be an integer"):
+        lh.main_logic({"band_names": ["Band"], "setlist_pages": {"p": 2}})
+
+
+@pytest.mark.parametrize("max_age", ["old", True, 1.5, [30], -1, "-5"])
+def test_lambda_handler_rejects_invalid_setlist_max_age_days(monkeypatch, max_age):
+    lh = load_lambda_handler(monkeypatch)
+    event = {
+        "headers": {"Authorization": "Bearer valid-token"},
+        "body": json.dumps({"band_names": ["Band"], "setlist_max_age_days": max_age}),
+    }
+
+    resp = lh.lambda_handler(event, None)
+
+    assert resp["statusCode"] == 400
+    assert json.loads(resp["body"])["error"].startswith(
+        "setlist_max_age_days must be an integer"
+    )
+
+
+def test_main_logic_passes_setlist_max_age_days(monkeypatch):
+    lh = load_lambda_handler(monkeypatch)
+    calls = {}
+
+    def fake_run_playlist_job(*args, **kwargs):
+        calls.update(kwargs)
+        return PlaylistBuildResult(setlists=[], playlist=None, created_playlist=False)
+
+    monkeypatch.setattr(lh, "run_playlist_job", fake_run_playlist_job)
+    monkeypatch.setattr(lh, "playlist_result_to_payload", lambda res: {})
+
+    lh.main_logic({"band_names": ["Band"], "setlist_max_age_days": "30"})
+    assert calls["setlist_max_age_days"] == 30
+    lh.main_logic({"band_names": ["Band"]})
+    assert calls["setlist_max_age_days"] is None
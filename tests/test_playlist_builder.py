@@ -1,8 +1,14 @@
-import pandas as pd
+import asyncio
+from datetime import datetime, timedelta
+
 import pytest
 
 from ag.models import Playlist, SongMatch
-from ag.services.playlist_builder import BandSetlistPlan, PlaylistBuilder
+from ag.services.playlist_builder import (
+    AsyncPlaylistBuilder,
+    BandSetlistPlan,
+    PlaylistBuilder,
+)
 
 
 class DummySetlistClient:
@@ -25,6 +31,7 @@ class DummySpotifyClient:
         self.calls["playlist"] = playlist
         self.calls["songs"] = songs
         self.calls["mapped_tracks"] = kwargs.get("mapped_tracks")
+        return playlist
 
     def map_tracks(self, all_songs, **kwargs):
         self.calls["map_tracks"] = {"songs": all_songs, **kwargs}
@@ -68,7 +75,7 @@ def test_collect_band_songs_uses_last_setlist(monkeypatch):
         lambda setlists: ["songs"],
     )
 
-    recent_date = pd.Timestamp.now()
+    recent_date = datetime.now()
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_last_setlist",
         lambda songs_by_date: (["song1", "song2"], recent_date),
@@ -98,7 +105,7 @@ def test_collect_band_songs_uses_smart_setlist_when_stale(monkeypatch):
         "ag.services.playlist_builder.extract_common_songs",
         lambda setlists: ["songs"],
     )
-    stale_date = pd.Timestamp("2020-01-01")
+    stale_date = datetime(2020, 1, 1)
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_last_setlist",
         lambda songs_by_date: (["old"], stale_date),
@@ -130,7 +137,7 @@ def test_collect_band_songs_respects_force_smart_true(monkeypatch):
         "ag.services.playlist_builder.extract_common_songs",
         lambda setlists: ["songs"],
     )
-    recent_date = pd.Timestamp.now()
+    recent_date = datetime.now()
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_last_setlist",
         lambda songs_by_date: (["old"], recent_date),
@@ -163,7 +170,7 @@ def test_collect_band_songs_respects_force_smart_false(monkeypatch):
         "ag.services.playlist_builder.extract_common_songs",
         lambda setlists: ["songs"],
     )
-    stale_date = pd.Timestamp("2020-01-01")
+    stale_date = datetime(2020, 1, 1)
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_last_setlist",
         lambda songs_by_date: (["old", "older"], stale_date),
@@ -192,7 +199,7 @@ def test_collect_band_songs_treats_threshold_age_as_stale(monkeypatch):
     )
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_common_songs",
-        lambda setlists: [("song", pd.Timestamp.now() - pd.Timedelta(days=50))],
+        lambda setlists: [("song", datetime.now() - timedelta(days=50))],
     )
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_last_setlist",
@@ -223,7 +230,7 @@ def test_collect_band_songs_handles_future_date(monkeypatch):
         "ag.services.playlist_builder.extract_common_songs",
         lambda setlists: ["songs"],
     )
-    future_date = pd.Timestamp.now() + pd.Timedelta(days=10)
+    future_date = datetime.now() + timedelta(days=10)
     monkeypatch.setattr(
         "ag.services.playlist_builder.extract_last_setlist",
         lambda songs_by_date: (["future"], future_date),
@@ -257,7 +264,7 @@ def test_build_playlist_orchestrates(monkeypatch):
             band=band,
             songs=["song1", "song2"],
             setlist_type="fresh",
-            setlist_date=pd.Timestamp("2024-01-01"),
+            setlist_date=datetime(2024, 1, 1),
             last_setlist_age_days=2,
         ),
     )
@@ -292,7 +299,7 @@ def test_build_playlist_preview_mode(monkeypatch):
             band=band,
             songs=["song3"],
             setlist_type="estimated",
-            setlist_date=pd.Timestamp("2024-02-01"),
+            setlist_date=datetime(2024, 2, 1),
             last_setlist_age_days=30,
         ),
     )
@@ -324,7 +331,7 @@ def test_build_playlist_requires_name_when_creating(monkeypatch):
             band=band,
             songs=["songx"],
             setlist_type="fresh",
-            setlist_date=pd.Timestamp("2024-03-01"),
+            setlist_date=datetime(2024, 3, 1),
             last_setlist_age_days=1,
         ),
     )
@@ -337,3 +344,86 @@ def test_build_playlist_requires_name_when_creating(monkeypatch):
             max_setlist_length=10,
             create_playlist=True,
         )
+
+
+def test_build_playlist_concurrent_matches_sequential(monkeypatch):
+    lineup = ("BandA", "BandB", "BandA", "BandC")
+
+    def fake_collect(band, **kwargs):
+        if band == "BandB":
+            return None
+        return BandSetlistPlan(
+            band=band,
+            songs=[f"{band}-song1", f"{band}-song2"],
+            setlist_type="fresh",
+            setlist_date=datetime(2024, 1, 1),
+            last_setlist_age_days=2,
+        )
+
+    results = []
+    for workers in (1, 4):
+        builder = PlaylistBuilder(
+            DummySetlistClient({}), DummySpotifyClient(), max_workers=workers
+        )
+        monkeypatch.setattr(builder, "_collect_band_songs", fake_collect)
+        results.append(
+            builder.build_playlist(
+                lineup,
+                "Playlist",
+                copy_last_setlist_threshold=5,
+                max_setlist_length=10,
+            )
+        )
+
+    sequential, concurrent = results
+    assert [s.band for s in concurrent.setlists] == ["BandA", "BandA", "BandC"]
+    assert concurrent.setlists == sequential.setlists
+    assert concurrent.playlist == sequential.playlist
+
+
+class AsyncDummySetlistClient(DummySetlistClient):
+    async def get_recent_setlists(self, artist_name: str):
+        return DummySetlistClient.get_recent_setlists(self, artist_name)
+
+
+class AsyncDummySpotifyClient(DummySpotifyClient):
+    async def find_or_create_playlist(self, playlist_name: str):
+        return DummySpotifyClient.find_or_create_playlist(self, playlist_name)
+
+    async def populate_playlist(self, playlist: Playlist, songs, **kwargs):
+        return DummySpotifyClient.populate_playlist(self, playlist, songs, **kwargs)
+
+    async def map_tracks(self, all_songs, **kwargs):
+        return DummySpotifyClient.map_tracks(self, all_songs, **kwargs)
+
+
+def test_async_builder_matches_sync_builder():
+    recent = (datetime.now() - timedelta(days=2)).strftime("%d-%m-%Y")
+    payload = {
+        band: {
+            "setlist": [
+                {
+                    "eventDate": recent,
+                    "sets": {"set": [{"song": [{"name": f"{band} opener"}]}]},
+                }
+            ]
+        }
+        for band in ("BandA", "BandC")
+    }
+    lineup = ("BandA", "BandB", "BandA", "BandC")
+
+    sync_spotify = DummySpotifyClient()
+    expected = PlaylistBuilder(
+        DummySetlistClient(payload), sync_spotify
+    ).build_playlist(lineup, "Playlist", 15, 10)
+    async_spotify = AsyncDummySpotifyClient()
+    result = asyncio.run(
+        AsyncPlaylistBuilder(
+            AsyncDummySetlistClient(payload), async_spotify
+        ).build_playlist(lineup, "Playlist", 15, 10)
+    )
+
+    assert [s.band for s in result.setlists] == ["BandA", "BandA", "BandC"]
+    assert result.setlists == expected.setlists
+    assert result.playlist == expected.playlist
+    assert async_spotify.calls["songs"] == sync_spotify.calls["songs"]
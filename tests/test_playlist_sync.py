@@ -0,0 +1,111 @@
+import random
+
+from ag.services.playlist_sync import (
+    PLAYLIST_BATCH_SIZE,
+    PlaylistWrite,
+    full_rewrite_calls,
+    plan_playlist_sync,
+    playlist_track_ids,
+    playlist_writes,
+)
+
+
+def apply_like_spotify(current, plan):
+    tracks = list(current)
+    for track, position in plan.removals:
+        assert tracks[position] == track
+        del tracks[position]
+    for range_start, insert_before in plan.moves:
+        track = tracks.pop(range_start)
+        if range_start < insert_before:
+            insert_before -= 1
+        tracks.insert(insert_before, track)
+    for position, items in plan.insertions:
+        assert len(items) <= PLAYLIST_BATCH_SIZE
+        tracks[position:position] = items
+    return tracks
+
+
+def test_identical_playlists_need_no_changes():
+    plan = plan_playlist_sync(["a", "b", "c"], ["a", "b", "c"])
+
+    assert plan.is_noop
+    assert plan.write_calls == 0
+
+
+def test_single_moved_track_is_one_reorder():
+    current = list("abcdefgh")
+    desired = list("abcfdegh")  # "f" moved two slots up
+
+    plan = plan_playlist_sync(current, desired)
+
+    assert plan.removals == [] and plan.insertions == []
+    assert len(plan.moves) == 1
+    assert apply_like_spotify(current, plan) == desired
+
+
+def test_duplicates_and_surplus_copies():
+    current = ["a", "b", "a", "c", "a"]
+    desired = ["c", "a", "x", "a"]
+
+    plan = plan_playlist_sync(current, desired)
+
+    assert sorted(plan.removals, key=lambda r: r[1]) == [("b", 1), ("a", 4)]
+    assert apply_like_spotify(current, plan) == desired
+
+
+def test_long_additions_are_batched():
+    desired = [f"t{i}" for i in range(250)]
+
+    plan = plan_playlist_sync([], desired)
+
+    assert [(position, len(items)) for position, items in plan.insertions] == [
+        (0, 100),
+        (100, 100),
+        (200, 50),
+    ]
+    assert plan.write_calls == full_rewrite_calls(250) == 3
+
+
+def test_random_playlists_converge():
+    rng = random.Random(42)
+    pool = [f"t{i}" for i in range(40)]
+    for _ in range(300):
+        current = [rng.choice(pool) for _ in range(rng.randint(0, 30))]
+        desired = [rng.choice(pool) for _ in range(rng.randint(0, 30))]
+
+        plan = plan_playlist_sync(current, desired)
+
+        assert apply_like_spotify(current, plan) == desired
+
+
+def test_playlist_writes_diff_in_order():
+    tail = [f"t{i}" for i in range(PLAYLIST_BATCH_SIZE)]
+    writes = playlist_writes(
+        "p", ["a", "x", "c", "b"] + tail, ["a", "b", "c"] + tail + ["d"]
+    )
+
+    assert [write.kind for write in writes] == ["remove", "move", "add"]
+    assert writes[0].positions == {"x": [1]}
+    assert writes[-1] == PlaylistWrite(
+        "add", track_ids=["d"], position=PLAYLIST_BATCH_SIZE + 3
+    )
+
+
+def test_playlist_writes_rewrite_without_ids_or_over_budget():
+    desired = [f"t{i}" for i in range(PLAYLIST_BATCH_SIZE + 1)]
+
+    writes = playlist_writes("p", None, desired)
+    assert [(w.kind, len(w.track_ids), w.position) for w in writes] == [
+        ("replace", PLAYLIST_BATCH_SIZE, None),
+        ("add", 1, None),
+    ]
+    assert playlist_writes("p", list(reversed(desired)), desired)[0].kind == (
+        "replace"
+    )
+    assert playlist_writes("p", [], []) == []
+
+
+def test_playlist_track_ids_none_when_an_item_has_no_id():
+    assert playlist_track_ids([{"track": {"id": "a"}}]) == ["a"]
+    assert playlist_track_ids([{"track": {"id": "a"}}, {"track": None}]) is None
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ag.utils.rate_limit import (
+    AdaptiveRateLimiter,
+    NullRateLimiter,
+    RateLimiter,
+    RateLimiterRegistry,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_spaces_calls(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("ag.utils.rate_limit.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("ag.utils.rate_limit.time.sleep", clock.sleep)
+    limiter = RateLimiter(0.5, burst=3)
+
+    for _ in range(5):
+        limiter.wait()
+
+    assert clock.sleeps == [0.5, 0.5]
+    stats = limiter.stats()
+    assert stats.acquired == 5
+    assert stats.waited == 2
+    assert stats.wait_seconds == 1.0
+
+
+def test_token_bucket_refills_while_idle(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("ag.utils.rate_limit.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("ag.utils.rate_limit.time.sleep", clock.sleep)
+    limiter = RateLimiter(1.0, burst=2)
+
+    limiter.wait()
+    limiter.wait()
+    clock.now += 10
+    limiter.wait()
+    limiter.wait()
+
+    assert clock.sleeps == []
+
+
+def test_limiter_is_shared_safely_between_threads():
+    limiter = RateLimiter(0.01)
+    calls = []
+
+    def worker():
+        for _ in range(5):
+            with limiter:
+                calls.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    calls.sort()
+    assert len(calls) == 20
+    assert calls[-1] - calls[0] >= 0.19 - 0.01
+    assert limiter.stats().acquired == 20
+
+
+def test_limiter_supports_async_context():
+    limiter = RateLimiter(0.01, burst=2)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(4):
+            async with limiter:
+                pass
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.015
+    assert limiter.stats().waited == 2
+
+
+def test_registry_returns_null_limiter_for_unknown_bucket():
+    registry = RateLimiterRegistry({"setlist_fm": RateLimiter(1.0)})
+
+    assert isinstance(registry.get("spotify_search"), NullRateLimiter)
+    assert set(registry.stats()) == {"setlist_fm"}
+
+
+def test_adaptive_limiter_backs_off_and_recovers(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("ag.utils.rate_limit.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("ag.utils.rate_limit.time.sleep", clock.sleep)
+    limiter = AdaptiveRateLimiter(0.5, jitter_seconds=0.0, recovery_fraction=0.25)
+
+    assert limiter.rate == 2.0
+    limiter.on_throttled(3.0)
+    # The next caller waits out the Retry-After pause.
+    limiter.wait()
+    assert clock.sleeps[-1] >= 3.0
+    limiter.on_throttled(3.0)
+    assert limiter.rate == pytest.approx(0.5)
+    assert limiter.stats().throttled == 2
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == pytest.approx(2.0)
+
+
+def test_adaptive_limiter_slows_once_per_burst_of_429s(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("ag.utils.rate_limit.time.monotonic", clock.monotonic)
+    limiter = AdaptiveRateLimiter(0.5, jitter_seconds=0.0)
+
+    for _ in range(4):
+        limiter.on_throttled(3.0)
+    assert limiter.rate == pytest.approx(1.0)
+    assert limiter.stats().throttled == 4
+
+    clock.now += 3.0
+    limiter.on_throttled(3.0)
+    assert limiter.rate == pytest.approx(0.5)
+
+
+def test_null_limiter_honours_throttle_pause(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("ag.utils.rate_limit.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("ag.utils.rate_limit.time.sleep", clock.sleep)
+    limiter = NullRateLimiter()
+
+    limiter.wait()
+    limiter.on_throttled(1.0)
+    limiter.wait()
+
+    assert len(clock.sleeps) == 1
+    assert 1.0 <= clock.sleeps[0] <= 1.5
+
+
+def test_null_limiter_context_waits_out_throttle_pause(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("ag.utils.rate_limit.time.monotonic", clock.monotonic)
+    monkeypatch.setattr("ag.utils.rate_limit.time.sleep", clock.sleep)
+    limiter = NullRateLimiter()
+
+    with limiter:
+        pass
+    limiter.on_throttled(2.0)
+    with limiter:
+        pass
+
+    assert len(clock.sleeps) == 1
+    assert 2.0 <= clock.sleeps[0] <= 2.5
+
+
+def test_parse_retry_after_defaults_on_missing_or_bad_header():
+    assert parse_retry_after({"Retry-After": "7"}) == 7.0
+    assert parse_retry_after({"Retry-After": "soon"}) == 2.0
+    assert parse_retry_after(None, default=1.0) == 1.0
@@ -0,0 +1,112 @@
+import pytest
+
+from ag import run
+from ag.cache import MemoryCache, TieredCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch, tmp_path):
+    monkeypatch.setenv("SETLIST_FM_API_KEY", "setlist-key")
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "client-id")
+    monkeypatch.setenv("SPOTIFY_CLIENT_SECRET", "client-secret")
+    monkeypatch.setenv("SETLIST_CACHE", str(tmp_path / "setlists.json"))
+    monkeypatch.setenv("SPOTIFY_TRACK_CACHE", str(tmp_path / "spotify.json"))
+    run.reset_shared_components()
+    yield
+    run.reset_shared_components()
+
+
+def test_builder_is_reused_for_the_same_configuration():
+    first = run._build_builder(False, 1.0, require_spotify_user=False)
+    second = run._build_builder(False, 1.0, require_spotify_user=False)
+
+    assert second is first
+
+
+def test_builders_with_other_options_share_clients_and_caches():
+    shallow = run._build_builder(False, 1.0, require_spotify_user=False)
+    deep = run._build_builder(
+        False, 1.0, require_spotify_user=False, setlist_pages=3, max_workers=4
+    )
+
+    assert deep is not shallow
+    assert deep.setlist_client.max_pages == 3
+    assert deep.setlist_client.cache is shallow.setlist_client.cache
+    assert deep.setlist_client.session is shallow.setlist_client.session
+    assert deep.spotify_client is shallow.spotify_client
+
+
+def test_changed_environment_builds_new_components(monkeypatch, tmp_path):
+    before = run._build_builder(False, 1.0, require_spotify_user=False)
+    monkeypatch.setenv("SPOTIFY_CLIENT_ID", "rotated-id")
+
+    after = run._build_builder(False, 1.0, require_spotify_user=False)
+
+    assert after is not before
+    assert after.spotify_client is not before.spotify_client
+    assert after.spotify_client.config.client_id == "rotated-id"
+    # The setlist cache does not depend on Spotify credentials.
+    assert after.setlist_client.cache is before.setlist_client.cache
+
+
+def test_rate_limiters_keep_adapted_rate_between_runs():
+    builder = run._build_builder(False, 2.0, require_spotify_user=False)
+    builder.setlist_client.rate_limiter.on_throttled(0)
+    slowed = builder.setlist_client.rate_limiter.rate
+
+    again = run._build_builder(False, 2.0, require_spotify_user=False, max_workers=2)
+
+    assert again.setlist_client.rate_limiter.rate == slowed
+    assert slowed < 0.5
+
+
+def test_lambda_defaults_to_memory_over_tmp_sqlite(monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "ag")
+    monkeypatch.delenv("SETLIST_CACHE")
+    monkeypatch.delenv("SPOTIFY_TRACK_CACHE")
+
+    builder = run._build_builder(False, 1.0, require_spotify_user=False)
+
+    cache = builder.setlist_client.cache
+    assert isinstance(cache, TieredCache)
+    assert isinstance(cache.tiers[0], MemoryCache)
+    assert str(cache.tiers[1].cache_path) == "/tmp/ag/setlist_cache.sqlite"
+    tracks = builder.spotify_client.track_cache
+    assert str(tracks.tiers[1].cache_path) == "/tmp/ag/spotify_cache.sqlite"
+
+
+def test_async_builder_shares_caches_and_limiters_with_sync_builder():
+    sync_builder = run._build_builder(False, 1.0, require_spotify_user=False)
+    async_builder = run._build_async_builder(False, 1.0, require_spotify_user=False)
+
+    assert async_builder.setlist_client.cache is sync_builder.setlist_client.cache
+    assert (
+        async_builder.setlist_client.rate_limiter
+        is sync_builder.setlist_client.rate_limiter
+    )
+    spotify = async_builder.spotify_client
+    assert spotify.track_cache is sync_builder.spotify_client.track_cache
+    assert spotify.rate_limiters is sync_builder.spotify_client.rate_limiters
+
+
+def test_spotify_limiters_do_not_depend_on_setlist_rate():
+    slow = run._build_builder(False, 2.0, require_spotify_user=False)
+    fast = run._build_builder(False, 0.5, require_spotify_user=False)
+
+    assert fast.setlist_client.rate_limiter is not slow.setlist_client.rate_limiter
+    assert fast.spotify_client is slow.spotify_client
+    assert fast.spotify_client.rate_limiters is run.shared_spotify_rate_limiters()
+
+
+def test_registries_keep_only_recent_components():
+    first = run._build_builder(False, 1.0, require_spotify_user=False)
+    for pages in range(2, run.MAX_SHARED_COMPONENTS + 2):
+        run._build_builder(False, 1.0, require_spotify_user=False, setlist_pages=pages)
+    for rate in range(2, run.MAX_SHARED_COMPONENTS + 2):
+        run.shared_setlist_rate_limiter(float(rate))
+
+    assert len(run._builders) == run.MAX_SHARED_COMPONENTS
+    assert len(run._setlist_rate_limiters) == run.MAX_SHARED_COMPONENTS
+    again = run._build_builder(False, 1.0, require_spotify_user=False)
+    assert again is not first
+    assert again.spotify_client is first.spotify_client
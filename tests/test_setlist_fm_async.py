@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from ag.cache import MemoryCache
+from ag.clients.setlist_fm import SetlistFmClient
+from ag.clients.setlist_fm_async import AsyncSetlistFmClient
+from ag.utils.rate_limit import AdaptiveRateLimiter
+
+
+def _event(days_ago):
+    date = (datetime.now() - timedelta(days=days_ago)).strftime("%d-%m-%Y")
+    return {"eventDate": date, "url": "u", "sets": {"set": []}}
+
+
+def _pages(ages_per_page):
+    total = sum(len(ages) for ages in ages_per_page)
+    return {
+        number: {
+            "itemsPerPage": 2,
+            "total": total,
+            "page": number,
+            "setlist": [_event(age) for age in ages],
+        }
+        for number, ages in enumerate(ages_per_page, start=1)
+    }
+
+
+class FakeApi:
+    def __init__(self, pages, artists=None):
+        self.pages = pages
+        self.artists = [{"mbid": "mbid-1", "name": "Band"}] if artists is None else artists
+        self.requested = []
+        self.headers = []
+        self.throttle_first = 0
+
+    def __call__(self, request):
+        self.headers.append(request.headers.get("x-api-key"))
+        if request.url.path.endswith("/search/artists"):
+            if not self.artists:
+                return httpx.Response(404, json={"message": "not found"})
+            return httpx.Response(200, json={"artist": self.artists})
+        if self.throttle_first:
+            self.throttle_first -= 1
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        page = int(request.url.params["p"])
+        self.requested.append(page)
+        if page not in self.pages:
+            return httpx.Response(404, json={"message": "not found"})
+        return httpx.Response(200, json=self.pages[page])
+
+
+def build_client(api, cache=None, **kwargs):
+    return AsyncSetlistFmClient(
+        "key",
+        cache=cache if cache is not None else MemoryCache(),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(api)),
+        **kwargs,
+    )
+
+
+def test_pages_are_fetched_concurrently_and_merged():
+    api = FakeApi(_pages([[1, 2], [3, 4], [5]]))
+    client = build_client(api, max_pages=5)
+
+    merged = asyncio.run(client.get_recent_setlists("Band"))
+
+    assert sorted(api.requested) == [1, 2, 3]
+    assert len(merged["setlist"]) == 5
+    assert set(api.headers) == {"key"}
+
+
+def test_paging_stops_past_max_age():
+    api = FakeApi(_pages([[1, 40], [50, 60], [70]]))
+    client = build_client(api, max_pages=5, page_workers=1)
+
+    merged = asyncio.run(client.get_recent_setlists("Band", max_age_days=30))
+
+    assert api.requested == [1]
+    assert len(merged["setlist"]) == 2
+
+
+def test_cache_is_shared_with_the_blocking_client():
+    api = FakeApi(_pages([[1, 2]]))
+    cache = MemoryCache()
+
+    fetched = asyncio.run(build_client(api, cache=cache).get_recent_setlists("Band"))
+
+    class NoSession:
+        def get(self, *args, **kwargs):
+            raise AssertionError("should be served from cache")
+
+    sync_client = SetlistFmClient("key", cache=cache, session=NoSession())
+    assert sync_client.get_recent_setlists("Band") == fetched
+
+
+def test_429_is_retried_through_the_limiter():
+    api = FakeApi(_pages([[1]]))
+    api.throttle_first = 1
+    limiter = AdaptiveRateLimiter(0.01, jitter_seconds=0)
+    client = build_client(api, rate_limiter=limiter)
+
+    merged = asyncio.run(client.get_recent_setlists("Band"))
+
+    assert len(merged["setlist"]) == 1
+    assert limiter.stats().throttled == 1
+
+
+def test_unknown_artist_returns_empty_payload():
+    api = FakeApi({}, artists=[])
+    client = build_client(api)
+
+    assert asyncio.run(client.get_recent_setlists("Nobody")) == {}
@@ -0,0 +1,223 @@
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from ag.cache import MemoryCache, create_cache
+from ag.clients import setlist_fm
+from ag.clients.setlist_fm import SETLIST_CACHE_NAMESPACE_TTLS, SetlistFmClient
+from ag.utils.rate_limit import AdaptiveRateLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.headers = headers or {}
+        self.text = str(payload)
+
+    def json(self):
+        return self._payload
+
+
+def _event(days_ago):
+    date = (datetime.now() - timedelta(days=days_ago)).strftime("%d-%m-%Y")
+    return {"eventDate": date, "url": "u", "sets": {"set": []}}
+
+
+def _pages(ages_per_page):
+    total = sum(len(ages) for ages in ages_per_page)
+    return {
+        number: {
+            "itemsPerPage": 2,
+            "total": total,
+            "page": number,
+            "setlist": [_event(age) for age in ages],
+        }
+        for number, ages in enumerate(ages_per_page, start=1)
+    }
+
+
+class FakeSession:
+    def __init__(self, pages, artists=None):
+        self.pages = pages
+        self.artists = [{"mbid": "mbid-1", "name": "Band"}] if artists is None else artists
+        self.requested = []
+        self.urls = []
+        self.timeouts = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.urls.append(url)
+        self.timeouts.append(timeout)
+        if url.endswith("/search/artists"):
+            if not self.artists:
+                return FakeResponse(404, {"message": "not found"})
+            return FakeResponse(200, {"artist": self.artists})
+        page = params["p"]
+        self.requested.append(page)
+        if page not in self.pages:
+            return FakeResponse(404, {"message": "not found"})
+        return FakeResponse(200, self.pages[page])
+
+
+def test_defaults_to_single_page():
+    session = FakeSession(_pages([[1, 2], [3, 4]]))
+    client = SetlistFmClient("key", cache=MemoryCache(), session=session)
+
+    result = client.get_recent_setlists("Band")
+
+    assert session.requested == [1]
+    assert len(result["setlist"]) == 2
+
+
+def test_fetches_and_caches_multiple_pages():
+    session = FakeSession(_pages([[1, 2], [3, 4], [5, 6]]))
+    requested = session.requested
+    cache = MemoryCache()
+    client = SetlistFmClient("key", cache=cache, max_pages=5, session=session)
+
+    result = client.get_recent_setlists("Band")
+
+    assert sorted(requested) == [1, 2, 3]
+    assert len(result["setlist"]) == 6
+    for page in (1, 2, 3):
+        assert f"setlists:mbid-1:p{page}" in cache
+
+    client.get_recent_setlists("Band")
+    assert sorted(requested) == [1, 2, 3]
+
+
+def test_stops_once_setlists_are_older_than_cutoff():
+    session = FakeSession(_pages([[1, 10], [50, 400], [500, 600], [700, 800]]))
+    client = SetlistFmClient(
+        "key",
+        cache=MemoryCache(),
+        max_pages=10,
+        max_age_days=365,
+        page_workers=1,
+        session=session,
+    )
+
+    result = client.get_recent_setlists("Band")
+
+    assert session.requested == [1, 2]
+    assert len(result["setlist"]) == 4
+
+
+def test_passes_timeout_and_survives_network_errors():
+    class TimeoutSession(FakeSession):
+        def get(self, url, headers=None, params=None, timeout=None):
+            super().get(url, headers=headers, params=params, timeout=timeout)
+            raise requests.Timeout("slow upstream")
+
+    session = TimeoutSession({})
+    cache = MemoryCache()
+    client = SetlistFmClient("key", cache=cache, session=session, timeout=2.5)
+
+    assert client.get_recent_setlists("Band") == {}
+    assert session.timeouts == [2.5, 2.5]
+    assert cache.as_dict() == {}
+
+
+def test_clients_share_pooled_session(monkeypatch):
+    monkeypatch.setattr(setlist_fm, "_shared_session", None)
+
+    first = SetlistFmClient("key", cache=MemoryCache())
+    second = SetlistFmClient("key", cache=MemoryCache())
+
+    assert first.session is second.session
+    adapter = first.session.get_adapter("https://api.setlist.fm")
+    assert adapter._pool_maxsize == setlist_fm.DEFAULT_POOL_SIZE
+
+
+def test_resolves_mbid_once_and_uses_artist_endpoint():
+    session = FakeSession(
+        _pages([[1, 2]]),
+        artists=[
+            {"mbid": "tribute", "name": "Band Tribute"},
+            {"mbid": "real", "name": "band"},
+        ],
+    )
+    cache = MemoryCache()
+    client = SetlistFmClient("key", cache=cache, session=session)
+
+    client.get_recent_setlists("Band")
+    client.get_recent_setlists("Band")
+
+    assert session.urls == [
+        "https://api.setlist.fm/rest/1.0/search/artists",
+        "https://api.setlist.fm/rest/1.0/artist/real/setlists",
+    ]
+    assert cache.get("mbid:band") == {"mbid": "real"}
+
+
+def test_mbid_mapping_outlives_the_setlist_ttl(tmp_path, monkeypatch):
+    session = FakeSession(_pages([[1, 2]]))
+    cache = create_cache(
+        f"memory://,file://{tmp_path}/setlists.sqlite",
+        ttl_seconds=60,
+        namespace_ttls=SETLIST_CACHE_NAMESPACE_TTLS,
+    )
+    client = SetlistFmClient("key", cache=cache, session=session)
+    client.get_recent_setlists("Band")
+
+    now = time.time()
+    monkeypatch.setattr("ag.cache.time.time", lambda: now + 120)
+    client.get_recent_setlists("Band")
+
+    # Only the setlist page expired; the artist was not searched again.
+    assert [url.rsplit("/", 1)[-1] for url in session.urls] == [
+        "artists",
+        "setlists",
+        "setlists",
+    ]
+    for tier in cache.tiers:
+        assert tier.get("mbid:band") == {"mbid": "mbid-1"}
+
+
+def test_falls_back_to_name_search_without_mbid():
+    session = FakeSession(_pages([[1, 2]]), artists=[])
+    cache = MemoryCache()
+    client = SetlistFmClient("key", cache=cache, session=session)
+
+    result = client.get_recent_setlists("Band")
+
+    assert len(result["setlist"]) == 2
+    assert session.urls[-1].endswith("/search/setlists")
+    assert cache.get("mbid:band") == {"mbid": None}
+    assert "Band" in cache
+
+
+def test_retries_rate_limited_requests_a_bounded_number_of_times(monkeypatch):
+    class ThrottledSession(FakeSession):
+        def __init__(self, pages, throttled_calls):
+            super().__init__(pages)
+            self.throttled_calls = throttled_calls
+
+        def get(self, url, headers=None, params=None, timeout=None):
+            if self.throttled_calls > 0:
+                self.throttled_calls -= 1
+                self.urls.append(url)
+                return FakeResponse(429, {}, headers={"Retry-After": "0"})
+            return super().get(url, headers=headers, params=params, timeout=timeout)
+
+    limiter = AdaptiveRateLimiter(0.001, jitter_seconds=0.0)
+    session = ThrottledSession(_pages([[1, 2]]), throttled_calls=2)
+    client = SetlistFmClient(
+        "key", cache=MemoryCache(), rate_limiter=limiter, session=session
+    )
+
+    assert len(client.get_recent_setlists("Band")["setlist"]) == 2
+    assert limiter.stats().throttled == 2
+
+    always_throttled = ThrottledSession(_pages([[1, 2]]), throttled_calls=100)
+    client = SetlistFmClient(
+        "key",
+        cache=MemoryCache(),
+        rate_limiter=AdaptiveRateLimiter(0.001, jitter_seconds=0.0),
+        session=always_throttled,
+        max_retries=2,
+    )
+    assert client.get_recent_setlists("Band") == {}
+    # Artist lookup and the first page each give up after 1 + 2 attempts.
+    assert len(always_throttled.urls) == 6
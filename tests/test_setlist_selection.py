@@ -1,6 +1,20 @@
-import pandas as pd
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
 
-from ag.services.setlist_selection import extract_smart_setlist
+import numpy as np
+import pytest
+
+from ag.services.setlist_selection import (
+    derive_song_features,
+    extract_common_songs,
+    extract_last_setlist,
+    extract_smart_setlist,
+    extract_song_frame,
+    features_to_frame,
+)
 
 
 def test_extract_smart_setlist_handles_empty():
@@ -8,7 +22,197 @@ def test_extract_smart_setlist_handles_empty():
 
 
 def test_extract_smart_setlist_handles_tiny_dataset():
-    songs = [("Song A", pd.Timestamp("2024-01-01"))]
+    songs = [("Song A", datetime(2024, 1, 1))]
     result = extract_smart_setlist(songs, 5)
     assert result[0] == "Song A"
     assert len(result) == 1
+
+
+SETLISTS = {
+    "setlist": [
+        {
+            "eventDate": "03-02-2024",
+            "url": "u1",
+            "sets": {
+                "set": [
+                    {
+                        "song": [
+                            {"name": "Intro", "tape": True},
+                            {"name": "Song A"},
+                            {"name": ""},
+                            {"name": "Song B"},
+                        ]
+                    },
+                    {"song": [{"name": "Song C"}]},
+                ]
+            },
+        },
+        {
+            "eventDate": "01-02-2024",
+            "url": "u2",
+            "sets": {"set": [{"song": [{"name": "Song B"}]}, {"song": []}]},
+        },
+    ]
+}
+
+
+def test_extract_song_frame_flattens_setlists():
+    frame = extract_song_frame(SETLISTS)
+
+    assert list(frame["name"]) == ["Song A", "Song B", "Song C", "Song B"]
+    assert frame["date"] == [
+        datetime(2024, 2, 3),
+        datetime(2024, 2, 3),
+        datetime(2024, 2, 3),
+        datetime(2024, 2, 1),
+    ]
+    assert frame["date"][0] is frame["date"][2]
+    assert extract_common_songs(SETLISTS) == list(zip(frame["name"], frame["date"]))
+
+
+def test_song_frame_feeds_feature_and_last_setlist_helpers():
+    frame = extract_song_frame(SETLISTS)
+
+    features = derive_song_features(frame, decay_rate=0.9)
+    assert list(features["position"]) == [1, 2, 3, 1]
+    assert list(features["is_last"]) == [False, False, True, True]
+
+    songs, last_date = extract_last_setlist(frame)
+    assert songs == ["Song A", "Song B", "Song C"]
+    assert last_date == datetime(2024, 2, 3)
+    assert extract_last_setlist(extract_common_songs(SETLISTS)) == (songs, last_date)
+
+
+def test_extract_last_setlist_handles_empty():
+    assert extract_last_setlist([]) == ([], None)
+
+
+def _reference_smart_setlist(songs_by_date, setlist_length):
+    """The original pandas implementation, kept as an oracle for the NumPy engine.
+
+    The only change is a stable sort of overall weights: pandas' default
+    quicksort leaves the order of equal weights implementation-defined.
+    """
+    pd = pytest.importorskip("pandas")
+    names, dates = zip(*songs_by_date)
+    df = pd.DataFrame({"name": names, "date": dates})
+    days_since_played = (pd.Timestamp.now() - df["date"]).dt.days
+    df["weight"] = 0.9 ** (days_since_played / 30)
+    df["position"] = df.groupby("date").cumcount() + 1
+    df["setlist_size"] = df.groupby("date")["name"].transform("count")
+    df["is_first"] = df["position"] == 1
+    df["is_last"] = df["position"] == df["setlist_size"]
+    df["normalised_position"] = df["position"] / df["setlist_size"]
+
+    position_labels = ["Start", "Middle", "End"]
+    df["position_bin"] = pd.cut(
+        df["normalised_position"], bins=[0, 0.2, 0.8, 1], labels=position_labels
+    )
+    weighted_position_freq = (
+        df.groupby(["position_bin", "name"], observed=True)["weight"]
+        .sum()
+        .unstack(fill_value=0)
+    )
+    overall_weight = (
+        df.groupby("name")["weight"].sum().sort_values(ascending=False, kind="stable")
+    )
+
+    def _first_available(weights, exclude):
+        for name in weights.index:
+            if name not in exclude:
+                return name
+        return weights.index[0]
+
+    first_candidates = df.loc[df["is_first"]].groupby("name")["weight"].sum()
+    most_likely_first = (
+        first_candidates.idxmax()
+        if not first_candidates.empty
+        else _first_available(overall_weight, set())
+    )
+    last_candidates = df.loc[df["is_last"]].groupby("name")["weight"].sum()
+    most_likely_last = (
+        last_candidates.idxmax()
+        if not last_candidates.empty
+        else _first_available(overall_weight, {most_likely_first})
+    )
+
+    all_songs = {most_likely_first, most_likely_last}
+    setlist = [most_likely_first]
+    for i in range(2, setlist_length):
+        remaining = [song for song in overall_weight.index if song not in all_songs]
+        if not remaining:
+            break
+        current_bin = position_labels[i // setlist_length]
+        if current_bin in weighted_position_freq.index:
+            most_likely_song = (
+                weighted_position_freq.loc[current_bin]
+                .reindex(remaining, fill_value=0)
+                .idxmax()
+            )
+        else:
+            most_likely_song = remaining[0]
+        setlist.append(most_likely_song)
+        all_songs.add(most_likely_song)
+    if most_likely_last not in all_songs:
+        setlist.append(most_likely_last)
+    return setlist
+
+
+def _random_history(rng, n_shows, pool_size, min_len, max_len):
+    pool = [f"Song {i:02d}" for i in range(pool_size)]
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    history = []
+    for show in range(n_shows):
+        date = today - timedelta(days=int(rng.integers(1, 900)))
+        size = int(rng.integers(min_len, max_len + 1))
+        for name in rng.choice(pool, size=min(size, pool_size), replace=False):
+            history.append((str(name), date))
+    return history
+
+
+def test_numpy_smart_setlist_matches_pandas_reference():
+    rng = np.random.default_rng(1234)
+    for _ in range(20):
+        history = _random_history(
+            rng,
+            n_shows=int(rng.integers(1, 12)),
+            pool_size=int(rng.integers(2, 14)),
+            min_len=1,
+            max_len=12,
+        )
+        for length in (1, 3, 8, 15):
+            assert extract_smart_setlist(history, length) == _reference_smart_setlist(
+                history, length
+            )
+
+
+def test_smart_setlist_handles_large_candidate_pool():
+    rng = np.random.default_rng(7)
+    history = _random_history(rng, n_shows=60, pool_size=2000, min_len=15, max_len=25)
+
+    setlist = extract_smart_setlist(history, 200)
+
+    assert len(setlist) == 199
+    assert len(set(setlist)) == 199
+
+
+def test_pipeline_does_not_import_pandas():
+    code = (
+        "import sys; import ag.services.playlist_builder; "
+        "sys.exit('pandas' in sys.modules)"
+    )
+    src = Path(__file__).resolve().parents[1] / "src"
+    result = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": str(src)}
+    )
+    assert result.returncode == 0
+
+
+def test_features_to_frame_builds_dataframe():
+    pytest.importorskip("pandas")
+    features = derive_song_features(extract_song_frame(SETLISTS), decay_rate=0.9)
+
+    frame = features_to_frame(features)
+
+    assert list(frame["name"]) == ["Song A", "Song B", "Song C", "Song B"]
+    assert list(frame.columns)[:2] == ["name", "date"]
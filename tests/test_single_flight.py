@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ag.utils.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flights.do, "key", slow)
+        started.wait(5)
+        followers = [executor.submit(flights.do, "key", slow) for _ in range(3)]
+        while flights.shared < 3:
+            pass
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert (flights.executed, flights.shared) == (1, 3)
+
+
+def test_waiters_receive_the_leader_exception():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, "key", failing)
+        started.wait(5)
+        follower = executor.submit(flights.do, "key", failing)
+        while flights.shared < 1:
+            pass
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="upstream down"):
+                future.result()
+
+
+def test_finished_calls_are_not_remembered():
+    flights = SingleFlight()
+
+    assert flights.do("key", lambda: 1) == 1
+    assert flights.do("key", lambda: 2) == 2
+    assert flights.executed == 2
+
+
+def test_async_callers_share_one_execution():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", slow) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+    assert (flights.executed, flights.shared) == (1, 4)
+
+
+def test_async_waiters_receive_the_leader_exception():
+    flights = AsyncSingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.do("key", failing) for _ in range(2)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [ValueError, ValueError]
@@ -0,0 +1,261 @@
+import asyncio
+import json
+
+import pytest
+from spotipy.exceptions import SpotifyException
+
+httpx = pytest.importorskip("httpx")
+
+from ag.cache import MemoryCache, create_null_cache
+from ag.clients.spotify import SpotifyClient
+from ag.clients.spotify_async import AsyncSpotifyClient
+from ag.config import SpotifyConfig
+from ag.models import Playlist
+from ag.utils.rate_limit import (
+    SPOTIFY_SEARCH,
+    AdaptiveRateLimiter,
+    RateLimiterRegistry,
+)
+
+
+class FakeTokens:
+    def __init__(self, token="token"):
+        self.token = token
+        self.invalidated = 0
+
+    def get_access_token(self, as_dict=False):
+        return self.token
+
+    def invalidate(self):
+        self.invalidated += 1
+        self.token = "fresh-token"
+
+
+class FakeSpotifyApi:
+    """Minimal Web API: track search, playlist listing, reads and writes."""
+
+    def __init__(self, search_results=None, playlist_tracks=None):
+        self.search_results = search_results or []
+        self.playlist_tracks = list(playlist_tracks or [])
+        self.user_playlists = []
+        self.requests = []
+        self.snapshot = 0
+        self.responses = {}  # (method, path) -> list of canned responses
+
+    def __call__(self, request):
+        path = request.url.path.removeprefix("/v1")
+        body = json.loads(request.content) if request.content else None
+        self.requests.append((request.method, path, dict(request.url.params), body))
+        canned = self.responses.get((request.method, path))
+        if canned:
+            return canned.pop(0)
+
+        if path == "/search":
+            return httpx.Response(200, json={"tracks": {"items": self.search_results}})
+        if path == "/me/playlists":
+            return httpx.Response(
+                200, json={"items": self.user_playlists, "next": None}
+            )
+        if path == "/users/user/playlists":
+            playlist = {
+                "name": body["name"],
+                "id": f"new-{len(self.user_playlists)}",
+                "external_urls": {"spotify": "url"},
+            }
+            self.user_playlists.insert(0, playlist)
+            return httpx.Response(201, json=playlist)
+        if path == "/playlists/pl":
+            items = [{"track": {"id": track_id}} for track_id in self.playlist_tracks]
+            return httpx.Response(
+                200,
+                json={
+                    "snapshot_id": f"snap-{self.snapshot}",
+                    "tracks": {"items": items, "next": None},
+                },
+            )
+        if path == "/playlists/pl/tracks":
+            return self._write(request.method, body)
+        return httpx.Response(404, json={"error": {"message": "unknown"}})
+
+    def _write(self, method, body):
+        ids = [uri.rsplit(":", 1)[-1] for uri in body.get("uris", [])]
+        if method == "DELETE":
+            doomed = {
+                position for item in body["tracks"] for position in item["positions"]
+            }
+            self.playlist_tracks = [
+                t for i, t in enumerate(self.playlist_tracks) if i not in doomed
+            ]
+        elif method == "POST":
+            position = body.get("position", len(self.playlist_tracks))
+            self.playlist_tracks[position:position] = ids
+        elif "range_start" in body:
+            item = self.playlist_tracks.pop(body["range_start"])
+            insert_before = body["insert_before"]
+            if body["range_start"] < insert_before:
+                insert_before -= 1
+            self.playlist_tracks.insert(insert_before, item)
+        else:
+            self.playlist_tracks = ids
+        self.snapshot += 1
+        return httpx.Response(200, json={"snapshot_id": f"snap-{self.snapshot}"})
+
+    def calls(self, method, path):
+        return [r for r in self.requests if r[0] == method and r[1] == path]
+
+
+def build_client(api, track_cache=None, **kwargs):
+    cfg = SpotifyConfig(
+        client_id="id",
+        client_secret="secret",
+        redirect_uri="uri",
+        username="user",
+        refresh_token="token",
+    )
+    return AsyncSpotifyClient(
+        cfg,
+        track_cache=track_cache or create_null_cache(),
+        token_manager=kwargs.pop("token_manager", FakeTokens()),
+        app_token_manager=FakeTokens("app-token"),
+        client=httpx.AsyncClient(transport=httpx.MockTransport(api)),
+        **kwargs,
+    )
+
+
+SONG = {"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}
+
+
+def test_concurrent_lookups_of_one_song_share_a_search():
+    api = FakeSpotifyApi(search_results=[SONG])
+    client = build_client(api)
+
+    async def run():
+        return await asyncio.gather(
+            client.get_track_match("My Song", "Band"),
+            client.get_track_match("my song", "Band"),
+        )
+
+    matches = asyncio.run(run())
+
+    assert len(api.calls("GET", "/search")) == 1
+    assert [m.spotify_id for m in matches] == ["2", "2"]
+    assert [m.name for m in matches] == ["My Song", "my song"]
+    params = api.requests[0][2]
+    assert params == {"q": "My Song Band", "limit": "50", "type": "track"}
+
+
+def test_map_tracks_dedupes_and_shares_cache_format_with_sync_client():
+    api = FakeSpotifyApi(search_results=[SONG])
+    cache = MemoryCache()
+    client = build_client(api, track_cache=cache)
+
+    mapped = asyncio.run(
+        client.map_tracks({"Band": ["My Song", "Missing", "MY SONG", "My Song"]})
+    )
+
+    assert len(api.calls("GET", "/search")) == 2
+    assert [m.spotify_id for m in mapped["Band"]] == ["2", None, "2", "2"]
+    # The blocking client answers from the memo the async one wrote.
+    sync_client = SpotifyClient(client.config, track_cache=cache, sp=object())
+    assert sync_client.get_track_match("My Song", "Band").spotify_id == "2"
+
+
+def test_search_429_slows_the_shared_limiter_and_retries():
+    api = FakeSpotifyApi(search_results=[SONG])
+    api.responses[("GET", "/search")] = [
+        httpx.Response(429, headers={"Retry-After": "0"})
+    ]
+    limiter = AdaptiveRateLimiter(0.01, jitter_seconds=0)
+    client = build_client(
+        api, rate_limiters=RateLimiterRegistry({SPOTIFY_SEARCH: limiter})
+    )
+
+    match = asyncio.run(client.get_track_match("My Song", "Band"))
+
+    assert match.spotify_id == "2"
+    assert len(api.calls("GET", "/search")) == 2
+    assert limiter.stats().throttled == 1
+
+
+def test_user_call_refreshes_token_once_on_401():
+    api = FakeSpotifyApi()
+    api.responses[("GET", "/me/playlists")] = [httpx.Response(401)]
+    tokens = FakeTokens()
+    client = build_client(api, token_manager=tokens)
+
+    playlist = asyncio.run(client.find_or_create_playlist("Gig"))
+
+    assert tokens.invalidated == 1
+    assert playlist.id == "new-0"
+    listing = [r for r in api.requests if r[1] == "/me/playlists"]
+    assert len(listing) == 2
+
+
+def test_concurrent_find_or_create_creates_the_playlist_once():
+    api = FakeSpotifyApi()
+    client = build_client(api, track_cache=MemoryCache())
+
+    async def run():
+        return await asyncio.gather(
+            *(client.find_or_create_playlist("Gig") for _ in range(3))
+        )
+
+    playlists = asyncio.run(run())
+
+    assert {p.id for p in playlists} == {"new-0"}
+    assert len(api.calls("POST", "/users/user/playlists")) == 1
+    again = asyncio.run(client.find_or_create_playlist("Gig"))
+    assert again.id == "new-0"
+    assert len(api.calls("GET", "/me/playlists")) == 1
+
+
+def test_sync_playlist_sends_only_the_diff():
+    tracks = [f"t{i}" for i in range(150)]
+    api = FakeSpotifyApi(playlist_tracks=tracks[:2] + ["x"] + tracks[2:])
+    desired = [tracks[0], tracks[2], tracks[1]] + tracks[3:] + ["new"]
+    client = build_client(api)
+
+    asyncio.run(client.sync_playlist(Playlist(name="Gig", id="pl", url="u"), desired))
+
+    assert api.playlist_tracks == desired
+    writes = [r for r in api.requests if r[1] == "/playlists/pl/tracks"]
+    assert [method for method, *_ in writes] == ["DELETE", "PUT", "POST"]
+    removal = writes[0][3]
+    assert removal["tracks"] == [{"uri": "spotify:track:x", "positions": [2]}]
+    assert removal["snapshot_id"] == "snap-0"
+    assert writes[1][3]["snapshot_id"] == "snap-1"
+    assert writes[2][3] == {"uris": ["spotify:track:new"], "position": 150}
+
+
+def test_non_retryable_errors_raise_spotify_exception():
+    api = FakeSpotifyApi()
+    api.responses[("GET", "/search")] = [httpx.Response(500, text="boom")]
+    client = build_client(api)
+
+    with pytest.raises(SpotifyException) as excinfo:
+        asyncio.run(client.get_track_match("My Song", "Band"))
+    assert excinfo.value.http_status == 500
+
+
+def test_populate_recreates_a_playlist_deleted_in_spotify():
+    api = FakeSpotifyApi(search_results=[SONG])
+    api.user_playlists = [
+        {"name": "Gig", "id": "gone", "external_urls": {"spotify": "old"}}
+    ]
+    recreated = {"name": "Gig", "id": "pl", "external_urls": {"spotify": "url"}}
+    api.responses[("POST", "/users/user/playlists")] = [
+        httpx.Response(201, json=recreated)
+    ]
+    client = build_client(api, track_cache=MemoryCache())
+
+    async def run():
+        stale = await client.find_or_create_playlist("Gig")
+        written = await client.populate_playlist(stale, {"Band": ["My Song"]})
+        return stale, written, await client.find_or_create_playlist("Gig")
+
+    stale, written, again = asyncio.run(run())
+
+    assert stale.id == "gone"
+    assert written == again == Playlist(name="Gig", id="pl", url="url")
+    assert len(api.calls("GET", "/playlists/gone")) == 1
+    assert api.playlist_tracks == ["2"]
@@ -0,0 +1,109 @@
+import threading
+import time
+
+from ag.clients.spotify_auth import SpotifyTokenManager, get_token_manager
+from ag.config import SpotifyConfig
+
+
+class FakeRefresher:
+    def __init__(self, lifetime=3600, rotate=False):
+        self.lifetime = lifetime
+        self.rotate = rotate
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, refresh_token):
+        self.release.wait(5)
+        self.calls.append(refresh_token)
+        info = {
+            "access_token": f"access-{len(self.calls)}",
+            "expires_at": time.time() + self.lifetime,
+        }
+        if self.rotate:
+            info["refresh_token"] = f"refresh-{len(self.calls)}"
+        return info
+
+
+def test_token_is_cached_until_it_nears_expiry(monkeypatch):
+    refresher = FakeRefresher()
+    manager = SpotifyTokenManager(refresher, "refresh")
+
+    assert manager.get_access_token() == "access-1"
+    assert manager.get_access_token() == "access-1"
+    assert manager.get_access_token(as_dict=True)["access_token"] == "access-1"
+    assert refresher.calls == ["refresh"]
+
+    now = time.time()
+    monkeypatch.setattr("ag.clients.spotify_auth.time.time", lambda: now + 3590)
+    assert manager.get_access_token() == "access-2"
+
+
+def test_refresh_ahead_happens_in_background(monkeypatch):
+    refresher = FakeRefresher()
+    manager = SpotifyTokenManager(refresher, "refresh", refresh_ahead_seconds=300)
+    manager.get_access_token()
+
+    now = time.time()
+    monkeypatch.setattr("ag.clients.spotify_auth.time.time", lambda: now + 3400)
+    refresher.release.clear()
+
+    # The current token is still served while the refresh is in flight.
+    assert manager.get_access_token() == "access-1"
+    assert manager.get_access_token() == "access-1"
+    refresher.release.set()
+    manager._background.join(5)
+
+    assert manager.get_access_token() == "access-2"
+    assert len(refresher.calls) == 2
+
+
+def test_invalidate_and_rotated_refresh_tokens():
+    refresher = FakeRefresher(rotate=True)
+    manager = SpotifyTokenManager(refresher, "refresh-0")
+    manager.get_access_token()
+
+    manager.invalidate()
+
+    assert manager.get_access_token() == "access-2"
+    assert refresher.calls == ["refresh-0", "refresh-1"]
+
+
+def test_concurrent_callers_share_one_refresh():
+    refresher = FakeRefresher()
+    refresher.release.clear()
+    manager = SpotifyTokenManager(refresher, "refresh")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.get_access_token()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    refresher.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["access-1"] * 8
+    assert refresher.calls == ["refresh"]
+
+
+def test_get_token_manager_is_shared_per_app_and_user():
+    config = SpotifyConfig(
+        client_id="id",
+        client_secret="secret",
+        redirect_uri="uri",
+        username="user",
+        refresh_token="shared-test-token",
+    )
+    other = SpotifyConfig(
+        client_id="id",
+        client_secret="secret",
+        redirect_uri="uri",
+        username="user",
+        refresh_token="other-test-token",
+    )
+
+    first = get_token_manager(config, FakeRefresher())
+    assert get_token_manager(config, FakeRefresher()) is first
+    assert get_token_manager(other, FakeRefresher()) is not first
@@ -1,7 +1,21 @@
-from ag.cache import create_null_cache
-from ag.clients.spotify import SpotifyClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from spotipy.exceptions import SpotifyException
+
+from ag.cache import (
+    DictSharedStore,
+    MemoryCache,
+    SharedStoreCache,
+    create_null_cache,
+)
+from ag.clients.spotify import SpotifyClient, migrate_track_cache
+from ag.clients.spotify_auth import SpotifyTokenManager, reset_token_managers
 from ag.config import SpotifyConfig
 from ag.models import Playlist
+from ag.utils.rate_limit import SPOTIFY_SEARCH, AdaptiveRateLimiter, RateLimiterRegistry
 
 
 class FakeSpotipy:
@@ -17,40 +31,125 @@ class FakeSpotipy:
         self.album_tracks_map = album_tracks or {}
         self.playlist_replace_called = False
         self.added_items = []
+        self.playlist_tracks = []
+        self.user_playlists = []
+        self.playlist_list_calls = 0
+        self.snapshot = 0
+        self.playlist_writes = []
+        self.track_search_calls = 0
         self.artist_search_calls = 0
         self.album_calls = 0
+        self.albums_calls = 0
         self.track_calls = 0
 
     def search(self, q, limit, type):
         if type == "track":
+            self.track_search_calls += 1
             return {"tracks": {"items": self.search_results}}
         if type == "artist":
             self.artist_search_calls += 1
             return {"artists": {"items": self.artist_results}}
         return {}
 
-    def current_user_playlists(self):
-        return {"items": []}
+    def current_user_playlists(self, limit=50, offset=0):
+        self.playlist_list_calls += 1
+        has_next = offset + limit < len(self.user_playlists)
+        return {
+            "items": self.user_playlists[offset : offset + limit],
+            "next": "more" if has_next else None,
+        }
 
     def user_playlist_create(self, user, name, public=True):
-        return {"name": name, "id": "new", "external_urls": {"spotify": "url"}}
+        playlist = {
+            "name": name,
+            "id": f"new-{len(self.user_playlists)}",
+            "external_urls": {"spotify": "url"},
+        }
+        self.user_playlists.insert(0, playlist)
+        return playlist
+
+    def _track_items(self, offset, limit):
+        items = [{"track": {"id": track_id}} for track_id in self.playlist_tracks]
+        has_next = offset + limit < len(items)
+        return {
+            "items": items[offset : offset + limit],
+            "next": "more" if has_next else None,
+        }
+
+    def _write(self, name, snapshot_id=None):
+        assert snapshot_id in (None, f"s{self.snapshot}")
+        self.snapshot += 1
+        self.playlist_writes.append(name)
+        return {"snapshot_id": f"s{self.snapshot}"}
+
+    def playlist(self, playlist_id, fields=None):
+        return {"snapshot_id": f"s{self.snapshot}", "tracks": self._track_items(0, 100)}
+
+    def playlist_items(self, playlist_id, fields=None, limit=50, offset=0, **kwargs):
+        return self._track_items(offset, limit)
 
     def playlist_replace_items(self, playlist_id, items):
         self.playlist_replace_called = True
+        self.playlist_tracks = list(items)
+        return self._write("replace")
 
-    def playlist_add_items(self, playlist_id, items):
+    def playlist_add_items(self, playlist_id, items, position=None):
+        assert len(items) <= 100
         self.added_items.extend(items)
+        if position is None:
+            position = len(self.playlist_tracks)
+        self.playlist_tracks[position:position] = items
+        return self._write("add")
+
+    def playlist_remove_specific_occurrences_of_items(
+        self, playlist_id, items, snapshot_id=None
+    ):
+        positions = sorted(
+            (position for item in items for position in item["positions"]),
+            reverse=True,
+        )
+        assert len(positions) <= 100
+        for item in items:
+            for position in item["positions"]:
+                assert self.playlist_tracks[position] == item["uri"]
+        for position in positions:
+            del self.playlist_tracks[position]
+        return self._write("remove", snapshot_id)
+
+    def playlist_reorder_items(
+        self, playlist_id, range_start, insert_before, range_length=1, snapshot_id=None
+    ):
+        track = self.playlist_tracks.pop(range_start)
+        if range_start < insert_before:
+            insert_before -= 1
+        self.playlist_tracks.insert(insert_before, track)
+        return self._write("reorder", snapshot_id)
 
     def artist_albums(self, artist_id, album_type=None, limit=None, **kwargs):
         self.album_calls += 1
         return {"items": self.album_list}
 
-    def album_tracks(self, album_id):
+    def album_tracks(self, album_id, limit=50, offset=0):
         self.track_calls += 1
-        return {"items": self.album_tracks_map.get(album_id, [])}
+        tracks = self.album_tracks_map.get(album_id, [])
+        has_next = offset + limit < len(tracks)
+        return {
+            "items": tracks[offset : offset + limit],
+            "next": "more" if has_next else None,
+        }
+
+    def albums(self, album_ids):
+        assert len(album_ids) <= 20
+        self.albums_calls += 1
+        return {
+            "albums": [
+                {"id": album_id, "tracks": self.album_tracks(album_id)}
+                for album_id in album_ids
+            ]
+        }
 
 
-def build_client(fake_spotify):
+def build_client(fake_spotify, track_cache=None):
     cfg = SpotifyConfig(
         client_id="id",
         client_secret="secret",
@@ -60,7 +159,9 @@ def build_client(fake_spotify):
         scopes="playlist-modify-public",
         token_cache_path=None,
     )
-    return SpotifyClient(cfg, track_cache=create_null_cache(), sp=fake_spotify)
+    return SpotifyClient(
+        cfg, track_cache=track_cache or create_null_cache(), sp=fake_spotify
+    )
 
 
 def test_match_is_exact_by_default():
@@ -125,3 +226,547 @@ def test_discography_fallback_only_when_fuzzy_enabled():
     _, track_id = client.get_track_id("My Song", "Band", use_fuzzy_search=True)
     assert track_id == "t1"
     assert fake_sp.artist_search_calls == 1
+
+
+RAW_SEARCH_RESULTS = {
+    "tracks": {
+        "items": [
+            {
+                "name": "Mÿ Song",
+                "artists": [{"name": "Bänd"}],
+                "id": "2",
+                "album": {"images": [{"url": "big"}]},
+                "available_markets": ["GB", "US"],
+            },
+            {"name": "My Song", "artists": [{"name": "Someone Else"}], "id": "3"},
+        ]
+    }
+}
+
+
+def test_track_cache_stores_compact_candidates():
+    fake_sp = FakeSpotipy(search_results=RAW_SEARCH_RESULTS["tracks"]["items"])
+    cache = MemoryCache()
+    client = build_client(fake_sp, track_cache=cache)
+
+    _, track_id = client.get_track_id("My Song", "Band")
+
+    assert track_id == "2"
+    assert cache.get("My Song Band") == {
+        "v": 2,
+        "candidates": [{"id": "2", "name": "my song", "artists": ["band"]}],
+    }
+
+
+def test_raw_cached_search_results_are_migrated():
+    cache = MemoryCache()
+    cache.set("My Song Band", RAW_SEARCH_RESULTS)
+    client = build_client(FakeSpotipy(), track_cache=cache)
+
+    _, track_id = client.get_track_id("My Song", "Band")
+
+    assert track_id == "2"
+    assert cache.get("My Song Band")["v"] == 2
+
+
+def test_migrate_track_cache_converts_raw_entries():
+    cache = MemoryCache()
+    cache.set("My Song Band", RAW_SEARCH_RESULTS)
+
+    assert migrate_track_cache(cache) == 1
+    assert [c["id"] for c in cache.get("My Song Band")["candidates"]] == ["2", "3"]
+    assert migrate_track_cache(cache) == 0
+
+
+def test_resolved_matches_are_memoized():
+    fake_sp = FakeSpotipy(
+        search_results=[{"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}]
+    )
+    client = build_client(fake_sp, track_cache=MemoryCache())
+
+    first = client.get_track_match("My Song", "Band")
+    # Drop the search cache entry so only the memo can answer.
+    client.track_cache = MemoryCache()
+    second = client.get_track_match("my song", "Band")
+
+    assert fake_sp.track_search_calls == 1
+    assert second.spotify_id == first.spotify_id == "2"
+    assert second.name == "my song"
+    assert second.strategy == "exact"
+
+
+def test_not_found_matches_expire(monkeypatch):
+    fake_sp = FakeSpotipy(search_results=[], artist_results=[])
+    cache = MemoryCache()
+    client = build_client(fake_sp, track_cache=cache)
+    client.not_found_ttl_seconds = 60
+    now = 1_000_000.0
+    monkeypatch.setattr("ag.cache.time.time", lambda: now)
+
+    assert client.get_track_match("Gone", "Band", use_fuzzy_search=True).status == "not_found"
+    assert client.get_track_match("Gone", "Band", use_fuzzy_search=True).status == "not_found"
+    assert fake_sp.artist_search_calls == 1
+
+    now += 61
+    client.get_track_match("Gone", "Band", use_fuzzy_search=True)
+    assert fake_sp.artist_search_calls == 2
+
+
+def test_discography_index_is_paginated_and_reused():
+    class PagedSpotipy(FakeSpotipy):
+        def artist_albums(self, artist_id, album_type=None, limit=None, offset=0):
+            self.album_calls += 1
+            items = self.album_list[offset : offset + limit]
+            has_next = offset + limit < len(self.album_list)
+            return {"items": items, "next": "more" if has_next else None}
+
+    fake_sp = PagedSpotipy(search_results=[], artist_results=[{"id": "artist"}])
+    fake_sp.album_list = [{"id": f"album{i}"} for i in range(60)]
+    fake_sp.album_tracks_map = {
+        "album59": [{"id": "t-last", "name": "Deep Cut"}],
+        "album3": [{"id": "t-exact", "name": "Song"}, {"id": "t-sub", "name": "Song Two"}],
+    }
+    cache = MemoryCache()
+    client = build_client(fake_sp, track_cache=cache)
+
+    assert client.get_track_match("Deep Cut", "Band", use_fuzzy_search=True).spotify_id == "t-last"
+    assert client.get_track_match("Song", "Band", use_fuzzy_search=True).spotify_id == "t-exact"
+    assert client.get_track_match("Two", "Band", use_fuzzy_search=True).spotify_id == "t-sub"
+
+    assert fake_sp.album_calls == 2
+    assert fake_sp.albums_calls == 3
+    assert fake_sp.artist_search_calls == 1
+
+    # A fresh client sharing the cache rebuilds the index without API calls.
+    other = build_client(fake_sp, track_cache=cache)
+    assert other._search_track_by_discography("artist", "deep cut") == "t-last"
+    assert fake_sp.album_calls == 2
+
+
+def test_discography_follows_long_tracklists():
+    fake_sp = FakeSpotipy(search_results=[], artist_results=[{"id": "artist"}])
+    fake_sp.album_list = [{"id": "box-set"}]
+    fake_sp.album_tracks_map = {
+        "box-set": [{"id": f"t{i}", "name": f"Track {i}"} for i in range(120)]
+    }
+    client = build_client(fake_sp)
+
+    match = client.get_track_match("Track 119", "Band", use_fuzzy_search=True)
+
+    assert match.spotify_id == "t119"
+    assert fake_sp.albums_calls == 1
+
+
+def test_discography_fetches_run_per_artist_and_expire(monkeypatch):
+    client = build_client(FakeSpotipy(), track_cache=MemoryCache())
+    client.discography_ttl_seconds = 60
+    now = 1_000_000.0
+    monkeypatch.setattr("ag.cache.time.time", lambda: now)
+    release_slow = threading.Event()
+    fetches = []
+
+    def fake_fetch(artist_id):
+        fetches.append(artist_id)
+        if artist_id == "slow":
+            assert release_slow.wait(timeout=5)
+        return [(f"{artist_id}-1", "song")]
+
+    monkeypatch.setattr(client, "_fetch_discography", fake_fetch)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        slow = [pool.submit(client._search_track_by_discography, "slow", "Song")]
+        while not fetches:
+            time.sleep(0.001)
+        slow.append(pool.submit(client._search_track_by_discography, "slow", "Song"))
+        # Another artist is not stuck behind the slow fetch.
+        assert client._search_track_by_discography("fast", "Song") == "fast-1"
+        release_slow.set()
+        assert [future.result() for future in slow] == ["slow-1", "slow-1"]
+    assert sorted(fetches) == ["fast", "slow"]
+
+    now += 61
+    assert client._search_track_by_discography("fast", "Song") == "fast-1"
+    assert sorted(fetches) == ["fast", "fast", "slow"]
+    assert set(client._discographies) == {"fast"}
+
+
+def test_spotify_429_feeds_adaptive_limiter_and_retries():
+    class ThrottledSpotipy(FakeSpotipy):
+        throttle = 1
+
+        def search(self, q, limit, type):
+            if self.throttle:
+                self.throttle -= 1
+                raise SpotifyException(429, -1, "slow down", headers={"Retry-After": "0"})
+            return super().search(q, limit, type)
+
+    fake_sp = ThrottledSpotipy(
+        search_results=[{"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}]
+    )
+    limiter = AdaptiveRateLimiter(0.001, jitter_seconds=0.0)
+    client = build_client(fake_sp)
+    client.rate_limiters = RateLimiterRegistry({SPOTIFY_SEARCH: limiter})
+
+    assert client.get_track_match("My Song", "Band").spotify_id == "2"
+    assert limiter.stats().throttled == 1
+
+    fake_sp.throttle = 10
+    client.max_retries = 1
+    with pytest.raises(SpotifyException):
+        client.get_track_match("Other", "Band")
+
+
+def test_playlist_client_shares_token_manager_across_clients(monkeypatch):
+    reset_token_managers()
+    refreshed = []
+
+    class FakeAuthManager:
+        def refresh_access_token(self, refresh_token):
+            refreshed.append(refresh_token)
+            return {"access_token": "access", "expires_at": time.time() + 3600}
+
+    clients = [build_client(None), build_client(None)]
+    for client in clients:
+        monkeypatch.setattr(
+            client, "create_auth_manager", lambda **kwargs: FakeAuthManager()
+        )
+
+    first, second = (client.sp for client in clients)
+
+    assert first is not second
+    assert clients[0].token_manager is clients[1].token_manager
+    assert first._auth_headers() == {"Authorization": "Bearer access"}
+    assert second._auth_headers() == {"Authorization": "Bearer access"}
+    assert refreshed == ["token"]
+    reset_token_managers()
+
+
+def test_call_refreshes_token_once_on_401():
+    tokens = iter(["stale", "fresh", "fresher"])
+    manager = SpotifyTokenManager(
+        lambda refresh_token: {
+            "access_token": next(tokens),
+            "expires_at": time.time() + 3600,
+        },
+        "token",
+    )
+    client = build_client(FakeSpotipy())
+    client._token_manager = manager
+    seen = []
+
+    def playlist_call():
+        token = manager.get_access_token()
+        seen.append(token)
+        if token == "stale":
+            raise SpotifyException(401, -1, "The access token expired")
+        return {"ok": True}
+
+    assert client._call(SPOTIFY_SEARCH, playlist_call) == {"ok": True}
+    assert seen == ["stale", "fresh"]
+
+    def always_unauthorized():
+        manager.get_access_token()
+        raise SpotifyException(401, -1, "Invalid access token")
+
+    with pytest.raises(SpotifyException):
+        client._call(SPOTIFY_SEARCH, always_unauthorized)
+    assert manager.refresh_count == 3
+
+
+def test_call_refreshes_app_token_on_search_client_401():
+    class FakeCredentials:
+        def __init__(self):
+            self.forced = 0
+
+        def get_access_token(self, as_dict=True, check_cache=True):
+            self.forced += not check_cache
+            return "app-token"
+
+    class SearchClient:
+        def __init__(self):
+            self.calls = 0
+
+        def search(self, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                raise SpotifyException(401, -1, "The access token expired")
+            return {"ok": True}
+
+    user_manager = SpotifyTokenManager(
+        lambda refresh_token: {"access_token": "user", "expires_at": time.time() + 60},
+        "token",
+    )
+    user_manager.get_access_token()
+    client = build_client(None)
+    client._token_manager = user_manager
+    client._search_sp = SearchClient()
+    client._search_auth_manager = FakeCredentials()
+
+    assert client._call(SPOTIFY_SEARCH, client._search_sp.search, q="x") == {
+        "ok": True
+    }
+    assert client._search_auth_manager.forced == 1
+    assert user_manager.refresh_count == 1
+
+
+def _sync(fake_sp, current, desired):
+    fake_sp.playlist_tracks = list(current)
+    fake_sp.playlist_writes = []
+    client = build_client(fake_sp)
+    client.sync_playlist(Playlist(name="p", id="id", url="url"), list(desired))
+    assert fake_sp.playlist_tracks == list(desired)
+    return fake_sp.playlist_writes
+
+
+def test_sync_playlist_only_sends_the_changes():
+    current = [f"t{i}" for i in range(250)]
+    desired = list(current)
+    desired[10] = "new-a"  # replaces t10
+    desired.insert(200, "new-b")
+    desired.remove("t120")
+    desired.insert(5, desired.pop(desired.index("t240")))
+
+    writes = _sync(FakeSpotipy(), current, desired)
+
+    assert writes == ["remove", "reorder", "add", "add"]
+
+
+def test_sync_playlist_skips_unchanged_playlist_and_fills_empty_one():
+    fake_sp = FakeSpotipy()
+    tracks = [f"t{i}" for i in range(150)]
+
+    assert _sync(fake_sp, tracks, tracks) == []
+    assert _sync(fake_sp, [], tracks) == ["add", "add"]
+    assert not fake_sp.playlist_replace_called
+
+
+def test_sync_playlist_rewrites_when_diff_is_larger():
+    tracks = [f"t{i}" for i in range(20)]
+
+    writes = _sync(FakeSpotipy(), tracks, list(reversed(tracks)))
+
+    assert writes == ["replace"]
+
+
+def _user_playlists(count):
+    return [
+        {
+            "name": f"Festival {i}",
+            "id": f"pl-{i}",
+            "external_urls": {"spotify": f"u{i}"},
+        }
+        for i in range(count)
+    ]
+
+
+def test_find_or_create_playlist_indexes_every_page():
+    fake_sp = FakeSpotipy()
+    fake_sp.user_playlists = _user_playlists(180)
+    client = build_client(fake_sp)
+
+    found = client.find_or_create_playlist("Festival 170")
+    again = client.find_or_create_playlist("Festival 3")
+
+    assert found == Playlist(name="Festival 170", id="pl-170", url="u170")
+    assert again.id == "pl-3"
+    assert fake_sp.playlist_list_calls == 4  # 180 playlists, 50 per page
+
+
+def test_created_playlists_join_the_cached_index():
+    fake_sp = FakeSpotipy()
+    fake_sp.user_playlists = _user_playlists(3)
+    track_cache = MemoryCache()
+    client = build_client(fake_sp, track_cache=track_cache)
+
+    created = client.find_or_create_playlist("New Festival")
+    assert client.find_or_create_playlist("New Festival") == created
+
+    # A second client (e.g. another warm job) reuses the cached index.
+    other = build_client(fake_sp, track_cache=track_cache)
+    assert other.find_or_create_playlist("New Festival") == created
+    assert fake_sp.playlist_list_calls == 1
+    assert len(fake_sp.user_playlists) == 4
+
+
+def test_playlist_index_expires(monkeypatch):
+    fake_sp = FakeSpotipy()
+    fake_sp.user_playlists = _user_playlists(2)
+    client = build_client(fake_sp)
+    client.find_or_create_playlist("Festival 1")
+
+    now = time.time()
+    monkeypatch.setattr(
+        "ag.cache.time.time", lambda: now + client.playlist_index_ttl_seconds + 1
+    )
+    client.find_or_create_playlist("Festival 1")
+
+    assert fake_sp.playlist_list_calls == 2
+
+
+def test_clients_sharing_an_index_keep_each_others_playlists():
+    fake_sp = FakeSpotipy()
+    fake_sp.user_playlists = _user_playlists(2)
+    # Serialized like redis, so clients never share index objects.
+    cache = SharedStoreCache(DictSharedStore(), namespace="spotify")
+    first = build_client(fake_sp, track_cache=cache)
+    second = build_client(fake_sp, track_cache=cache)
+    first.find_or_create_playlist("Festival 0")
+    second.find_or_create_playlist("Festival 0")
+
+    one = first.find_or_create_playlist("One")
+    two = second.find_or_create_playlist("Two")
+
+    # Neither write dropped the other's entry, and "One" is not made twice.
+    assert second.find_or_create_playlist("One") == one
+    third = build_client(fake_sp, track_cache=cache)
+    assert third.find_or_create_playlist("One") == one
+    assert third.find_or_create_playlist("Two") == two
+    assert len(fake_sp.user_playlists) == 4
+    assert fake_sp.playlist_list_calls == 1
+
+
+def test_concurrent_find_or_create_creates_the_playlist_once():
+    class SlowCreateSpotipy(FakeSpotipy):
+        def user_playlist_create(self, user, name, public=True):
+            time.sleep(0.02)
+            return super().user_playlist_create(user, name, public)
+
+    fake_sp = SlowCreateSpotipy()
+    client = build_client(fake_sp, track_cache=MemoryCache())
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        playlists = list(
+            pool.map(lambda _: client.find_or_create_playlist("Gig"), range(4))
+        )
+
+    assert {playlist.id for playlist in playlists} == {"new-0"}
+    assert len(fake_sp.user_playlists) == 1
+
+
+def test_populate_recreates_a_playlist_deleted_in_spotify():
+    class DeletedSpotipy(FakeSpotipy):
+        def playlist(self, playlist_id, fields=None):
+            if playlist_id == "pl-0":
+                raise SpotifyException(404, -1, "Not found")
+            return super().playlist(playlist_id, fields)
+
+    fake_sp = DeletedSpotipy(
+        search_results=[{"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}]
+    )
+    fake_sp.user_playlists = _user_playlists(1)
+    client = build_client(fake_sp, track_cache=MemoryCache())
+    stale = client.find_or_create_playlist("Festival 0")
+
+    written = client.populate_playlist(stale, {"Band": ["My Song"]})
+
+    assert written.name == "Festival 0"
+    assert written.id == "new-1"
+    assert fake_sp.added_items == ["2"]
+    assert client.find_or_create_playlist("Festival 0") == written
+
+
+def test_map_tracks_resolves_each_normalized_song_once():
+    fake_sp = FakeSpotipy(
+        search_results=[{"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}]
+    )
+    client = build_client(fake_sp)
+
+    mapped = client.map_tracks(
+        {"Band": ["My Song", "Other", "MY SONG", "My Song"]}
+    )
+
+    # create_null_cache memoizes nothing, so only the per-call dedupe helps.
+    assert fake_sp.track_search_calls == 2
+    names = [match.name for match in mapped["Band"]]
+    assert names == ["My Song", "Other", "MY SONG", "My Song"]
+    assert [m.spotify_id for m in mapped["Band"]] == ["2", None, "2", "2"]
+
+
+def test_map_tracks_shares_resolved_matches_across_calls():
+    fake_sp = FakeSpotipy(
+        search_results=[{"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}]
+    )
+    client = build_client(fake_sp)
+    resolved = {}
+
+    client.map_tracks({"Band": ["My Song"]}, resolved=resolved)
+    again = client.map_tracks({"Band": ["My Song"]}, resolved=resolved)
+
+    assert fake_sp.track_search_calls == 1
+    assert again["Band"][0].spotify_id == "2"
+
+
+def test_concurrent_misses_for_a_song_share_one_lookup():
+    release = threading.Event()
+
+    class SlowSpotipy(FakeSpotipy):
+        def search(self, q, limit, type):
+            release.wait(5)
+            return super().search(q, limit, type)
+
+    fake_sp = SlowSpotipy(
+        search_results=[{"name": "My Song", "artists": [{"name": "Band"}], "id": "2"}]
+    )
+    client = build_client(fake_sp)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(client.get_track_match, name, "Band")
+            for name in ("My Song", "my song", "MY SONG", "My Song")
+        ]
+        while client._match_flights.shared < 3:
+            time.sleep(0.001)
+        release.set()
+        matches = [future.result() for future in futures]
+
+    assert fake_sp.track_search_calls == 1
+    assert [m.spotify_id for m in matches] == ["2"] * 4
+    assert [m.name for m in matches] == ["My Song", "my song", "MY SONG", "My Song"]
+
+
+@pytest.mark.parametrize("max_retries", [0, 2])
+def test_call_reauthenticates_after_the_429_budget_is_spent(max_retries):
+    manager = SpotifyTokenManager(
+        lambda refresh_token: {"access_token": "t", "expires_at": time.time() + 3600},
+        "token",
+    )
+    client = build_client(FakeSpotipy())
+    client._token_manager = manager
+    client.max_retries = max_retries
+    client.rate_limiters = RateLimiterRegistry(
+        {SPOTIFY_SEARCH: AdaptiveRateLimiter(0.001, jitter_seconds=0)}
+    )
+    # Every 429 retry is used up, then the final attempt hits a 401.
+    errors = [
+        SpotifyException(429, -1, "slow down", headers={"Retry-After": "0"})
+    ] * max_retries + [SpotifyException(401, -1, "The access token expired")]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return {"ok": True}
+
+    assert client._call(SPOTIFY_SEARCH, flaky) == {"ok": True}
+
+    def always_unauthorized():
+        raise SpotifyException(401, -1, "Invalid access token")
+
+    with pytest.raises(SpotifyException):
+        client._call(SPOTIFY_SEARCH, always_unauthorized)
+
+
+def test_call_raises_once_429_retries_are_exhausted():
+    client = build_client(FakeSpotipy())
+    client.max_retries = 1
+    client.rate_limiters = RateLimiterRegistry(
+        {SPOTIFY_SEARCH: AdaptiveRateLimiter(0.001, jitter_seconds=0)}
+    )
+    calls = []
+
+    def throttled():
+        calls.append(1)
+        raise SpotifyException(429, -1, "slow down", headers={"Retry-After": "0"})
+
+    with pytest.raises(SpotifyException):
+        client._call(SPOTIFY_SEARCH, throttled)
+    assert len(calls) == 2